@@ -0,0 +1,294 @@
+# coding: utf-8
+
+"""Micro-benchmark of the create arguments built by import_from_stix2
+
+Runs the Malware and Indicator imports of a generated bundle with `create`
+stubbed, so only the argument building is measured: once with the
+per-attribute conditionals that were used before STIX2_IMPORT_MAPPINGS, once
+through import_from_stix2 and the compiled mappers. Both run after the
+extensions of the object are flattened, as in import_object. No OpenCTI
+platform is needed.
+
+Usage, from the root of the repository:
+    python benchmarks/stix2_import_mapping.py [--objects 100000] [--runs 5]
+"""
+
+import argparse
+import copy
+import gc
+import time
+
+from pycti import OpenCTIApiClient
+from pycti.api.opencti_api_client import ExtensionState
+from pycti.entities.opencti_indicator import Indicator
+from pycti.entities.opencti_malware import Malware
+from pycti.utils.opencti_stix2 import OpenCTIStix2
+
+OPENCTI_EXTENSION = "extension-definition--ea279b3e-5c71-4632-ac08-831c66a786ba"
+
+
+def generate_objects(nb_objects: int) -> list:
+    objects = []
+    for index in range(nb_objects):
+        common = {
+            "id": "x--" + str(index),
+            "created": "2022-01-01T00:00:00.000Z",
+            "modified": "2022-01-02T00:00:00.000Z",
+            "confidence": 80,
+            "description": "An <code>object</code> of the benchmark",
+            "extensions": {OPENCTI_EXTENSION: {"stix_ids": [], "score": 70}},
+        }
+        if index % 2 == 0:
+            objects.append(
+                dict(
+                    common,
+                    id="malware--" + str(index),
+                    type="malware",
+                    name="Malware " + str(index),
+                    malware_types=["trojan"],
+                    is_family=True,
+                    aliases=["Alias " + str(index)],
+                )
+            )
+        else:
+            objects.append(
+                dict(
+                    common,
+                    id="indicator--" + str(index),
+                    type="indicator",
+                    name="Indicator " + str(index),
+                    pattern_type="stix",
+                    pattern="[ipv4-addr:value = '10.0.0.1']",
+                    valid_from="2022-01-01T00:00:00.000Z",
+                )
+            )
+    return objects
+
+
+def create_client() -> OpenCTIApiClient:
+    # Only the stix2 helpers of the client are used, it is never connected
+    opencti = OpenCTIApiClient.__new__(OpenCTIApiClient)
+    opencti.extension_state = ExtensionState()
+    opencti.stix2 = OpenCTIStix2(opencti)
+    opencti.malware = Malware(opencti)
+    opencti.indicator = Indicator(opencti)
+    opencti.malware.create = lambda **kwargs: kwargs
+    opencti.indicator.create = lambda **kwargs: kwargs
+    return opencti
+
+
+def legacy_malware_import(opencti, **kwargs):
+    stix_object = kwargs.get("stixObject", None)
+    extras = kwargs.get("extras", {})
+    update = kwargs.get("update", False)
+    if "x_opencti_stix_ids" not in stix_object:
+        stix_object["x_opencti_stix_ids"] = opencti.get_attribute_in_extension(
+            "stix_ids", stix_object
+        )
+    return opencti.malware.create(
+        stix_id=stix_object["id"],
+        createdBy=extras["created_by_id"] if "created_by_id" in extras else None,
+        objectMarking=extras["object_marking_ids"]
+        if "object_marking_ids" in extras
+        else None,
+        objectLabel=extras["object_label_ids"] if "object_label_ids" in extras else [],
+        externalReferences=extras["external_references_ids"]
+        if "external_references_ids" in extras
+        else [],
+        revoked=stix_object["revoked"] if "revoked" in stix_object else None,
+        confidence=stix_object["confidence"] if "confidence" in stix_object else None,
+        lang=stix_object["lang"] if "lang" in stix_object else None,
+        created=stix_object["created"] if "created" in stix_object else None,
+        modified=stix_object["modified"] if "modified" in stix_object else None,
+        name=stix_object["name"],
+        description=opencti.stix2.convert_markdown(stix_object["description"])
+        if "description" in stix_object
+        else "",
+        aliases=opencti.stix2.pick_aliases(stix_object),
+        malware_types=stix_object["malware_types"]
+        if "malware_types" in stix_object
+        else None,
+        is_family=stix_object["is_family"] if "is_family" in stix_object else False,
+        first_seen=stix_object["first_seen"] if "first_seen" in stix_object else None,
+        last_seen=stix_object["last_seen"] if "last_seen" in stix_object else None,
+        architecture_execution_envs=stix_object["architecture_execution_envs"]
+        if "architecture_execution_envs" in stix_object
+        else None,
+        implementation_languages=stix_object["implementation_languages"]
+        if "implementation_languages" in stix_object
+        else None,
+        capabilities=stix_object["capabilities"]
+        if "capabilities" in stix_object
+        else None,
+        killChainPhases=extras["kill_chain_phases_ids"]
+        if "kill_chain_phases_ids" in extras
+        else None,
+        x_opencti_stix_ids=stix_object["x_opencti_stix_ids"]
+        if "x_opencti_stix_ids" in stix_object
+        else None,
+        update=update,
+    )
+
+
+def legacy_indicator_import(opencti, **kwargs):
+    stix_object = kwargs.get("stixObject", None)
+    extras = kwargs.get("extras", {})
+    update = kwargs.get("update", False)
+    if "x_opencti_score" not in stix_object:
+        stix_object["x_opencti_score"] = opencti.get_attribute_in_extension(
+            "score", stix_object
+        )
+    if "x_opencti_detection" not in stix_object:
+        stix_object["x_opencti_detection"] = opencti.get_attribute_in_extension(
+            "detection", stix_object
+        )
+    if (
+        "x_opencti_main_observable_type" not in stix_object
+        and opencti.get_attribute_in_extension("main_observable_type", stix_object)
+        is not None
+    ):
+        stix_object[
+            "x_opencti_main_observable_type"
+        ] = opencti.get_attribute_in_extension("main_observable_type", stix_object)
+    if "x_opencti_create_observables" not in stix_object:
+        stix_object[
+            "x_opencti_create_observables"
+        ] = opencti.get_attribute_in_extension("create_observables", stix_object)
+    if "x_opencti_stix_ids" not in stix_object:
+        stix_object["x_opencti_stix_ids"] = opencti.get_attribute_in_extension(
+            "stix_ids", stix_object
+        )
+    return opencti.indicator.create(
+        stix_id=stix_object["id"],
+        createdBy=extras["created_by_id"] if "created_by_id" in extras else None,
+        objectMarking=extras["object_marking_ids"]
+        if "object_marking_ids" in extras
+        else None,
+        objectLabel=extras["object_label_ids"] if "object_label_ids" in extras else [],
+        externalReferences=extras["external_references_ids"]
+        if "external_references_ids" in extras
+        else [],
+        revoked=stix_object["revoked"] if "revoked" in stix_object else None,
+        confidence=stix_object["confidence"] if "confidence" in stix_object else None,
+        lang=stix_object["lang"] if "lang" in stix_object else None,
+        created=stix_object["created"] if "created" in stix_object else None,
+        modified=stix_object["modified"] if "modified" in stix_object else None,
+        pattern_type=stix_object["pattern_type"]
+        if "pattern_type" in stix_object
+        else None,
+        pattern_version=stix_object["pattern_version"]
+        if "pattern_version" in stix_object
+        else None,
+        pattern=stix_object["pattern"] if "pattern" in stix_object else "",
+        name=stix_object["name"] if "name" in stix_object else stix_object["pattern"],
+        description=opencti.stix2.convert_markdown(stix_object["description"])
+        if "description" in stix_object
+        else "",
+        indicator_types=stix_object["indicator_types"]
+        if "indicator_types" in stix_object
+        else None,
+        valid_from=stix_object["valid_from"] if "valid_from" in stix_object else None,
+        valid_until=stix_object["valid_until"]
+        if "valid_until" in stix_object
+        else None,
+        x_opencti_score=stix_object["x_opencti_score"]
+        if "x_opencti_score" in stix_object
+        else 50,
+        x_opencti_detection=stix_object["x_opencti_detection"]
+        if "x_opencti_detection" in stix_object
+        else False,
+        x_mitre_platforms=stix_object["x_mitre_platforms"]
+        if "x_mitre_platforms" in stix_object
+        else None,
+        x_opencti_main_observable_type=stix_object["x_opencti_main_observable_type"]
+        if "x_opencti_main_observable_type" in stix_object
+        else "Unknown",
+        killChainPhases=extras["kill_chain_phases_ids"]
+        if "kill_chain_phases_ids" in extras
+        else None,
+        x_opencti_stix_ids=stix_object["x_opencti_stix_ids"]
+        if "x_opencti_stix_ids" in stix_object
+        else None,
+        x_opencti_create_observables=stix_object["x_opencti_create_observables"]
+        if "x_opencti_create_observables" in stix_object
+        else False,
+        update=update,
+    )
+
+
+def run_imports(opencti, importers: dict, objects: list) -> list:
+    results = []
+    for stix_object in objects:
+        # As import_object, which flattens the extensions of every object
+        opencti.set_extension_object(stix_object)
+        results.append(
+            importers[stix_object["type"]](
+                stixObject=stix_object, extras={}, update=False
+            )
+        )
+    opencti.set_extension_object(None)
+    return results
+
+
+def import_legacy(opencti, objects: list) -> list:
+    importers = {
+        "malware": lambda **kwargs: legacy_malware_import(opencti, **kwargs),
+        "indicator": lambda **kwargs: legacy_indicator_import(opencti, **kwargs),
+    }
+    return run_imports(opencti, importers, objects)
+
+
+def import_mapped(opencti, objects: list) -> list:
+    importers = {
+        "malware": opencti.malware.import_from_stix2,
+        "indicator": opencti.indicator.import_from_stix2,
+    }
+    return run_imports(opencti, importers, objects)
+
+
+def best_times(functions: list, opencti, objects: list, runs: int) -> list:
+    timings = [[] for _ in functions]
+    for _ in range(runs):
+        # Alternate the imports so they are equally affected by the machine
+        for function, function_timings in zip(functions, timings):
+            # The imports complete the objects with their extension attributes
+            run_objects = copy.deepcopy(objects)
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                function(opencti, run_objects)
+                function_timings.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+    return [min(function_timings) for function_timings in timings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    opencti = create_client()
+    objects = generate_objects(args.objects)
+    # Both imports must build the same arguments
+    sample = objects[:1000]
+    if import_legacy(opencti, copy.deepcopy(sample)) != import_mapped(
+        opencti, copy.deepcopy(sample)
+    ):
+        raise ValueError("The mapped arguments differ from the legacy ones")
+
+    legacy, mapped = best_times(
+        [import_legacy, import_mapped], opencti, objects, args.runs
+    )
+    print(
+        "%d objects, best of %d runs" % (args.objects, args.runs),
+        "legacy: %.3fs (%.2fus/object)" % (legacy, legacy * 1e6 / args.objects),
+        "mapped: %.3fs (%.2fus/object)" % (mapped, mapped * 1e6 / args.objects),
+        sep="\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
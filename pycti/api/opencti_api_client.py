@@ -4,7 +4,8 @@ import datetime
 import io
 import json
 import logging
-from typing import Union
+import threading
+from typing import Dict, Tuple, Union
 
 import magic
 import requests
@@ -75,6 +76,15 @@ class File:
         self.mime = mime
 
 
+class ExtensionState(threading.local):
+    """Stix2 object being imported by a thread, with its extension and mitre
+    extension views"""
+
+    # Class default, so threads which never set an object do not raise and
+    # catch an AttributeError on every lookup
+    current = (None, None, None)
+
+
 class OpenCTIApiClient:
     """Main API client for OpenCTI
 
@@ -119,6 +129,7 @@ class OpenCTIApiClient:
 
         # Configure logger
         self.log_level = log_level
+        self.json_logging = json_logging
         numeric_level = getattr(logging, self.log_level.upper(), None)
         if not isinstance(numeric_level, int):
             raise ValueError("Invalid log level: " + self.log_level)
@@ -138,7 +149,13 @@ class OpenCTIApiClient:
         self.api_token = token
         self.api_url = url + "/graphql"
         self.request_headers = {"Authorization": "Bearer " + token}
+        # Headers set by the current thread, over the shared ones
+        self.thread_headers = threading.local()
         self.session = requests.session()
+        self.query_count = 0
+        # Stix2 object being imported by the current thread with its
+        # flattened extensions
+        self.extension_state = ExtensionState()
 
         # Define the dependencies
         self.work = OpenCTIApiWork(self)
@@ -189,24 +206,58 @@ class OpenCTIApiClient:
             )
 
     def set_applicant_id_header(self, applicant_id):
+        # Threads which never set the header use the last value set
         self.request_headers["opencti-applicant-id"] = applicant_id
+        self.set_thread_header("opencti-applicant-id", applicant_id)
 
     def set_retry_number(self, retry_number):
-        self.request_headers["opencti-retry-number"] = (
-            "" if retry_number is None else str(retry_number)
-        )
+        retry_number = "" if retry_number is None else str(retry_number)
+        self.request_headers["opencti-retry-number"] = retry_number
+        self.set_thread_header("opencti-retry-number", retry_number)
+
+    def set_thread_header(self, key, value):
+        """sets a header of the requests of the current thread only
 
-    def query(self, query, variables={}):
+        :param key: name of the header
+        :type key: str
+        :param value: value of the header, None to use the shared value
+        :type value: str
+        """
+
+        if not hasattr(self.thread_headers, "headers"):
+            self.thread_headers.headers = {}
+        if value is None:
+            self.thread_headers.headers.pop(key, None)
+        else:
+            self.thread_headers.headers[key] = value
+
+    def get_request_headers(self) -> Dict:
+        """returns the headers of the requests of the current thread
+
+        :return: the shared headers, with the ones set by the current thread
+        :rtype: dict
+        """
+
+        headers = getattr(self.thread_headers, "headers", None)
+        if headers is None:
+            return self.request_headers
+        return {**self.request_headers, **headers}
+
+    def query(self, query, variables={}, raise_on_error=True):
         """submit a query to the OpenCTI GraphQL API
 
         :param query: GraphQL query string
         :type query: str
         :param variables: GraphQL query variables, defaults to {}
         :type variables: dict, optional
+        :param raise_on_error: whether to raise on GraphQL errors, if not the
+            response is returned with its `errors`, defaults to True
+        :type raise_on_error: bool, optional
         :return: returns the response json content
         :rtype: Any
         """
 
+        self.query_count += 1
         query_var = {}
         files_vars = []
         # Implementation of spec https://github.com/jaydenseric/graphql-multipart-request-spec
@@ -293,7 +344,7 @@ class OpenCTIApiClient:
                 self.api_url,
                 data=multipart_data,
                 files=multipart_files,
-                headers=self.request_headers,
+                headers=self.get_request_headers(),
                 verify=self.ssl_verify,
                 proxies=self.proxies,
             )
@@ -302,14 +353,14 @@ class OpenCTIApiClient:
             r = self.session.post(
                 self.api_url,
                 json={"query": query, "variables": variables},
-                headers=self.request_headers,
+                headers=self.get_request_headers(),
                 verify=self.ssl_verify,
                 proxies=self.proxies,
             )
         # Build response
         if r.status_code == 200:
             result = r.json()
-            if "errors" in result:
+            if "errors" in result and raise_on_error:
                 main_error = result["errors"][0]
                 error_name = (
                     main_error["name"]
@@ -332,6 +383,92 @@ class OpenCTIApiClient:
             logging.info(r.text)
             raise ValueError(r.text)
 
+    def query_batch(
+        self,
+        operation,
+        field,
+        variable_type,
+        values,
+        selection,
+        batch_size=50,
+        raise_on_error=True,
+    ):
+        """submit the same GraphQL field for several values in few requests
+
+        Every value is bound to an aliased occurrence of the field, so a chunk
+        of `batch_size` values costs a single round trip. Errors are logged
+        per value and do not prevent the other values to be processed, the
+        first one is raised once all the chunks are submitted, as `query` does.
+
+        :param operation: `query` or `mutation`
+        :type operation: str
+        :param field: GraphQL field with its argument bound to `$value`,
+            e.g. `stixSightingRelationshipAdd(input: $value)`
+        :type field: str
+        :param variable_type: GraphQL type of `$value`
+        :type variable_type: str
+        :param values: values to bind, one per occurrence of the field
+        :type values: list
+        :param selection: selection set of the field
+        :type selection: str
+        :param batch_size: maximum number of values per request, defaults to 50
+        :type batch_size: int, optional
+        :param raise_on_error: raise the first error, defaults to True
+        :type raise_on_error: bool, optional
+        :return: the results in the order of `values`, None for failed values
+        :rtype: list
+        """
+
+        results = []
+        main_error = None
+        for start in range(0, len(values), batch_size):
+            chunk = values[start : start + batch_size]
+            definitions = ", ".join(
+                "$value" + str(index) + ": " + variable_type
+                for index in range(len(chunk))
+            )
+            fields = "\n".join(
+                "a"
+                + str(index)
+                + ": "
+                + field.replace("$value", "$value" + str(index))
+                + " {"
+                + selection
+                + "}"
+                for index in range(len(chunk))
+            )
+            query = operation + " Batch(" + definitions + ") {" + fields + "}"
+            result = self.query(
+                query,
+                {"value" + str(index): value for index, value in enumerate(chunk)},
+                raise_on_error=False,
+            )
+            for error in result.get("errors", []):
+                path = error["path"] if "path" in error and error["path"] else None
+                index = (
+                    int(path[0][1:])
+                    if path is not None and str(path[0]).startswith("a")
+                    else None
+                )
+                message = (
+                    error["data"]["reason"]
+                    if "data" in error and "reason" in error["data"]
+                    else error["message"]
+                )
+                if index is not None:
+                    logging.error("%s", f"Batch item {start + index} failed: {message}")
+                else:
+                    logging.error("%s", f"Batch failed: {message}")
+                if main_error is None:
+                    error_name = error["name"] if "name" in error else error["message"]
+                    main_error = {"name": error_name, "message": message}
+            data = result["data"] if result.get("data") is not None else {}
+            for index in range(len(chunk)):
+                results.append(data.get("a" + str(index)))
+        if main_error is not None and raise_on_error:
+            raise ValueError(main_error)
+        return results
+
     def fetch_opencti_file(self, fetch_uri, binary=False, serialize=False):
         """get file from the OpenCTI API
 
@@ -343,7 +480,7 @@ class OpenCTIApiClient:
         :rtype: str or bytes
         """
 
-        r = self.session.get(fetch_uri, headers=self.request_headers)
+        r = self.session.get(fetch_uri, headers=self.get_request_headers())
         if binary:
             if serialize:
                 return base64.b64encode(r.content).decode("utf-8")
@@ -658,6 +795,58 @@ class OpenCTIApiClient:
         result = self.query(query, {"id": id})
         return json.loads(result["data"]["stix"])
 
+    @staticmethod
+    def flatten_extensions(object) -> Tuple[Dict, Dict]:
+        """flattens the OpenCTI and MITRE extensions of a stix2 object
+
+        :param object: stix2 object
+        :type object: dict
+        :return: the OpenCTI and the MITRE extension attributes
+        :rtype: tuple
+        """
+
+        extensions = object.get("extensions") or {}
+        extension_view = dict(
+            extensions.get(
+                "extension-definition--f93e2c80-4231-4f9a-af8b-95c9bd566a82", {}
+            )
+        )
+        # The first extension takes precedence, as in get_attribute_in_extension
+        extension_view.update(
+            extensions.get(
+                "extension-definition--ea279b3e-5c71-4632-ac08-831c66a786ba", {}
+            )
+        )
+        mitre_extension_view = extensions.get(
+            "extension-definition--322b8f77-262a-4cb8-a915-1e441e00329b", {}
+        )
+        return extension_view, mitre_extension_view
+
+    def set_extension_object(self, object) -> None:
+        """flattens the extensions of the stix2 object being imported once, so
+        `get_extension_attribute` does not walk them for every attribute
+
+        :param object: stix2 object, or None to release the current one
+        :type object: dict
+        """
+
+        if object is None:
+            self.extension_state.current = (None, None, None)
+        else:
+            self.extension_state.current = (object,) + self.flatten_extensions(object)
+
+    def get_extension_attribute(self, key, object) -> any:
+        extension_object, extension_view, _ = self.extension_state.current
+        if object is not None and object is extension_object:
+            return extension_view.get(key)
+        return self.get_attribute_in_extension(key, object)
+
+    def get_mitre_extension_attribute(self, key, object) -> any:
+        extension_object, _, mitre_extension_view = self.extension_state.current
+        if object is not None and object is extension_object:
+            return mitre_extension_view.get(key)
+        return self.get_attribute_in_mitre_extension(key, object)
+
     @staticmethod
     def get_attribute_in_extension(key, object) -> any:
         if (
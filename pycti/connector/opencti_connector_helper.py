@@ -1,5 +1,8 @@
 import base64
+import copy
 import datetime
+import functools
+import inspect
 import json
 import logging
 import os
@@ -11,10 +14,14 @@ import threading
 import time
 import traceback
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from queue import Queue
-from typing import Callable, Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import pika
+from pika.adapters.blocking_connection import BlockingChannel
 from pika.exceptions import NackError, UnroutableError
 from sseclient import SSEClient
 
@@ -22,11 +29,30 @@ from pycti.api.opencti_api_client import OpenCTIApiClient
 from pycti.connector.opencti_connector import OpenCTIConnector
 from pycti.utils.opencti_stix2_splitter import OpenCTIStix2Splitter
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 TRUTHY: List[str] = ["yes", "true", "True"]
 FALSY: List[str] = ["no", "false", "False"]
 
 logging.getLogger("pika").setLevel(logging.ERROR)
 
+# Maximum attempts to publish a message refused by the broker
+PUBLISH_RETRIES = 5
+# Delay in seconds before the first retry, doubled at every attempt
+PUBLISH_RETRY_DELAY = 0.5
+PUBLISH_RETRY_MAX_DELAY = 10
+# Interval in seconds between the pings of the connector
+PING_INTERVAL = 40
+# Interval in seconds between the pings of a work in progress
+WORK_PING_INTERVAL = 60 * 5
+# Maximum number of stream messages waiting for a stream worker
+STREAM_WORKER_QUEUE_SIZE = 100
+# Compressions of the message bodies, set as their content encoding
+MESSAGE_COMPRESSIONS: List[str] = ["zlib", "zstd"]
+
 
 def killProgramHook(etype, value, tb):
     traceback.print_exception(etype, value, tb)
@@ -36,6 +62,62 @@ def killProgramHook(etype, value, tb):
 sys.excepthook = killProgramHook
 
 
+def encode_bundle(bundle: Dict) -> Tuple[str, str]:
+    """serializes a bundle and encodes it as the content of a message
+
+    :param bundle: valid stix2 bundle
+    :type bundle: dict
+    :return: the JSON of the bundle and its base64 encoding
+    :rtype: tuple
+    """
+
+    serialized_bundle = json.dumps(bundle)
+    return (
+        serialized_bundle,
+        base64.b64encode(serialized_bundle.encode("utf-8", "escape")).decode("utf-8"),
+    )
+
+
+def compress_message(body: bytes, compression: Optional[str]) -> bytes:
+    """compresses the body of a message
+
+    :param body: message body
+    :type body: bytes
+    :param compression: one of `MESSAGE_COMPRESSIONS`, or None
+    :type compression: str, optional
+    :return: the compressed body
+    :rtype: bytes
+    """
+
+    if compression is None:
+        return body
+    if compression == "zlib":
+        return zlib.compress(body)
+    if compression == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().compress(body)
+    raise ValueError(f"Unsupported message compression: {compression}")
+
+
+def decompress_message(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """decompresses the body of a message according to its content encoding
+
+    :param body: message body
+    :type body: bytes
+    :param content_encoding: content encoding of the message
+    :type content_encoding: str, optional
+    :return: the decompressed body
+    :rtype: bytes
+    """
+
+    if content_encoding is None or content_encoding not in MESSAGE_COMPRESSIONS:
+        return body
+    if content_encoding == "zlib":
+        return zlib.decompress(body)
+    if zstandard is None:
+        raise ValueError("zstandard is required to decompress zstd messages")
+    return zstandard.ZstdDecompressor().decompress(body)
+
+
 def get_config_variable(
     env_var: str,
     yaml_path: List,
@@ -98,6 +180,309 @@ def create_ssl_context() -> ssl.SSLContext:
     return ssl_context
 
 
+def create_pika_parameters(connection: Dict) -> pika.ConnectionParameters:
+    """builds the parameters of a RabbitMQ connection
+
+    :param connection: `connection` section of the connector configuration
+    :type connection: Dict
+    """
+
+    return pika.ConnectionParameters(
+        host=connection["host"],
+        port=connection["port"],
+        virtual_host=connection["vhost"],
+        credentials=pika.PlainCredentials(connection["user"], connection["pass"]),
+        ssl_options=pika.SSLOptions(create_ssl_context(), connection["host"])
+        if connection["use_ssl"]
+        else None,
+    )
+
+
+def retry_delay(attempt: int) -> float:
+    """returns the delay before publishing a message again
+
+    :param attempt: number of the failed attempt, from 0
+    :type attempt: int
+    """
+
+    return min(PUBLISH_RETRY_DELAY * 2**attempt, PUBLISH_RETRY_MAX_DELAY)
+
+
+def supports_windowed_confirms() -> bool:
+    """checks that pika exposes the internals used by windowed confirms
+
+    `BlockingChannel` waits for the confirm of every delivery and has no
+    public API to leave several deliveries unconfirmed, `PushPublisher` uses
+    its underlying channel instead.
+
+    :return: whether the installed pika version can keep several deliveries
+        unconfirmed
+    :rtype: bool
+    """
+
+    try:
+        parameters = inspect.signature(pika.channel.Channel.confirm_delivery)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return (
+        "ack_nack_callback" in parameters.parameters
+        and hasattr(pika.channel.Channel, "basic_publish")
+        and hasattr(BlockingChannel, "_flush_output")
+    )
+
+
+class PushPublisher:
+    """A RabbitMQ connection and its channel, reconnected when lost
+
+    Like a pika channel, a publisher must only be used by one thread at a
+    time, `PublisherPool` hands them out exclusively.
+
+    With a `confirm_window`, the channel is in confirm mode and up to
+    `confirm_window` deliveries are left unconfirmed: confirms are awaited in
+    batches once the window is full, and nacked deliveries are published
+    again with a bounded backoff. Call `flush` to wait for all the confirms.
+    If the installed pika version does not expose the internals this relies
+    on, the publisher falls back to publishing without confirms.
+
+    :param parameters: parameters of the connection
+    :type parameters: pika.ConnectionParameters
+    :param confirm_window: maximum number of unconfirmed deliveries, 0 to
+        publish without confirms
+    :type confirm_window: int, optional
+    """
+
+    def __init__(
+        self, parameters: pika.ConnectionParameters, confirm_window: int = 0
+    ) -> None:
+        self.parameters = parameters
+        if confirm_window > 0 and not supports_windowed_confirms():
+            logging.warning(
+                "Publisher confirms are not supported by pika %s, "
+                "publishing without confirms",
+                pika.__version__,
+            )
+            confirm_window = 0
+        self.confirm_window = confirm_window
+        self.pika_connection = None
+        self.channel = None
+        self.delivery_tag = 0
+        # Unconfirmed deliveries by tag: (arguments of publish, attempt)
+        self.outstanding = {}
+        self.nacked = []
+
+    def connect(self) -> None:
+        """opens the connection and the channel if they are not open"""
+
+        if self.pika_connection is not None and self.pika_connection.is_open:
+            try:
+                # Serve the heartbeats missed while the publisher was idle
+                self.pika_connection.process_data_events(time_limit=0)
+            except pika.exceptions.AMQPError:
+                self.close()
+        if self.pika_connection is None or not self.pika_connection.is_open:
+            self.pika_connection = pika.BlockingConnection(self.parameters)
+            self.channel = None
+        if self.channel is None or not self.channel.is_open:
+            self.channel = self.pika_connection.channel()
+            if self.confirm_window > 0:
+                self.select_confirms()
+
+    def select_confirms(self) -> None:
+        # The blocking channel waits for the confirm of every delivery, its
+        # underlying channel is used to keep several deliveries unconfirmed,
+        # see `supports_windowed_confirms`
+        selected = []
+        self.delivery_tag = 0
+        self.channel._impl.confirm_delivery(
+            ack_nack_callback=self._on_delivery_confirmation,
+            callback=selected.append,
+        )
+        self._wait(lambda: len(selected) > 0)
+
+    def _wait(self, ready: Callable[[], bool]) -> None:
+        self.channel._flush_output(ready)
+        if not self.channel.is_open:
+            raise pika.exceptions.ChannelWrongStateError("Channel is closed")
+
+    def _on_delivery_confirmation(self, frame) -> None:
+        method = frame.method
+        if method.multiple:
+            tags = []
+            for tag in self.outstanding:
+                if tag > method.delivery_tag:
+                    break
+                tags.append(tag)
+        else:
+            tags = (
+                [method.delivery_tag] if method.delivery_tag in self.outstanding else []
+            )
+        for tag in tags:
+            message = self.outstanding.pop(tag)
+            if isinstance(method, pika.spec.Basic.Nack):
+                self.nacked.append(message)
+
+    def _publish(self, arguments: Dict, attempt: int) -> None:
+        tag = self.delivery_tag + 1
+        # Registered first so that the delivery is published again if lost
+        self.outstanding[tag] = (arguments, attempt)
+        self.delivery_tag = tag
+        self.channel._impl.basic_publish(**arguments)
+
+    def _recover(self, error: Exception) -> None:
+        logging.warning("Connection to RabbitMQ lost, reconnecting...%s", error)
+        messages = list(self.outstanding.values()) + self.nacked
+        self.close()
+        self.connect()
+        for arguments, attempt in messages:
+            self._publish(arguments, attempt)
+
+    def wait_for_confirms(self, limit: int = 0) -> None:
+        """waits until at most `limit` deliveries are unconfirmed
+
+        :param limit: number of deliveries left unconfirmed
+        :type limit: int, optional
+        :raises NackError: if a delivery is still nacked after
+            `PUBLISH_RETRIES` attempts
+        """
+
+        while True:
+            self._wait(lambda: len(self.outstanding) <= limit or len(self.nacked) > 0)
+            if len(self.nacked) > 0:
+                nacked = self.nacked
+                self.nacked = []
+                attempt = max(message_attempt for _, message_attempt in nacked) + 1
+                if attempt >= PUBLISH_RETRIES:
+                    raise NackError([arguments["body"] for arguments, _ in nacked])
+                logging.error("Unable to send %d bundles, retry...", len(nacked))
+                time.sleep(retry_delay(attempt - 1))
+                for arguments, message_attempt in nacked:
+                    self._publish(arguments, message_attempt + 1)
+            elif len(self.outstanding) <= limit:
+                return
+
+    def basic_publish(self, **kwargs) -> None:
+        """publishes a message, reconnecting once if the connection is lost
+
+        :param `**kwargs`: arguments of `BlockingChannel.basic_publish`
+        """
+
+        self.connect()
+        try:
+            if self.confirm_window > 0:
+                self._publish(kwargs, 0)
+                if len(self.outstanding) >= self.confirm_window:
+                    self.wait_for_confirms(self.confirm_window // 2)
+            else:
+                self.channel.basic_publish(**kwargs)
+        except (UnroutableError, NackError):
+            raise
+        except (
+            pika.exceptions.AMQPConnectionError,
+            pika.exceptions.AMQPChannelError,
+        ) as e:
+            if self.confirm_window > 0:
+                self._recover(e)
+            else:
+                logging.warning("Connection to RabbitMQ lost, reconnecting...%s", e)
+                self.close()
+                self.connect()
+                self.channel.basic_publish(**kwargs)
+
+    def flush(self) -> None:
+        """waits for the confirms of all the published messages"""
+
+        if len(self.outstanding) == 0 and len(self.nacked) == 0:
+            return
+        try:
+            self.wait_for_confirms()
+        except (UnroutableError, NackError):
+            raise
+        except (
+            pika.exceptions.AMQPConnectionError,
+            pika.exceptions.AMQPChannelError,
+        ) as e:
+            self._recover(e)
+            self.wait_for_confirms()
+
+    def close(self) -> None:
+        try:
+            if self.pika_connection is not None and self.pika_connection.is_open:
+                self.pika_connection.close()
+        except pika.exceptions.AMQPError:
+            pass
+        self.pika_connection = None
+        self.channel = None
+        self.outstanding = {}
+        self.nacked = []
+
+
+class PublisherPool:
+    """Pool of long-lived publishers shared by the threads of a connector
+
+    Publishers are created on demand up to `size`, then threads wait for a
+    publisher to be released.
+
+    :param parameters: parameters of the connections
+    :type parameters: pika.ConnectionParameters
+    :param size: maximum number of connections
+    :type size: int
+    :param confirm_window: maximum number of unconfirmed deliveries per
+        publisher, 0 to publish without confirms
+    :type confirm_window: int, optional
+    """
+
+    def __init__(
+        self,
+        parameters: pika.ConnectionParameters,
+        size: int,
+        confirm_window: int = 0,
+    ) -> None:
+        self.parameters = parameters
+        self.size = max(1, size)
+        self.confirm_window = confirm_window
+        self.publishers = []
+        self.idle_publishers = Queue()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> PushPublisher:
+        try:
+            return self.idle_publishers.get(block=False)
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.publishers) < self.size:
+                publisher = PushPublisher(self.parameters, self.confirm_window)
+                self.publishers.append(publisher)
+                return publisher
+        return self.idle_publishers.get()
+
+    def release(self, publisher: PushPublisher) -> None:
+        self.idle_publishers.put(publisher)
+
+    @contextmanager
+    def publisher(self) -> Iterator[PushPublisher]:
+        """borrows a publisher of the pool
+
+        :return: a publisher, used like a channel
+        :rtype: PushPublisher
+        """
+
+        publisher = self.acquire()
+        try:
+            yield publisher
+        except pika.exceptions.AMQPError:
+            # Do not reuse a connection in an unknown state
+            publisher.close()
+            raise
+        finally:
+            self.release(publisher)
+
+    def close(self) -> None:
+        with self.lock:
+            for publisher in self.publishers:
+                publisher.close()
+
+
 class ListenQueue(threading.Thread):
     """Main class for the ListenQueue used in OpenCTIConnectorHelper
 
@@ -107,9 +492,11 @@ class ListenQueue(threading.Thread):
     :type config: Dict
     :param callback: callback function to process queue
     :type callback: callable
+    :param max_workers: number of messages processed concurrently
+    :type max_workers: int, optional
     """
 
-    def __init__(self, helper, config: Dict, callback) -> None:
+    def __init__(self, helper, config: Dict, callback, max_workers: int = 1) -> None:
         threading.Thread.__init__(self)
         self.pika_credentials = None
         self.pika_parameters = None
@@ -124,47 +511,82 @@ class ListenQueue(threading.Thread):
         self.user = config["connection"]["user"]
         self.password = config["connection"]["pass"]
         self.queue_name = config["listen"]
+        self.max_workers = max(1, max_workers)
+        self.executor = self.create_executor()
         self.exit_event = threading.Event()
-        self.thread = None
+
+    def create_executor(self) -> Optional[ThreadPoolExecutor]:
+        """creates the pool of workers processing the messages
+
+        :return: the pool, or None if the messages are not processed by threads
+        :rtype: ThreadPoolExecutor
+        """
+
+        return ThreadPoolExecutor(max_workers=self.max_workers)
 
     # noinspection PyUnusedLocal
     def _process_message(self, channel, method, properties, body) -> None:
         """process a message from the rabbit queue
 
+        The message is handled by the pool of workers, the consumer thread
+        keeps serving the connection meanwhile.
+
         :param channel: channel instance
         :type channel: callable
         :param method: message methods
         :type method: callable
-        :param properties: unused
-        :type properties: str
+        :param properties: message properties
+        :type properties: pika.BasicProperties
         :param body: message body (data)
         :type body: str or bytes or bytearray
         """
 
-        json_data = json.loads(body)
-        channel.basic_ack(delivery_tag=method.delivery_tag)
-        self.thread = threading.Thread(target=self._data_handler, args=[json_data])
-        self.thread.start()
-        five_minutes = 60 * 5
-        time_wait = 0
-        while self.thread.is_alive():  # Loop while the thread is processing
-            if (
-                self.helper.work_id is not None and time_wait > five_minutes
-            ):  # Ping every 5 minutes
-                self.helper.api.work.ping(self.helper.work_id)
-                time_wait = 0
-            else:
-                time_wait += 1
-            time.sleep(1)
+        json_data = json.loads(decompress_message(body, properties.content_encoding))
+        self.executor.submit(
+            self._process_job,
+            channel.connection,
+            channel,
+            method.delivery_tag,
+            json_data,
+        )
 
+    def _process_job(self, connection, channel, delivery_tag, json_data) -> None:
+        # Ack when the job starts, the prefetch bounds the waiting messages
+        try:
+            connection.add_callback_threadsafe(
+                functools.partial(self._ack_message, channel, delivery_tag)
+            )
+        except pika.exceptions.AMQPError as e:
+            logging.error("Unable to ack message, it will be redelivered...%s", e)
+            return
+        done = threading.Event()
+        ping = threading.Thread(
+            target=self._ping_work, args=[json_data["internal"]["work_id"], done]
+        )
+        ping.start()
+        try:
+            self._data_handler(json_data)
+        finally:
+            done.set()
         logging.info(
             "%s",
-            (
-                f"Message (delivery_tag={method.delivery_tag}) processed"
-                ", thread terminated"
-            ),
+            f"Message (delivery_tag={delivery_tag}) processed, job terminated",
         )
 
+    @staticmethod
+    def _ack_message(channel, delivery_tag) -> None:
+        if channel.is_open:
+            channel.basic_ack(delivery_tag=delivery_tag)
+
+    def _ping_work(self, work_id, done: threading.Event) -> None:
+        # Ping every 5 minutes while the job is processing
+        while not done.wait(WORK_PING_INTERVAL):
+            if work_id is not None:
+                try:
+                    self.helper.api.work.ping(work_id)
+                except Exception:  # pylint: disable=broad-except
+                    logging.error("Error pinging the work")
+
     def _data_handler(self, json_data) -> None:
         # Set the API headers
         work_id = json_data["internal"]["work_id"]
@@ -204,6 +626,7 @@ class ListenQueue(threading.Thread):
                 self.pika_connection = pika.BlockingConnection(self.pika_parameters)
                 self.channel = self.pika_connection.channel()
                 assert self.channel is not None
+                self.channel.basic_qos(prefetch_count=self.max_workers)
                 self.channel.basic_consume(
                     queue=self.queue_name, on_message_callback=self._process_message
                 )
@@ -217,47 +640,83 @@ class ListenQueue(threading.Thread):
 
     def stop(self):
         self.exit_event.set()
-        if self.thread:
-            self.thread.join()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
 
 
 class PingAlive(threading.Thread):
-    def __init__(self, connector_id, api, get_state, set_state) -> None:
+    """Pings the connector with its state
+
+    The connector is pinged every `PING_INTERVAL` seconds. With a
+    `flush_interval`, the state is also pushed at this interval when its
+    version changed since the last ping.
+    """
+
+    def __init__(
+        self,
+        connector_id,
+        api,
+        get_state,
+        set_state,
+        get_state_version: Optional[Callable[[], int]] = None,
+        flush_interval: Optional[int] = None,
+    ) -> None:
         threading.Thread.__init__(self)
         self.connector_id = connector_id
         self.in_error = False
         self.api = api
         self.get_state = get_state
         self.set_state = set_state
+        self.get_state_version = get_state_version
+        self.flush_interval = flush_interval
         self.exit_event = threading.Event()
 
     def ping(self) -> None:
+        last_ping = None
+        pinged_version = None
         while not self.exit_event.is_set():
-            try:
-                initial_state = self.get_state()
-                result = self.api.connector.ping(self.connector_id, initial_state)
-                remote_state = (
-                    json.loads(result["connector_state"])
-                    if result["connector_state"] is not None
-                    and len(result["connector_state"]) > 0
-                    else None
+            version = (
+                self.get_state_version() if self.get_state_version is not None else None
+            )
+            if (
+                last_ping is None
+                or time.monotonic() - last_ping >= PING_INTERVAL
+                or version != pinged_version
+            ):
+                last_ping = time.monotonic()
+                pinged_version = self._ping(version)
+            self.exit_event.wait(
+                PING_INTERVAL if self.flush_interval is None else self.flush_interval
+            )
+
+    def _ping(self, version: Optional[int]) -> Optional[int]:
+        try:
+            initial_state = self.get_state()
+            result = self.api.connector.ping(self.connector_id, initial_state)
+            remote_state = (
+                json.loads(result["connector_state"])
+                if result["connector_state"] is not None
+                and len(result["connector_state"]) > 0
+                else None
+            )
+            if initial_state != remote_state:
+                self.set_state(result["connector_state"])
+                logging.info(
+                    "%s",
+                    (
+                        "Connector state has been remotely reset to: "
+                        f'"{self.get_state()}"'
+                    ),
                 )
-                if initial_state != remote_state:
-                    self.set_state(result["connector_state"])
-                    logging.info(
-                        "%s",
-                        (
-                            "Connector state has been remotely reset to: "
-                            f'"{self.get_state()}"'
-                        ),
-                    )
-                if self.in_error:
-                    self.in_error = False
-                    logging.error("API Ping back to normal")
-            except Exception:  # pylint: disable=broad-except
-                self.in_error = True
-                logging.error("Error pinging the API")
-            self.exit_event.wait(40)
+                if self.get_state_version is not None:
+                    version = self.get_state_version()
+            if self.in_error:
+                self.in_error = False
+                logging.error("API Ping back to normal")
+        except Exception:  # pylint: disable=broad-except
+            self.in_error = True
+            logging.error("Error pinging the API")
+        return version
 
     def run(self) -> None:
         logging.info("Starting ping alive thread")
@@ -299,6 +758,57 @@ class StreamAlive(threading.Thread):
         self.exit_event.set()
 
 
+class StreamOffsetTracker:
+    """Tracks the stream events in progress to commit the stream offset
+
+    Events are registered in stream order and completed in any order, the
+    committed offset is the id of the last event such that it and all the
+    events before it are completed.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sequence = 0
+        # Events in progress or waiting for older events, in stream order
+        self.events = {}
+        self.committed = None
+
+    def start(self, event_id: str) -> int:
+        """registers an event
+
+        :param event_id: id of the event in the stream
+        :type event_id: str
+        :return: the sequence number of the event, to complete it
+        :rtype: int
+        """
+        with self.lock:
+            self.sequence += 1
+            self.events[self.sequence] = [event_id, False]
+            return self.sequence
+
+    def complete(self, sequence: int) -> Optional[str]:
+        """completes an event
+
+        :param sequence: sequence number returned by `start`
+        :type sequence: int
+        :return: the new committed offset, or None if it did not change
+        :rtype: str
+        """
+        with self.lock:
+            self.events[sequence][1] = True
+            committed = None
+            while len(self.events) > 0:
+                oldest = next(iter(self.events))
+                event_id, completed = self.events[oldest]
+                if not completed:
+                    break
+                del self.events[oldest]
+                committed = event_id
+            if committed is not None:
+                self.committed = committed
+            return committed
+
+
 class ListenStream(threading.Thread):
     def __init__(
         self,
@@ -313,10 +823,18 @@ class ListenStream(threading.Thread):
         no_dependencies,
         recover_iso_date,
         with_inferences,
+        batch_size=None,
+        max_latency=None,
+        workers=None,
     ) -> None:
         threading.Thread.__init__(self)
         self.helper = helper
         self.callback = callback
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.workers = workers
+        if workers is not None and workers > 1 and batch_size is not None:
+            raise ValueError("Stream workers cannot be used with batches")
         self.url = url
         self.token = token
         self.verify_ssl = verify_ssl
@@ -395,27 +913,152 @@ class ListenStream(threading.Thread):
                 verify=self.verify_ssl,
             )
             # Iter on stream messages
-            for msg in messages:
-                if self.exit:
-                    stream_alive.stop()
-                    break
-                if msg.id is not None:
-                    try:
-                        q.put(msg.event, block=False)
-                    except queue.Full:
-                        pass
-                    if msg.event == "heartbeat" or msg.event == "connected":
-                        state = self.helper.get_state()
-                        state["start_from"] = str(msg.id) + "-0"
-                        self.helper.set_state(state)
-                    else:
-                        self.callback(msg)
-                        state = self.helper.get_state()
-                        state["start_from"] = str(msg.id) + "-0"
-                        self.helper.set_state(state)
+            self.process_messages(messages, q)
+            if self.exit:
+                stream_alive.stop()
         except:
             sys.excepthook(*sys.exc_info())
 
+    def process_messages(self, messages, q: Queue) -> None:
+        """calls the callback with the stream messages and advances the state
+
+        With a `batch_size`, the callback receives lists of messages, called
+        when the batch is full or, when a message arrives, when the oldest
+        message of the batch waited `max_latency` seconds. The state only
+        advances after the batch is processed.
+
+        :param messages: stream messages
+        :param q: queue notified of every message
+        :type q: Queue
+        """
+
+        if self.workers is not None and self.workers > 1:
+            self.process_messages_in_workers(messages, q)
+            return
+        batch = []
+        batch_start = None
+        for msg in messages:
+            if self.exit:
+                break
+            if msg.id is None:
+                continue
+            try:
+                q.put(msg.event, block=False)
+            except queue.Full:
+                pass
+            if msg.event == "heartbeat" or msg.event == "connected":
+                if len(batch) == 0:
+                    self.helper.update_state({"start_from": str(msg.id) + "-0"})
+            elif self.batch_size is None:
+                self.callback(msg)
+                self.helper.update_state({"start_from": str(msg.id) + "-0"})
+            else:
+                if len(batch) == 0:
+                    batch_start = time.monotonic()
+                batch.append(msg)
+            if len(batch) > 0 and (
+                len(batch) >= self.batch_size
+                or (
+                    self.max_latency is not None
+                    and time.monotonic() - batch_start >= self.max_latency
+                )
+            ):
+                self.callback(batch)
+                batch = []
+                self.helper.update_state({"start_from": str(msg.id) + "-0"})
+        if len(batch) > 0:
+            self.callback(batch)
+            self.helper.update_state({"start_from": str(batch[-1].id) + "-0"})
+
+    @staticmethod
+    def partition_key(msg) -> str:
+        """returns the id of the entity of a stream message
+
+        :param msg: stream message
+        :return: the entity id, or the message id if not found
+        :rtype: str
+        """
+        try:
+            return json.loads(msg.data)["data"]["id"]
+        except:  # pylint: disable=bare-except  # noqa: E722
+            return str(msg.id)
+
+    def process_messages_in_workers(self, messages, q: Queue) -> None:
+        """calls the callback with the stream messages in a pool of workers
+
+        Messages are routed to the workers by the hash of their entity id, so
+        the messages of an entity are processed in order. The state advances
+        to the last message processed along with all the previous ones.
+        When a callback raises, the stream stops being read, the workers skip
+        their remaining messages and the error is raised once they stopped.
+
+        :param messages: stream messages
+        :param q: queue notified of every message
+        :type q: Queue
+        """
+
+        tracker = StreamOffsetTracker()
+        worker_queues = [
+            Queue(maxsize=STREAM_WORKER_QUEUE_SIZE) for _ in range(self.workers)
+        ]
+
+        def commit(sequence: int) -> None:
+            committed = tracker.complete(sequence)
+            if committed is not None:
+                self.helper.update_state({"start_from": committed})
+
+        errors = []
+        failed = threading.Event()
+
+        def work(worker_queue: Queue) -> None:
+            # Keeps consuming after a failure so puts to the queue never block
+            while True:
+                item = worker_queue.get()
+                if item is None:
+                    return
+                if failed.is_set():
+                    continue
+                sequence, msg = item
+                try:
+                    self.callback(msg)
+                except:  # pylint: disable=bare-except  # noqa: E722
+                    errors.append(sys.exc_info()[1])
+                    failed.set()
+                    continue
+                commit(sequence)
+
+        threads = [
+            threading.Thread(target=work, args=[worker_queue], daemon=True)
+            for worker_queue in worker_queues
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for msg in messages:
+                if self.exit or failed.is_set():
+                    break
+                if msg.id is None:
+                    continue
+                try:
+                    q.put(msg.event, block=False)
+                except queue.Full:
+                    pass
+                sequence = tracker.start(str(msg.id) + "-0")
+                if msg.event == "heartbeat" or msg.event == "connected":
+                    commit(sequence)
+                else:
+                    partition = zlib.crc32(
+                        self.partition_key(msg).encode("utf-8")
+                    ) % len(worker_queues)
+                    worker_queues[partition].put((sequence, msg))
+        finally:
+            for worker_queue in worker_queues:
+                worker_queue.put(None)
+            for thread in threads:
+                thread.join()
+        if len(errors) > 0:
+            raise errors[0]
+
     def stop(self):
         self.exit = True
         self.exit_event.set()
@@ -487,6 +1130,12 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             ["connector", "live_stream_start_timestamp"],
             config,
         )
+        self.connect_live_stream_workers = get_config_variable(
+            "CONNECTOR_LIVE_STREAM_WORKERS",
+            ["connector", "live_stream_workers"],
+            config,
+            True,
+        )
         self.connect_name = get_config_variable(
             "CONNECTOR_NAME", ["connector", "name"], config
         )
@@ -526,6 +1175,64 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             False,
             False,
         )
+        self.connect_split_max_objects = get_config_variable(
+            "CONNECTOR_SPLIT_MAX_OBJECTS",
+            ["connector", "split_max_objects"],
+            config,
+            True,
+            1,
+        )
+        self.connect_split_max_size = get_config_variable(
+            "CONNECTOR_SPLIT_MAX_SIZE",
+            ["connector", "split_max_size"],
+            config,
+            True,
+        )
+        self.connect_serialization_processes = get_config_variable(
+            "CONNECTOR_SERIALIZATION_PROCESSES",
+            ["connector", "serialization_processes"],
+            config,
+            True,
+        )
+        self.connect_publisher_pool_size = get_config_variable(
+            "CONNECTOR_PUBLISHER_POOL_SIZE",
+            ["connector", "publisher_pool_size"],
+            config,
+            True,
+            2,
+        )
+        self.connect_state_flush_interval = get_config_variable(
+            "CONNECTOR_STATE_FLUSH_INTERVAL",
+            ["connector", "state_flush_interval"],
+            config,
+            True,
+        )
+        self.connect_queue_threads = get_config_variable(
+            "CONNECTOR_QUEUE_THREADS",
+            ["connector", "queue_threads"],
+            config,
+            True,
+            1,
+        )
+        self.connect_message_compression = get_config_variable(
+            "CONNECTOR_MESSAGE_COMPRESSION",
+            ["connector", "message_compression"],
+            config,
+        )
+        if self.connect_message_compression is not None and (
+            self.connect_message_compression not in MESSAGE_COMPRESSIONS
+            or (self.connect_message_compression == "zstd" and zstandard is None)
+        ):
+            raise ValueError(
+                f"Unsupported message compression: {self.connect_message_compression}"
+            )
+        self.connect_publish_confirm_window = get_config_variable(
+            "CONNECTOR_PUBLISH_CONFIRM_WINDOW",
+            ["connector", "publish_confirm_window"],
+            config,
+            True,
+            0,
+        )
 
         # Configure logger
         numeric_level = getattr(
@@ -554,15 +1261,36 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         connector_configuration = self.api.connector.register(self.connector)
         logging.info("%s", f"Connector registered with ID: {self.connect_id}")
         self.connector_id = connector_configuration["id"]
+        # Work and applicant of the messages processed by the queue workers
+        self.message_context = threading.local()
+        self.default_work_id = None
+        self.default_applicant_id = None
         self.work_id = None
         self.applicant_id = connector_configuration["connector_user"]["id"]
-        self.connector_state = connector_configuration["connector_state"]
+        # Live state, serialized only when pushed to the API
+        self.state_lock = threading.RLock()
+        self.state_version = 0
+        self.connector_state = None
+        try:
+            self.set_state(json.loads(connector_configuration["connector_state"]))
+        except:  # pylint: disable=bare-except  # noqa: E722
+            pass
         self.config = connector_configuration["config"]
+        self.publisher_pool = PublisherPool(
+            create_pika_parameters(self.config["connection"]),
+            self.connect_publisher_pool_size,
+            self.connect_publish_confirm_window,
+        )
 
         # Start ping thread
         if not self.connect_run_and_terminate:
             self.ping = PingAlive(
-                self.connector.id, self.api, self.get_state, self.set_state
+                self.connector.id,
+                self.api,
+                self.get_state,
+                self.set_state,
+                self.get_state_version,
+                self.connect_state_flush_interval,
             )
             self.ping.start()
 
@@ -574,9 +1302,35 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             self.listen_queue.stop()
         # if self.listen_stream:
         #     self.listen_stream.stop()
-        self.ping.stop()
+        try:
+            # Run and terminate connectors do not ping
+            if getattr(self, "ping", None):
+                self.ping.stop()
+        finally:
+            self.publisher_pool.close()
         self.api.connector.unregister(self.connector_id)
 
+    @property
+    def work_id(self) -> Optional[str]:
+        """work of the message processed by the current thread, or the last
+        set work outside of the queue workers
+        """
+        return getattr(self.message_context, "work_id", self.default_work_id)
+
+    @work_id.setter
+    def work_id(self, work_id: Optional[str]) -> None:
+        self.message_context.work_id = work_id
+        self.default_work_id = work_id
+
+    @property
+    def applicant_id(self) -> Optional[str]:
+        return getattr(self.message_context, "applicant_id", self.default_applicant_id)
+
+    @applicant_id.setter
+    def applicant_id(self, applicant_id: Optional[str]) -> None:
+        self.message_context.applicant_id = applicant_id
+        self.default_applicant_id = applicant_id
+
     def get_name(self) -> Optional[Union[bool, int, str]]:
         return self.connect_name
 
@@ -595,27 +1349,46 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         :param state: state object
         :type state: Dict or None
         """
-        if isinstance(state, Dict):
-            self.connector_state = json.dumps(state)
-        else:
-            self.connector_state = None
+        with self.state_lock:
+            if isinstance(state, Dict):
+                self.connector_state = copy.deepcopy(state)
+            else:
+                self.connector_state = None
+            self.state_version += 1
+
+    def update_state(self, values: Dict) -> None:
+        """updates keys of the connector state, safe to call from any thread
+
+        :param values: keys and values to set in the state
+        :type values: Dict
+        """
+        with self.state_lock:
+            if self.connector_state is None:
+                self.connector_state = {}
+            self.connector_state.update(copy.deepcopy(values))
+            self.state_version += 1
 
     def get_state(self) -> Optional[Dict]:
         """get the connector state
 
-        :return: returns the current state of the connector if there is any
+        :return: returns a deep copy of the current state of the connector if
+            there is any
         :rtype:
         """
 
-        try:
+        with self.state_lock:
             if self.connector_state:
-                state = json.loads(self.connector_state)
-                if isinstance(state, Dict) and state:
-                    return state
-        except:  # pylint: disable=bare-except  # noqa: E722
-            pass
+                return copy.deepcopy(self.connector_state)
         return None
 
+    def get_state_version(self) -> int:
+        """get the number of changes of the connector state
+
+        :return: returns a number increased by every change of the state
+        :rtype: int
+        """
+        return self.state_version
+
     def force_ping(self):
         try:
             initial_state = self.get_state()
@@ -638,7 +1411,9 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         :type message_callback: Callable[[Dict], str]
         """
 
-        self.listen_queue = ListenQueue(self, self.config, message_callback)
+        self.listen_queue = ListenQueue(
+            self, self.config, message_callback, self.connect_queue_threads
+        )
         self.listen_queue.start()
 
     def listen_stream(
@@ -653,10 +1428,23 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         no_dependencies=None,
         recover_iso_date=None,
         with_inferences=None,
+        batch_size=None,
+        max_latency=None,
+        workers=None,
     ) -> ListenStream:
         """listen for messages and register callback function
 
-        :param message_callback: callback function to process messages
+        :param message_callback: callback function to process messages, or
+            lists of messages with a `batch_size`
+        :param batch_size: maximum number of messages passed at once to the
+            callback, defaults to calling it with every message
+        :type batch_size: int, optional
+        :param max_latency: maximum seconds a message waits for its batch to
+            be full, checked when messages arrive
+        :type max_latency: float, optional
+        :param workers: number of threads processing the messages, ordered
+            per entity, defaults to the `live_stream_workers` setting
+        :type workers: int, optional
         """
         # URL
         if url is None:
@@ -705,6 +1493,9 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             and self.connect_live_stream_recover_iso_date is not None
         ):
             recover_iso_date = self.connect_live_stream_recover_iso_date
+        # Workers, batches are processed in order by a single thread
+        if workers is None and batch_size is None:
+            workers = self.connect_live_stream_workers
         # Generate the stream URL
         url = url + "/stream"
         if live_stream_id is not None:
@@ -721,6 +1512,9 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             no_dependencies,
             recover_iso_date,
             with_inferences,
+            batch_size,
+            max_latency,
+            workers,
         )
         self.listen_stream.start()
         return self.listen_stream
@@ -780,8 +1574,21 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         :type entities_types: list, optional
         :param update: whether to updated data in the database, defaults to False
         :type update: bool, optional
+        :param split_max_objects: maximum number of objects per sent bundle,
+            defaults to the `split_max_objects` setting of the connector
+        :type split_max_objects: int, optional
+        :param split_max_size: maximum size in bytes of the objects of a sent
+            bundle, defaults to the `split_max_size` setting of the connector
+        :type split_max_size: int, optional
+        :param serialization_processes: number of processes serializing and
+            encoding the bundles while they are sent, defaults to the
+            `serialization_processes` setting of the connector
+        :type serialization_processes: int, optional
+        :param return_bundles: whether to keep the sent bundles to return
+            them, defaults to True
+        :type return_bundles: bool, optional
         :raises ValueError: if the bundle is empty
-        :return: list of bundles
+        :return: list of bundles, empty if `return_bundles` is False
         :rtype: list
         """
         work_id = kwargs.get("work_id", self.work_id)
@@ -792,6 +1599,19 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         bypass_validation = kwargs.get("bypass_validation", False)
         entity_id = kwargs.get("entity_id", None)
         file_name = kwargs.get("file_name", None)
+        split_max_objects = kwargs.get(
+            "split_max_objects", self.connect_split_max_objects
+        )
+        split_max_size = kwargs.get("split_max_size", self.connect_split_max_size)
+        return_bundles = kwargs.get("return_bundles", True)
+        serialization_processes = kwargs.get(
+            "serialization_processes", self.connect_serialization_processes
+        )
+        parallel_serialization = (
+            not bypass_split
+            and serialization_processes is not None
+            and serialization_processes > 1
+        )
 
         if not file_name and work_id:
             file_name = f"{work_id}.json"
@@ -810,49 +1630,67 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
 
         if bypass_split:
             bundles = [bundle]
+            nb_bundles = 1
         else:
+            # Bundles are serialized while they are sent
+            if parallel_serialization:
+                # The split bundles stay dicts until the processes encode them
+                try:
+                    bundle_data = json.loads(bundle)
+                except ValueError:
+                    raise Exception("File data is not a valid JSON")
+            else:
+                bundle_data = bundle
             stix2_splitter = OpenCTIStix2Splitter()
-            bundles = stix2_splitter.split_bundle(bundle, True, event_version)
+            bundles = stix2_splitter.iter_split_bundle(
+                bundle_data,
+                not parallel_serialization,
+                event_version,
+                split_max_objects,
+                split_max_size,
+            )
+            nb_bundles = stix2_splitter.nb_bundles
+            if stix2_splitter.duplicates > 0:
+                self.log_info(
+                    "Dropped "
+                    + str(stix2_splitter.duplicates)
+                    + " superseded versions of repeated objects"
+                )
 
-        if len(bundles) == 0:
+        if nb_bundles == 0:
             raise ValueError("Nothing to import")
 
         if work_id:
-            self.api.work.add_expectations(work_id, len(bundles))
-
-        pika_credentials = pika.PlainCredentials(
-            self.config["connection"]["user"], self.config["connection"]["pass"]
-        )
-        pika_parameters = pika.ConnectionParameters(
-            host=self.config["connection"]["host"],
-            port=self.config["connection"]["port"],
-            virtual_host=self.config["connection"]["vhost"],
-            credentials=pika_credentials,
-            ssl_options=pika.SSLOptions(
-                create_ssl_context(), self.config["connection"]["host"]
-            )
-            if self.config["connection"]["use_ssl"]
-            else None,
-        )
+            self.api.work.add_expectations(work_id, nb_bundles)
 
-        pika_connection = pika.BlockingConnection(pika_parameters)
-        channel = pika_connection.channel()
-        for sequence, bundle in enumerate(bundles, start=1):
-            self._send_bundle(
-                channel,
-                bundle,
-                work_id=work_id,
-                entities_types=entities_types,
-                sequence=sequence,
-                update=update,
+        if parallel_serialization:
+            encoded_bundles = OpenCTIStix2Splitter.serialize_bundles(
+                bundles, encode_bundle, serialization_processes
             )
-        channel.close()
-        return bundles
+        else:
+            encoded_bundles = ((bundle, None) for bundle in bundles)
+
+        sent_bundles = []
+        with self.publisher_pool.publisher() as publisher:
+            for sequence, (bundle, content) in enumerate(encoded_bundles, start=1):
+                self._send_bundle(
+                    publisher,
+                    bundle,
+                    work_id=work_id,
+                    entities_types=entities_types,
+                    sequence=sequence,
+                    update=update,
+                    content=content,
+                )
+                if return_bundles:
+                    sent_bundles.append(bundle)
+            publisher.flush()
+        return sent_bundles
 
     def _send_bundle(self, channel, bundle, **kwargs) -> None:
         """send a STIX2 bundle to RabbitMQ to be consumed by workers
 
-        :param channel: RabbitMQ channel
+        :param channel: RabbitMQ channel or publisher
         :type channel: callable
         :param bundle: valid stix2 bundle
         :type bundle:
@@ -860,14 +1698,19 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
         :type entities_types: list, optional
         :param update: whether to update data in the database, defaults to False
         :type update: bool, optional
+        :param content: base64 encoding of the bundle if already encoded
+        :type content: str, optional
         """
         work_id = kwargs.get("work_id", None)
         sequence = kwargs.get("sequence", 0)
         update = kwargs.get("update", False)
         entities_types = kwargs.get("entities_types", None)
+        content = kwargs.get("content", None)
 
         if entities_types is None:
             entities_types = []
+        if content is None:
+            content = base64.b64encode(bundle.encode("utf-8", "escape")).decode("utf-8")
 
         # Validate the STIX 2 bundle
         # validation = validate_string(bundle)
@@ -881,28 +1724,37 @@ class OpenCTIConnectorHelper:  # pylint: disable=too-many-public-methods
             "applicant_id": self.applicant_id,
             "action_sequence": sequence,
             "entities_types": entities_types,
-            "content": base64.b64encode(bundle.encode("utf-8", "escape")).decode(
-                "utf-8"
-            ),
+            "content": content,
             "update": update,
         }
         if work_id is not None:
             message["work_id"] = work_id
 
         # Send the message
-        try:
-            routing_key = "push_routing_" + self.connector_id
-            channel.basic_publish(
-                exchange=self.config["push_exchange"],
-                routing_key=routing_key,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  # make message persistent
-                ),
-            )
-        except (UnroutableError, NackError) as e:
-            logging.error("Unable to send bundle, retry...%s", e)
-            self._send_bundle(channel, bundle, **kwargs)
+        routing_key = "push_routing_" + self.connector_id
+        body = compress_message(
+            json.dumps(message).encode("utf-8"), self.connect_message_compression
+        )
+        # A publisher with a confirm window publishes the nacked deliveries
+        # again itself, and its errors may be about an earlier delivery
+        attempts = 1 if getattr(channel, "confirm_window", 0) > 0 else PUBLISH_RETRIES
+        for attempt in range(attempts):
+            try:
+                channel.basic_publish(
+                    exchange=self.config["push_exchange"],
+                    routing_key=routing_key,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,  # make message persistent
+                        content_encoding=self.connect_message_compression,
+                    ),
+                )
+                return
+            except (UnroutableError, NackError) as e:
+                if attempt + 1 >= attempts:
+                    raise
+                logging.error("Unable to send bundle, retry...%s", e)
+                time.sleep(retry_delay(attempt))
 
     def stix2_get_embedded_objects(self, item) -> Dict:
         """gets created and marking refs for a stix2 item
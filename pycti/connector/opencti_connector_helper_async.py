@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import pika
+
+from pycti.connector.opencti_connector_helper import (
+    WORK_PING_INTERVAL,
+    ListenQueue,
+    OpenCTIConnectorHelper,
+    decompress_message,
+)
+
+# Number of threads running the blocking calls of the coroutines
+BLOCKING_WORKERS = 16
+
+# Work and applicant of the message processed by the current task
+message_context: contextvars.ContextVar = contextvars.ContextVar(
+    "message_context", default=(None, None)
+)
+
+
+class AsyncListenQueue(ListenQueue):
+    """ListenQueue processing every message as a task of an event loop
+
+    No thread waits for the tasks: the prefetch of the channel bounds the
+    number of messages processed at once, and a message is acked when its
+    task is done.
+
+    :param async_helper: instance of a `OpenCTIAsyncConnectorHelper` class
+    :type async_helper: OpenCTIAsyncConnectorHelper
+    :param config: dict containing client config
+    :type config: Dict
+    :param callback: coroutine function to process queue
+    :type callback: Callable[[Dict], Awaitable[str]]
+    :param max_tasks: number of messages processed concurrently
+    :type max_tasks: int, optional
+    """
+
+    def __init__(
+        self, async_helper, config: Dict, callback, max_tasks: int = 1
+    ) -> None:
+        super().__init__(async_helper.helper, config, callback, max_tasks)
+        self.async_helper = async_helper
+
+    def create_executor(self) -> None:
+        # Messages are processed as tasks of the event loop of the helper
+        return None
+
+    # noinspection PyUnusedLocal
+    def _process_message(self, channel, method, properties, body) -> None:
+        json_data = json.loads(decompress_message(body, properties.content_encoding))
+        future = asyncio.run_coroutine_threadsafe(
+            self.async_helper.process_message(self.callback, json_data),
+            self.async_helper.loop,
+        )
+        future.add_done_callback(
+            functools.partial(
+                self._on_job_done, channel.connection, channel, method.delivery_tag
+            )
+        )
+
+    def _on_job_done(self, connection, channel, delivery_tag, future: Future) -> None:
+        try:
+            connection.add_callback_threadsafe(
+                functools.partial(self._ack_message, channel, delivery_tag)
+            )
+        except pika.exceptions.AMQPError as e:
+            logging.error("Unable to ack message, it will be redelivered...%s", e)
+            return
+        logging.info(
+            "%s",
+            f"Message (delivery_tag={delivery_tag}) processed, job terminated",
+        )
+
+
+class OpenCTIAsyncConnectorHelper:
+    """Python API for OpenCTI connector with coroutine callbacks
+
+    Callbacks run as tasks of a single event loop, owned by the helper, so a
+    connector can await many external lookups concurrently. Up to
+    `CONNECTOR_QUEUE_THREADS` messages are processed at once, without a
+    thread per message. The blocking calls of the helper and of its API
+    client are run in a pool of threads with `run_blocking`.
+
+    :param config: dict standard config
+    :type config: Dict
+    :param blocking_workers: number of threads running blocking calls
+    :type blocking_workers: int, optional
+    """
+
+    def __init__(self, config: Dict, blocking_workers: int = BLOCKING_WORKERS):
+        self.helper = OpenCTIConnectorHelper(config)
+        self.api = self.helper.api
+        self.executor = ThreadPoolExecutor(max_workers=blocking_workers)
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.loop_thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _run_callback(
+        self, work_id, applicant_id, callback: Callable[..., Awaitable], *args
+    ):
+        message_context.set((work_id, applicant_id))
+        return await callback(*args)
+
+    async def process_message(
+        self, callback: Callable[[Dict], Awaitable[str]], json_data: Dict
+    ) -> None:
+        """processes a message of the queue, reporting it to its work
+
+        :param callback: coroutine function to process messages
+        :type callback: Callable[[Dict], Awaitable[str]]
+        :param json_data: message of the queue
+        :type json_data: Dict
+        """
+
+        work_id = json_data["internal"]["work_id"]
+        applicant_id = json_data["internal"]["applicant_id"]
+        message_context.set((work_id, applicant_id))
+        ping = asyncio.ensure_future(self._ping_work(work_id))
+        try:
+            await self.run_blocking(
+                self.api.work.to_received,
+                work_id,
+                "Connector ready to process the operation",
+            )
+            message = await callback(json_data["event"])
+            await self.run_blocking(self.api.work.to_processed, work_id, message)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.exception("Error in message processing, reporting error to API")
+            try:
+                await self.run_blocking(
+                    self.api.work.to_processed, work_id, str(e), True
+                )
+            except:  # pylint: disable=bare-except
+                logging.error("Failing reporting the processing")
+        finally:
+            ping.cancel()
+
+    async def _ping_work(self, work_id) -> None:
+        # Ping every 5 minutes while the job is processing
+        while True:
+            await asyncio.sleep(WORK_PING_INTERVAL)
+            if work_id is not None:
+                try:
+                    await self.run_blocking(self.api.work.ping, work_id)
+                except Exception:  # pylint: disable=broad-except
+                    logging.error("Error pinging the work")
+
+    def _bridge(self, callback: Callable[..., Awaitable]) -> Callable:
+        # Called by the stream thread, waits for the coroutine in the loop
+        def run(*args):
+            return asyncio.run_coroutine_threadsafe(
+                self._run_callback(
+                    self.helper.work_id, self.helper.applicant_id, callback, *args
+                ),
+                self.loop,
+            ).result()
+
+        return run
+
+    @property
+    def work_id(self) -> Optional[str]:
+        """work of the message processed by the current task"""
+        return message_context.get()[0]
+
+    async def run_blocking(self, function: Callable, *args, **kwargs) -> Any:
+        """runs a blocking function in the pool of threads
+
+        The work and applicant of the current task are set for the function,
+        so helper methods defaulting to them behave as in a sync callback.
+
+        :param function: blocking function, as `helper.api.indicator.read`
+        :type function: Callable
+        :return: the result of the function
+        """
+
+        work_id, applicant_id = message_context.get()
+
+        def call():
+            context = self.helper.message_context
+            context.work_id = work_id
+            context.applicant_id = applicant_id
+            self.api.set_thread_header("opencti-applicant-id", applicant_id)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                # The thread runs the calls of other tasks next
+                del context.work_id
+                del context.applicant_id
+                self.api.set_thread_header("opencti-applicant-id", None)
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def send_stix2_bundle(self, bundle, **kwargs) -> list:
+        """send a stix2 bundle to the API, see
+        `OpenCTIConnectorHelper.send_stix2_bundle`
+        """
+        return await self.run_blocking(
+            functools.partial(self.helper.send_stix2_bundle, bundle, **kwargs)
+        )
+
+    def listen(self, message_callback: Callable[[Dict], Awaitable[str]]) -> None:
+        """listen for messages and register a coroutine callback
+
+        :param message_callback: coroutine function to process messages
+        :type message_callback: Callable[[Dict], Awaitable[str]]
+        """
+
+        self.helper.listen_queue = AsyncListenQueue(
+            self,
+            self.helper.config,
+            message_callback,
+            self.helper.connect_queue_threads,
+        )
+        self.helper.listen_queue.start()
+
+    def listen_stream(self, message_callback: Callable[..., Awaitable], **kwargs):
+        """listen for stream events and register a coroutine callback
+
+        Events are processed in order, one at a time.
+
+        :param message_callback: coroutine function to process events
+        :param `**kwargs`: arguments of `OpenCTIConnectorHelper.listen_stream`
+        """
+
+        return self.helper.listen_stream(self._bridge(message_callback), **kwargs)
+
+    def stop(self) -> None:
+        self.helper.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.executor.shutdown(wait=True)
@@ -377,10 +377,10 @@ class AttackPattern:
             if "x_mitre_id" in stix_object:
                 x_mitre_id = stix_object["x_mitre_id"]
             elif (
-                self.opencti.get_attribute_in_mitre_extension("id", stix_object)
+                self.opencti.get_mitre_extension_attribute("id", stix_object)
                 is not None
             ):
-                x_mitre_id = self.opencti.get_attribute_in_mitre_extension(
+                x_mitre_id = self.opencti.get_mitre_extension_attribute(
                     "id", stix_object
                 )
             elif "external_references" in stix_object:
@@ -401,33 +401,29 @@ class AttackPattern:
             # Search in extensions
             if "x_opencti_order" not in stix_object:
                 stix_object["x_opencti_order"] = (
-                    self.opencti.get_attribute_in_extension("order", stix_object)
-                    if self.opencti.get_attribute_in_extension("order", stix_object)
+                    self.opencti.get_extension_attribute("order", stix_object)
+                    if self.opencti.get_extension_attribute("order", stix_object)
                     is not None
                     else 0
                 )
             if "x_mitre_platforms" not in stix_object:
                 stix_object[
                     "x_mitre_platforms"
-                ] = self.opencti.get_attribute_in_mitre_extension(
-                    "platforms", stix_object
-                )
+                ] = self.opencti.get_mitre_extension_attribute("platforms", stix_object)
             if "x_mitre_permissions_required" not in stix_object:
                 stix_object[
                     "x_mitre_permissions_required"
-                ] = self.opencti.get_attribute_in_mitre_extension(
+                ] = self.opencti.get_mitre_extension_attribute(
                     "permissions_required", stix_object
                 )
             if "x_mitre_detection" not in stix_object:
                 stix_object[
                     "x_mitre_detection"
-                ] = self.opencti.get_attribute_in_mitre_extension(
-                    "detection", stix_object
-                )
+                ] = self.opencti.get_mitre_extension_attribute("detection", stix_object)
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.create(
                 stix_id=stix_object["id"],
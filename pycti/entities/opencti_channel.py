@@ -346,7 +346,7 @@ class Channel:
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.opencti.channel.create(
                 stix_id=stix_object["id"],
@@ -333,10 +333,10 @@ class CourseOfAction:
             if "x_mitre_id" in stix_object:
                 x_mitre_id = stix_object["x_mitre_id"]
             elif (
-                self.opencti.get_attribute_in_mitre_extension("id", stix_object)
+                self.opencti.get_mitre_extension_attribute("id", stix_object)
                 is not None
             ):
-                x_mitre_id = self.opencti.get_attribute_in_mitre_extension(
+                x_mitre_id = self.opencti.get_mitre_extension_attribute(
                     "id", stix_object
                 )
             elif "external_references" in stix_object:
@@ -351,13 +351,13 @@ class CourseOfAction:
 
             # Search in extensions
             if "x_opencti_aliases" not in stix_object:
-                stix_object[
-                    "x_opencti_aliases"
-                ] = self.opencti.get_attribute_in_extension("aliases", stix_object)
+                stix_object["x_opencti_aliases"] = self.opencti.get_extension_attribute(
+                    "aliases", stix_object
+                )
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.create(
                 stix_id=stix_object["id"],
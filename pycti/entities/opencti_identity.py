@@ -385,37 +385,37 @@ class Identity:
 
             # Search in extensions
             if "x_opencti_aliases" not in stix_object:
-                stix_object[
-                    "x_opencti_aliases"
-                ] = self.opencti.get_attribute_in_extension("aliases", stix_object)
+                stix_object["x_opencti_aliases"] = self.opencti.get_extension_attribute(
+                    "aliases", stix_object
+                )
             if "x_opencti_organization_type" not in stix_object:
                 stix_object[
                     "x_opencti_organization_type"
-                ] = self.opencti.get_attribute_in_extension(
+                ] = self.opencti.get_extension_attribute(
                     "organization_type", stix_object
                 )
             if "x_opencti_reliability" not in stix_object:
                 stix_object[
                     "x_opencti_reliability"
-                ] = self.opencti.get_attribute_in_extension("reliability", stix_object)
+                ] = self.opencti.get_extension_attribute("reliability", stix_object)
             if "x_opencti_organization_type" not in stix_object:
                 stix_object[
                     "x_opencti_organization_type"
-                ] = self.opencti.get_attribute_in_extension(
+                ] = self.opencti.get_extension_attribute(
                     "organization_type", stix_object
                 )
             if "x_opencti_firstname" not in stix_object:
                 stix_object[
                     "x_opencti_firstname"
-                ] = self.opencti.get_attribute_in_extension("firstname", stix_object)
+                ] = self.opencti.get_extension_attribute("firstname", stix_object)
             if "x_opencti_lastname" not in stix_object:
                 stix_object[
                     "x_opencti_lastname"
-                ] = self.opencti.get_attribute_in_extension("lastname", stix_object)
+                ] = self.opencti.get_extension_attribute("lastname", stix_object)
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.create(
                 type=type,
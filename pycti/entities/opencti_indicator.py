@@ -498,108 +498,8 @@ class Indicator:
         extras = kwargs.get("extras", {})
         update = kwargs.get("update", False)
         if stix_object is not None:
-
-            # Search in extensions
-            if "x_opencti_score" not in stix_object:
-                stix_object[
-                    "x_opencti_score"
-                ] = self.opencti.get_attribute_in_extension("score", stix_object)
-            if "x_opencti_detection" not in stix_object:
-                stix_object[
-                    "x_opencti_detection"
-                ] = self.opencti.get_attribute_in_extension("detection", stix_object)
-            if (
-                "x_opencti_main_observable_type" not in stix_object
-                and self.opencti.get_attribute_in_extension(
-                    "main_observable_type", stix_object
-                )
-                is not None
-            ):
-                stix_object[
-                    "x_opencti_main_observable_type"
-                ] = self.opencti.get_attribute_in_extension(
-                    "main_observable_type", stix_object
-                )
-            if "x_opencti_create_observables" not in stix_object:
-                stix_object[
-                    "x_opencti_create_observables"
-                ] = self.opencti.get_attribute_in_extension(
-                    "create_observables", stix_object
-                )
-            if "x_opencti_stix_ids" not in stix_object:
-                stix_object[
-                    "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
-
-            return self.create(
-                stix_id=stix_object["id"],
-                createdBy=extras["created_by_id"]
-                if "created_by_id" in extras
-                else None,
-                objectMarking=extras["object_marking_ids"]
-                if "object_marking_ids" in extras
-                else None,
-                objectLabel=extras["object_label_ids"]
-                if "object_label_ids" in extras
-                else [],
-                externalReferences=extras["external_references_ids"]
-                if "external_references_ids" in extras
-                else [],
-                revoked=stix_object["revoked"] if "revoked" in stix_object else None,
-                confidence=stix_object["confidence"]
-                if "confidence" in stix_object
-                else None,
-                lang=stix_object["lang"] if "lang" in stix_object else None,
-                created=stix_object["created"] if "created" in stix_object else None,
-                modified=stix_object["modified"] if "modified" in stix_object else None,
-                pattern_type=stix_object["pattern_type"]
-                if "pattern_type" in stix_object
-                else None,
-                pattern_version=stix_object["pattern_version"]
-                if "pattern_version" in stix_object
-                else None,
-                pattern=stix_object["pattern"] if "pattern" in stix_object else "",
-                name=stix_object["name"]
-                if "name" in stix_object
-                else stix_object["pattern"],
-                description=self.opencti.stix2.convert_markdown(
-                    stix_object["description"]
-                )
-                if "description" in stix_object
-                else "",
-                indicator_types=stix_object["indicator_types"]
-                if "indicator_types" in stix_object
-                else None,
-                valid_from=stix_object["valid_from"]
-                if "valid_from" in stix_object
-                else None,
-                valid_until=stix_object["valid_until"]
-                if "valid_until" in stix_object
-                else None,
-                x_opencti_score=stix_object["x_opencti_score"]
-                if "x_opencti_score" in stix_object
-                else 50,
-                x_opencti_detection=stix_object["x_opencti_detection"]
-                if "x_opencti_detection" in stix_object
-                else False,
-                x_mitre_platforms=stix_object["x_mitre_platforms"]
-                if "x_mitre_platforms" in stix_object
-                else None,
-                x_opencti_main_observable_type=stix_object[
-                    "x_opencti_main_observable_type"
-                ]
-                if "x_opencti_main_observable_type" in stix_object
-                else "Unknown",
-                killChainPhases=extras["kill_chain_phases_ids"]
-                if "kill_chain_phases_ids" in extras
-                else None,
-                x_opencti_stix_ids=stix_object["x_opencti_stix_ids"]
-                if "x_opencti_stix_ids" in stix_object
-                else None,
-                x_opencti_create_observables=stix_object["x_opencti_create_observables"]
-                if "x_opencti_create_observables" in stix_object
-                else False,
-                update=update,
+            return self.opencti.stix2.import_mappers["indicator"].call_create(
+                self.create, stix_object, extras, update
             )
         else:
             self.opencti.log(
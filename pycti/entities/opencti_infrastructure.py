@@ -386,7 +386,7 @@ class Infrastructure:
 
         # Search in extensions
         if "x_opencti_stix_ids" not in stix_object:
-            stix_object["x_opencti_stix_ids"] = self.opencti.get_attribute_in_extension(
+            stix_object["x_opencti_stix_ids"] = self.opencti.get_extension_attribute(
                 "stix_ids", stix_object
             )
 
@@ -343,8 +343,8 @@ class Location:
             return
         if "x_opencti_location_type" in stix_object:
             type = stix_object["x_opencti_location_type"]
-        elif self.opencti.get_attribute_in_extension("type", stix_object) is not None:
-            type = self.opencti.get_attribute_in_extension("type", stix_object)
+        elif self.opencti.get_extension_attribute("type", stix_object) is not None:
+            type = self.opencti.get_extension_attribute("type", stix_object)
         else:
             if "city" in stix_object:
                 type = "City"
@@ -358,13 +358,13 @@ class Location:
 
             # Search in extensions
             if "x_opencti_aliases" not in stix_object:
-                stix_object[
-                    "x_opencti_aliases"
-                ] = self.opencti.get_attribute_in_extension("aliases", stix_object)
+                stix_object["x_opencti_aliases"] = self.opencti.get_extension_attribute(
+                    "aliases", stix_object
+                )
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.create(
                 type=type,
@@ -376,69 +376,8 @@ class Malware:
         extras = kwargs.get("extras", {})
         update = kwargs.get("update", False)
         if stix_object is not None:
-
-            # Search in extensions
-            if "x_opencti_stix_ids" not in stix_object:
-                stix_object[
-                    "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
-
-            return self.create(
-                stix_id=stix_object["id"],
-                createdBy=extras["created_by_id"]
-                if "created_by_id" in extras
-                else None,
-                objectMarking=extras["object_marking_ids"]
-                if "object_marking_ids" in extras
-                else None,
-                objectLabel=extras["object_label_ids"]
-                if "object_label_ids" in extras
-                else [],
-                externalReferences=extras["external_references_ids"]
-                if "external_references_ids" in extras
-                else [],
-                revoked=stix_object["revoked"] if "revoked" in stix_object else None,
-                confidence=stix_object["confidence"]
-                if "confidence" in stix_object
-                else None,
-                lang=stix_object["lang"] if "lang" in stix_object else None,
-                created=stix_object["created"] if "created" in stix_object else None,
-                modified=stix_object["modified"] if "modified" in stix_object else None,
-                name=stix_object["name"],
-                description=self.opencti.stix2.convert_markdown(
-                    stix_object["description"]
-                )
-                if "description" in stix_object
-                else "",
-                aliases=self.opencti.stix2.pick_aliases(stix_object),
-                malware_types=stix_object["malware_types"]
-                if "malware_types" in stix_object
-                else None,
-                is_family=stix_object["is_family"]
-                if "is_family" in stix_object
-                else False,
-                first_seen=stix_object["first_seen"]
-                if "first_seen" in stix_object
-                else None,
-                last_seen=stix_object["last_seen"]
-                if "last_seen" in stix_object
-                else None,
-                architecture_execution_envs=stix_object["architecture_execution_envs"]
-                if "architecture_execution_envs" in stix_object
-                else None,
-                implementation_languages=stix_object["implementation_languages"]
-                if "implementation_languages" in stix_object
-                else None,
-                capabilities=stix_object["capabilities"]
-                if "capabilities" in stix_object
-                else None,
-                killChainPhases=extras["kill_chain_phases_ids"]
-                if "kill_chain_phases_ids" in extras
-                else None,
-                x_opencti_stix_ids=stix_object["x_opencti_stix_ids"]
-                if "x_opencti_stix_ids" in stix_object
-                else None,
-                update=update,
+            return self.opencti.stix2.import_mappers["malware"].call_create(
+                self.create, stix_object, extras, update
             )
         else:
             self.opencti.log(
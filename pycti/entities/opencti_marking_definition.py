@@ -267,20 +267,20 @@ class MarkingDefinition:
             # Search in extensions
             if (
                 "x_opencti_order" not in stix_object
-                and self.opencti.get_attribute_in_extension("order", stix_object)
+                and self.opencti.get_extension_attribute("order", stix_object)
                 is not None
             ):
-                stix_object[
-                    "x_opencti_order"
-                ] = self.opencti.get_attribute_in_extension("order", stix_object)
+                stix_object["x_opencti_order"] = self.opencti.get_extension_attribute(
+                    "order", stix_object
+                )
             if "x_opencti_color" not in stix_object:
-                stix_object[
-                    "x_opencti_color"
-                ] = self.opencti.get_attribute_in_extension("color", stix_object)
+                stix_object["x_opencti_color"] = self.opencti.get_extension_attribute(
+                    "color", stix_object
+                )
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.opencti.marking_definition.create(
                 stix_id=stix_object["id"],
@@ -541,6 +541,55 @@ class Report:
             )
             return False
 
+    """
+        Add several Stix-Entity objects to Report object (object_refs)
+
+        :param id: the id of the Report
+        :param stixObjectOrStixRelationshipIds: the ids of the Stix-Entities
+        :return Boolean
+    """
+
+    def add_stix_objects_or_stix_relationships(self, **kwargs):
+        id = kwargs.get("id", None)
+        stix_object_or_stix_relationship_ids = kwargs.get(
+            "stixObjectOrStixRelationshipIds", None
+        )
+        if id is not None and stix_object_or_stix_relationship_ids is not None:
+            self.opencti.log(
+                "info",
+                "Adding "
+                + str(len(stix_object_or_stix_relationship_ids))
+                + " StixObjectOrStixRelationship to Report {"
+                + id
+                + "}",
+            )
+            query = """
+               mutation ReportEditRelationsAdd($id: ID!, $input: StixMetaRelationshipsAddInput) {
+                   reportEdit(id: $id) {
+                        relationsAdd(input: $input) {
+                            id
+                        }
+                   }
+               }
+            """
+            self.opencti.query(
+                query,
+                {
+                    "id": id,
+                    "input": {
+                        "toIds": stix_object_or_stix_relationship_ids,
+                        "relationship_type": "object",
+                    },
+                },
+            )
+            return True
+        else:
+            self.opencti.log(
+                "error",
+                "[opencti_report] Missing parameters: id and stixObjectOrStixRelationshipIds",
+            )
+            return False
+
     """
         Remove a Stix-Entity object to Report object (object_refs)
 
@@ -600,51 +649,8 @@ class Report:
         extras = kwargs.get("extras", {})
         update = kwargs.get("update", False)
         if stix_object is not None:
-
-            # Search in extensions
-            if "x_opencti_stix_ids" not in stix_object:
-                stix_object[
-                    "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
-
-            return self.create(
-                stix_id=stix_object["id"],
-                createdBy=extras["created_by_id"]
-                if "created_by_id" in extras
-                else None,
-                objectMarking=extras["object_marking_ids"]
-                if "object_marking_ids" in extras
-                else None,
-                objectLabel=extras["object_label_ids"]
-                if "object_label_ids" in extras
-                else [],
-                objects=extras["object_ids"] if "object_ids" in extras else [],
-                externalReferences=extras["external_references_ids"]
-                if "external_references_ids" in extras
-                else [],
-                revoked=stix_object["revoked"] if "revoked" in stix_object else None,
-                confidence=stix_object["confidence"]
-                if "confidence" in stix_object
-                else None,
-                lang=stix_object["lang"] if "lang" in stix_object else None,
-                created=stix_object["created"] if "created" in stix_object else None,
-                modified=stix_object["modified"] if "modified" in stix_object else None,
-                name=stix_object["name"],
-                description=self.opencti.stix2.convert_markdown(
-                    stix_object["description"]
-                )
-                if "description" in stix_object
-                else "",
-                report_types=stix_object["report_types"]
-                if "report_types" in stix_object
-                else None,
-                published=stix_object["published"]
-                if "published" in stix_object
-                else None,
-                x_opencti_stix_ids=stix_object["x_opencti_stix_ids"]
-                if "x_opencti_stix_ids" in stix_object
-                else None,
-                update=update,
+            return self.opencti.stix2.import_mappers["report"].call_create(
+                self.create, stix_object, extras, update
             )
         else:
             self.opencti.log("error", "[opencti_report] Missing parameters: stixObject")
@@ -571,7 +571,7 @@ class StixCyberObservable:
         if "x_opencti_description" in observable_data:
             x_opencti_description = observable_data["x_opencti_description"]
         else:
-            x_opencti_description = self.opencti.get_attribute_in_extension(
+            x_opencti_description = self.opencti.get_extension_attribute(
                 "description", observable_data
             )
 
@@ -580,11 +580,8 @@ class StixCyberObservable:
 
         if "x_opencti_score" in observable_data:
             x_opencti_score = observable_data["x_opencti_score"]
-        elif (
-            self.opencti.get_attribute_in_extension("score", observable_data)
-            is not None
-        ):
-            x_opencti_score = self.opencti.get_attribute_in_extension(
+        elif self.opencti.get_extension_attribute("score", observable_data) is not None:
+            x_opencti_score = self.opencti.get_extension_attribute(
                 "score", observable_data
             )
 
@@ -816,14 +813,14 @@ class StixCyberObservable:
             elif type == "StixFile":
                 if (
                     "x_opencti_additional_names" not in observable_data
-                    and self.opencti.get_attribute_in_extension(
+                    and self.opencti.get_extension_attribute(
                         "additional_names", observable_data
                     )
                     is not None
                 ):
                     observable_data[
                         "x_opencti_additional_names"
-                    ] = self.opencti.get_attribute_in_extension(
+                    ] = self.opencti.get_extension_attribute(
                         "additional_names", observable_data
                     )
                 input_variables["StixFile"] = {
@@ -204,28 +204,12 @@ class StixCyberObservableRelationship:
     def create(self, **kwargs):
         from_id = kwargs.get("fromId", None)
         to_id = kwargs.get("toId", None)
-        relationship_type = kwargs.get("relationship_type", None)
-        start_time = kwargs.get("start_time", None)
-        stop_time = kwargs.get("stop_time", None)
-        stix_id = kwargs.get("stix_id", None)
-        created = kwargs.get("created", None)
-        modified = kwargs.get("modified", None)
-        created_by = kwargs.get("createdBy", None)
-        object_marking = kwargs.get("objectMarking", None)
-        x_opencti_stix_ids = kwargs.get("x_opencti_stix_ids", None)
-        update = kwargs.get("update", False)
-
-        if relationship_type == "resolves-to":
-            relationship_type = "obs_resolves-to"
-        elif relationship_type == "belongs-to":
-            relationship_type = "obs_belongs-to"
-        elif relationship_type == "content":
-            relationship_type = "obs_content"
+        input = self.create_input(**kwargs)
 
         self.opencti.log(
             "info",
             "Creating stix_observable_relationship '"
-            + relationship_type
+            + input["relationship_type"]
             + "' {"
             + from_id
             + ", "
@@ -242,29 +226,62 @@ class StixCyberObservableRelationship:
                     }
                 }
                 """
-        result = self.opencti.query(
-            query,
-            {
-                "input": {
-                    "fromId": from_id,
-                    "toId": to_id,
-                    "relationship_type": relationship_type,
-                    "start_time": start_time,
-                    "stop_time": stop_time,
-                    "stix_id": stix_id,
-                    "created": created,
-                    "modified": modified,
-                    "createdBy": created_by,
-                    "objectMarking": object_marking,
-                    "x_opencti_stix_ids": x_opencti_stix_ids,
-                    "update": update,
-                }
-            },
-        )
+        result = self.opencti.query(query, {"input": input})
         return self.opencti.process_multiple_fields(
             result["data"]["stixCyberObservableRelationshipAdd"]
         )
 
+    """
+        Create several stix_observable_relationship objects in batched mutations
+
+        :param inputs: list of dicts with the parameters of `create`
+        :return list of stix_observable_relationship objects in the order of
+            inputs, the first failed creation is raised once every input is
+            submitted
+    """
+
+    def create_batch(self, **kwargs):
+        inputs = kwargs.get("inputs", [])
+        self.opencti.log(
+            "info",
+            "Creating " + str(len(inputs)) + " stix_observable_relationship in batch.",
+        )
+        results = self.opencti.query_batch(
+            "mutation",
+            "stixCyberObservableRelationshipAdd(input: $value)",
+            "StixCyberObservableRelationshipAddInput!",
+            [self.create_input(**input) for input in inputs],
+            "id standard_id entity_type parent_types",
+        )
+        return [
+            self.opencti.process_multiple_fields(result) if result is not None else None
+            for result in results
+        ]
+
+    @staticmethod
+    def create_input(**kwargs):
+        relationship_type = kwargs.get("relationship_type", None)
+        if relationship_type == "resolves-to":
+            relationship_type = "obs_resolves-to"
+        elif relationship_type == "belongs-to":
+            relationship_type = "obs_belongs-to"
+        elif relationship_type == "content":
+            relationship_type = "obs_content"
+        return {
+            "fromId": kwargs.get("fromId", None),
+            "toId": kwargs.get("toId", None),
+            "relationship_type": relationship_type,
+            "start_time": kwargs.get("start_time", None),
+            "stop_time": kwargs.get("stop_time", None),
+            "stix_id": kwargs.get("stix_id", None),
+            "created": kwargs.get("created", None),
+            "modified": kwargs.get("modified", None),
+            "createdBy": kwargs.get("createdBy", None),
+            "objectMarking": kwargs.get("objectMarking", None),
+            "x_opencti_stix_ids": kwargs.get("x_opencti_stix_ids", None),
+            "update": kwargs.get("update", False),
+        }
+
     """
         Update a stix_observable_relationship object field
 
@@ -521,3 +521,33 @@ class StixObjectOrStixRelationship:
         else:
             self.opencti.log("error", "Missing parameters: id")
             return None
+
+    """
+        Read several StixObjectOrStixRelationship objects in few requests
+
+        :param ids: the ids of the StixObjectOrStixRelationship
+        :return dict of StixObjectOrStixRelationship objects by requested id
+    """
+
+    def read_many(self, **kwargs):
+        ids = kwargs.get("ids", None)
+        custom_attributes = kwargs.get("customAttributes", None)
+        if ids is not None:
+            self.opencti.log(
+                "info", "Reading " + str(len(ids)) + " StixObjectOrStixRelationship."
+            )
+            results = self.opencti.query_batch(
+                "query",
+                "stixObjectOrStixRelationship(id: $value)",
+                "String!",
+                ids,
+                custom_attributes if custom_attributes is not None else self.properties,
+            )
+            return {
+                id: self.opencti.process_multiple_fields(result)
+                for id, result in zip(ids, results)
+                if result is not None
+            }
+        else:
+            self.opencti.log("error", "Missing parameters: ids")
+            return None
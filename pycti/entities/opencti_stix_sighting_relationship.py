@@ -491,21 +491,6 @@ class StixSightingRelationship:
     def create(self, **kwargs):
         from_id = kwargs.get("fromId", None)
         to_id = kwargs.get("toId", None)
-        stix_id = kwargs.get("stix_id", None)
-        description = kwargs.get("description", None)
-        first_seen = kwargs.get("first_seen", None)
-        last_seen = kwargs.get("last_seen", None)
-        count = kwargs.get("count", None)
-        x_opencti_negative = kwargs.get("x_opencti_negative", False)
-        created = kwargs.get("created", None)
-        modified = kwargs.get("modified", None)
-        confidence = kwargs.get("confidence", None)
-        created_by = kwargs.get("createdBy", None)
-        object_marking = kwargs.get("objectMarking", None)
-        object_label = kwargs.get("objectLabel", None)
-        external_references = kwargs.get("externalReferences", None)
-        x_opencti_stix_ids = kwargs.get("x_opencti_stix_ids", None)
-        update = kwargs.get("update", False)
 
         self.opencti.log(
             "info",
@@ -521,34 +506,58 @@ class StixSightingRelationship:
                     }
                 }
             """
-        result = self.opencti.query(
-            query,
-            {
-                "input": {
-                    "fromId": from_id,
-                    "toId": to_id,
-                    "stix_id": stix_id,
-                    "description": description,
-                    "first_seen": first_seen,
-                    "last_seen": last_seen,
-                    "attribute_count": count,
-                    "x_opencti_negative": x_opencti_negative,
-                    "created": created,
-                    "modified": modified,
-                    "confidence": confidence,
-                    "createdBy": created_by,
-                    "objectMarking": object_marking,
-                    "objectLabel": object_label,
-                    "externalReferences": external_references,
-                    "x_opencti_stix_ids": x_opencti_stix_ids,
-                    "update": update,
-                }
-            },
-        )
+        result = self.opencti.query(query, {"input": self.create_input(**kwargs)})
         return self.opencti.process_multiple_fields(
             result["data"]["stixSightingRelationshipAdd"]
         )
 
+    """
+        Create several stix_sighting objects in batched mutations
+
+        :param inputs: list of dicts with the parameters of `create`
+        :return list of stix_sighting objects in the order of inputs, the first
+            failed creation is raised once every input is submitted
+    """
+
+    def create_batch(self, **kwargs):
+        inputs = kwargs.get("inputs", [])
+        self.opencti.log(
+            "info", "Creating " + str(len(inputs)) + " stix_sighting in batch."
+        )
+        results = self.opencti.query_batch(
+            "mutation",
+            "stixSightingRelationshipAdd(input: $value)",
+            "StixSightingRelationshipAddInput!",
+            [self.create_input(**input) for input in inputs],
+            "id standard_id entity_type parent_types",
+        )
+        return [
+            self.opencti.process_multiple_fields(result) if result is not None else None
+            for result in results
+        ]
+
+    @staticmethod
+    def create_input(**kwargs):
+        return {
+            "fromId": kwargs.get("fromId", None),
+            "toId": kwargs.get("toId", None),
+            "stix_id": kwargs.get("stix_id", None),
+            "description": kwargs.get("description", None),
+            "first_seen": kwargs.get("first_seen", None),
+            "last_seen": kwargs.get("last_seen", None),
+            "attribute_count": kwargs.get("count", None),
+            "x_opencti_negative": kwargs.get("x_opencti_negative", False),
+            "created": kwargs.get("created", None),
+            "modified": kwargs.get("modified", None),
+            "confidence": kwargs.get("confidence", None),
+            "createdBy": kwargs.get("createdBy", None),
+            "objectMarking": kwargs.get("objectMarking", None),
+            "objectLabel": kwargs.get("objectLabel", None),
+            "externalReferences": kwargs.get("externalReferences", None),
+            "x_opencti_stix_ids": kwargs.get("x_opencti_stix_ids", None),
+            "update": kwargs.get("update", False),
+        }
+
     """
         Update a stix_sighting object field
 
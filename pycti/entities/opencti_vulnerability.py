@@ -367,47 +367,43 @@ class Vulnerability:
 
             # Search in extensions
             if "x_opencti_aliases" not in stix_object:
-                stix_object[
-                    "x_opencti_aliases"
-                ] = self.opencti.get_attribute_in_extension("aliases", stix_object)
+                stix_object["x_opencti_aliases"] = self.opencti.get_extension_attribute(
+                    "aliases", stix_object
+                )
             if "x_opencti_base_score" not in stix_object:
                 stix_object[
                     "x_opencti_base_score"
-                ] = self.opencti.get_attribute_in_extension("base_score", stix_object)
+                ] = self.opencti.get_extension_attribute("base_score", stix_object)
             if "x_opencti_base_severity" not in stix_object:
                 stix_object[
                     "x_opencti_base_severity"
-                ] = self.opencti.get_attribute_in_extension(
-                    "base_severity", stix_object
-                )
+                ] = self.opencti.get_extension_attribute("base_severity", stix_object)
             if "x_opencti_attack_vector" not in stix_object:
                 stix_object[
                     "x_opencti_attack_vector"
-                ] = self.opencti.get_attribute_in_extension(
-                    "attack_vector", stix_object
-                )
+                ] = self.opencti.get_extension_attribute("attack_vector", stix_object)
             if "x_opencti_integrity_impact" not in stix_object:
                 stix_object[
                     "x_opencti_integrity_impact"
-                ] = self.opencti.get_attribute_in_extension(
+                ] = self.opencti.get_extension_attribute(
                     "integrity_impact", stix_object
                 )
             if "x_opencti_availability_impact" not in stix_object:
                 stix_object[
                     "x_opencti_availability_impact"
-                ] = self.opencti.get_attribute_in_extension(
+                ] = self.opencti.get_extension_attribute(
                     "availability_impact", stix_object
                 )
             if "x_opencti_confidentiality_impact" not in stix_object:
                 stix_object[
                     "x_opencti_confidentiality_impact"
-                ] = self.opencti.get_attribute_in_extension(
+                ] = self.opencti.get_extension_attribute(
                     "confidentiality_impact", stix_object
                 )
             if "x_opencti_stix_ids" not in stix_object:
                 stix_object[
                     "x_opencti_stix_ids"
-                ] = self.opencti.get_attribute_in_extension("stix_ids", stix_object)
+                ] = self.opencti.get_extension_attribute("stix_ids", stix_object)
 
             return self.create(
                 stix_id=stix_object["id"],
@@ -1,13 +1,14 @@
 # coding: utf-8
 
-import base64
 import datetime
 import json
 import os
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-import datefinder
 import dateutil.parser
 import pytz
 
@@ -18,6 +19,23 @@ from pycti.utils.constants import (
     MultipleStixCyberObservableRelationship,
     StixCyberObservableTypes,
 )
+from pycti.utils.opencti_stix2_bundle_reader import OpenCTIStix2BundleReader
+from pycti.utils.opencti_stix2_checkpoint import OpenCTIStix2Checkpoint
+from pycti.utils.opencti_stix2_date_extractor import OpenCTIStix2DateExtractor
+from pycti.utils.opencti_stix2_file_uploader import OpenCTIStix2FileUploader
+from pycti.utils.opencti_stix2_import_report import (
+    OpenCTIStix2ImportReport,
+    OpenCTIStix2MappingCache,
+)
+from pycti.utils.opencti_stix2_mapper import (
+    STIX2_IMPORT_MAPPINGS,
+    OpenCTIStix2Mapper,
+    convert_markdown,
+)
+from pycti.utils.opencti_stix2_partitioner import (
+    OpenCTIStix2Partitioner,
+    import_bundle_in_process,
+)
 from pycti.utils.opencti_stix2_splitter import OpenCTIStix2Splitter
 from pycti.utils.opencti_stix2_update import OpenCTIStix2Update
 from pycti.utils.opencti_stix2_utils import (
@@ -25,7 +43,6 @@ from pycti.utils.opencti_stix2_utils import (
     STIX_CYBER_OBSERVABLE_MAPPING,
 )
 
-datefinder.ValueError = ValueError, OverflowError
 utc = pytz.UTC
 
 # Spec version
@@ -41,7 +58,49 @@ class OpenCTIStix2:
     def __init__(self, opencti):
         self.opencti = opencti
         self.stix2_update = OpenCTIStix2Update(opencti)
-        self.mapping_cache = {}
+        self.mapping_cache = OpenCTIStix2MappingCache()
+        self.date_extractor = OpenCTIStix2DateExtractor()
+        self.import_mappers = {
+            stix_type: OpenCTIStix2Mapper(mapping, opencti.get_extension_attribute)
+            for stix_type, mapping in STIX2_IMPORT_MAPPINGS.items()
+        }
+        self.dispatch_tables = None
+        # State of the import run by the current thread, so connectors
+        # processing messages concurrently do not share their imports
+        self.import_state = threading.local()
+
+    @property
+    def import_report(self) -> OpenCTIStix2ImportReport:
+        """import report of the current thread"""
+
+        if not hasattr(self.import_state, "import_report"):
+            self.import_state.import_report = OpenCTIStix2ImportReport(
+                self.opencti, self.mapping_cache
+            )
+        return self.import_state.import_report
+
+    @import_report.setter
+    def import_report(self, import_report: OpenCTIStix2ImportReport) -> None:
+        self.import_state.import_report = import_report
+
+    @property
+    def file_uploader(self) -> OpenCTIStix2FileUploader:
+        """file uploader of the current thread"""
+
+        if not hasattr(self.import_state, "file_uploader"):
+            self.import_state.file_uploader = OpenCTIStix2FileUploader(self.opencti)
+        return self.import_state.file_uploader
+
+    @property
+    def report_members(self) -> Optional[Dict]:
+        """members of the reports created from external references, by report,
+        accumulated by the bundle import of the current thread"""
+
+        return getattr(self.import_state, "report_members", None)
+
+    @report_members.setter
+    def report_members(self, report_members: Optional[Dict]) -> None:
+        self.import_state.report_members = report_members
 
     ######### UTILS
     # region utils
@@ -60,7 +119,178 @@ class OpenCTIStix2:
         :rtype: str
         """
 
-        return text.replace("<code>", "`").replace("</code>", "`")
+        return convert_markdown(text)
+
+    def add_files(self, add_file, id: str, stix_object: Dict) -> None:
+        """uploads the files embedded in a stix2 object or external reference
+
+        :param add_file: `add_file` method of the entity type
+        :type add_file: Callable
+        :param id: OpenCTI id of the entity
+        :type id: str
+        :param stix_object: stix2 object with `x_opencti_files` or `files`
+        :type stix_object: dict
+        """
+
+        files = []
+        if "x_opencti_files" in stix_object:
+            files.extend(stix_object["x_opencti_files"])
+        if self.opencti.get_extension_attribute("files", stix_object) is not None:
+            files.extend(self.opencti.get_extension_attribute("files", stix_object))
+        for file in files:
+            self.file_uploader.upload(add_file, file, id=id)
+
+    def build_dispatch_tables(self) -> Dict[str, Dict]:
+        """builds the dispatch tables of the stix2 types to the entity methods
+
+        :return: dispatch tables by name
+        :rtype: dict
+        """
+
+        return {
+            "importers": {
+                "marking-definition": self.opencti.marking_definition.import_from_stix2,
+                "attack-pattern": self.opencti.attack_pattern.import_from_stix2,
+                "campaign": self.opencti.campaign.import_from_stix2,
+                "event": self.opencti.event.import_from_stix2,
+                "note": self.opencti.note.import_from_stix2,
+                "observed-data": self.opencti.observed_data.import_from_stix2,
+                "opinion": self.opencti.opinion.import_from_stix2,
+                "report": self.opencti.report.import_from_stix2,
+                "course-of-action": self.opencti.course_of_action.import_from_stix2,
+                "identity": self.opencti.identity.import_from_stix2,
+                "indicator": self.opencti.indicator.import_from_stix2,
+                "infrastructure": self.opencti.infrastructure.import_from_stix2,
+                "intrusion-set": self.opencti.intrusion_set.import_from_stix2,
+                "location": self.opencti.location.import_from_stix2,
+                "malware": self.opencti.malware.import_from_stix2,
+                "threat-actor": self.opencti.threat_actor.import_from_stix2,
+                "tool": self.opencti.tool.import_from_stix2,
+                "channel": self.opencti.channel.import_from_stix2,
+                "narrative": self.opencti.narrative.import_from_stix2,
+                "vulnerability": self.opencti.vulnerability.import_from_stix2,
+                "incident": self.opencti.incident.import_from_stix2,
+            },
+            "object_readers": {
+                "Attack-Pattern": self.opencti.attack_pattern.read,
+                "Campaign": self.opencti.campaign.read,
+                "Note": self.opencti.note.read,
+                "Observed-Data": self.opencti.observed_data.read,
+                "Opinion": self.opencti.opinion.read,
+                "Report": self.opencti.report.read,
+                "Course-Of-Action": self.opencti.course_of_action.read,
+                "Identity": self.opencti.identity.read,
+                "Indicator": self.opencti.indicator.read,
+                "Infrastructure": self.opencti.infrastructure.read,
+                "Intrusion-Set": self.opencti.intrusion_set.read,
+                "Location": self.opencti.location.read,
+                "Language": self.opencti.language.read,
+                "Malware": self.opencti.malware.read,
+                "Threat-Actor": self.opencti.threat_actor.read,
+                "Tool": self.opencti.tool.read,
+                "Vulnerability": self.opencti.vulnerability.read,
+                "Incident": self.opencti.incident.read,
+                "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.read,
+                "stix-core-relationship": self.opencti.stix_core_relationship.read,
+                "stix-sighting-relationship": self.opencti.stix_sighting_relationship.read,
+            },
+            "entity_readers": {
+                "Attack-Pattern": self.opencti.attack_pattern.read,
+                "Campaign": self.opencti.campaign.read,
+                "Event": self.opencti.campaign.read,
+                "Note": self.opencti.note.read,
+                "Observed-Data": self.opencti.observed_data.read,
+                "Opinion": self.opencti.opinion.read,
+                "Report": self.opencti.report.read,
+                "Course-Of-Action": self.opencti.course_of_action.read,
+                "Identity": self.opencti.identity.read,
+                "Indicator": self.opencti.indicator.read,
+                "Infrastructure": self.opencti.infrastructure.read,
+                "Intrusion-Set": self.opencti.intrusion_set.read,
+                "Location": self.opencti.location.read,
+                "Language": self.opencti.language.read,
+                "Malware": self.opencti.malware.read,
+                "Threat-Actor": self.opencti.threat_actor.read,
+                "Tool": self.opencti.tool.read,
+                "Channel": self.opencti.channel.read,
+                "Narrative": self.opencti.narrative.read,
+                "Vulnerability": self.opencti.vulnerability.read,
+                "Incident": self.opencti.incident.read,
+                "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.read,
+                "stix-core-relationship": self.opencti.stix_core_relationship.read,
+            },
+            "listers": {
+                "Stix-Domain-Object": self.opencti.stix_domain_object.list,
+                "Attack-Pattern": self.opencti.attack_pattern.list,
+                "Campaign": self.opencti.campaign.list,
+                "Event": self.opencti.event.list,
+                "Note": self.opencti.note.list,
+                "Observed-Data": self.opencti.observed_data.list,
+                "Opinion": self.opencti.opinion.list,
+                "Report": self.opencti.report.list,
+                "Course-Of-Action": self.opencti.course_of_action.list,
+                "Identity": self.opencti.identity.list,
+                "Indicator": self.opencti.indicator.list,
+                "Infrastructure": self.opencti.infrastructure.list,
+                "Intrusion-Set": self.opencti.intrusion_set.list,
+                "Location": self.opencti.location.list,
+                "Language": self.opencti.language.list,
+                "Malware": self.opencti.malware.list,
+                "Threat-Actor": self.opencti.threat_actor.list,
+                "Tool": self.opencti.tool.list,
+                "Channel": self.opencti.channel.list,
+                "Narrative": self.opencti.narrative.list,
+                "Vulnerability": self.opencti.vulnerability.list,
+                "Incident": self.opencti.incident.list,
+                "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.list,
+                "stix-sighting-relationship": self.opencti.stix_sighting_relationship.list,
+                "stix-core-relationship": self.opencti.stix_core_relationship.list,
+            },
+        }
+
+    def get_dispatch_table(self, name: str) -> Dict:
+        """returns a dispatch table, built once as entities are set after init
+
+        :param name: `importers`, `object_readers`, `entity_readers` or `listers`
+        :type name: str
+        :return: the dispatch table
+        :rtype: dict
+        """
+
+        if self.dispatch_tables is None:
+            self.dispatch_tables = self.build_dispatch_tables()
+        return self.dispatch_tables[name]
+
+    def add_report_member(self, report_id: str, member_id: str) -> None:
+        """adds an object to a report created from an external reference
+
+        During a bundle import, the members are accumulated and added with a
+        single mutation per report by `flush_report_members`.
+
+        :param report_id: id of the report
+        :type report_id: str
+        :param member_id: id of the object or relationship
+        :type member_id: str
+        """
+
+        if self.report_members is None:
+            self.opencti.report.add_stix_object_or_stix_relationship(
+                id=report_id, stixObjectOrStixRelationshipId=member_id
+            )
+        else:
+            # Dict keys keep the order and drop the duplicates
+            self.report_members.setdefault(report_id, {})[member_id] = True
+
+    def flush_report_members(self) -> None:
+        """adds the accumulated members to their reports"""
+
+        report_members = self.report_members or {}
+        for report_id, members in report_members.items():
+            self.opencti.report.add_stix_objects_or_stix_relationships(
+                id=report_id, stixObjectOrStixRelationshipIds=list(members)
+            )
+        if self.report_members is not None:
+            self.report_members = {}
 
     def format_date(self, date: Any = None) -> str:
         """converts multiple input date formats to OpenCTI style dates
@@ -164,25 +394,88 @@ class OpenCTIStix2:
         return False
 
     def import_bundle_from_file(
-        self, file_path: str, update: bool = False, types: List = None
-    ) -> Optional[List]:
+        self,
+        file_path: str,
+        update: bool = False,
+        types: List = None,
+        resume: bool = False,
+        checkpoint_interval: int = None,
+        checkpoint_file: str = None,
+        streaming: bool = False,
+        with_report: bool = False,
+        log_report: bool = False,
+        processes: int = None,
+    ) -> Optional[Union[List, Tuple[List, Dict]]]:
         """import a stix2 bundle from a file
 
+        Checkpointing is enabled when `resume` or `checkpoint_interval` is set,
+        the checkpoint is then written next to the bundle file unless
+        `checkpoint_file` is given.
+
+        With `streaming`, the objects of the bundle are parsed incrementally
+        and spilled to disk instead of loading the whole file in memory.
+
         :param file_path: valid path to the file
         :type file_path: str
         :param update: whether to updated data in the database, defaults to False
         :type update: bool, optional
         :param types: list of stix2 types, defaults to None
         :type types: list, optional
+        :param resume: whether to restart from the last checkpoint, defaults to False
+        :type resume: bool, optional
+        :param checkpoint_interval: number of split bundles imported between two
+            checkpoints, defaults to None
+        :type checkpoint_interval: int, optional
+        :param checkpoint_file: path of the checkpoint file, defaults to None
+        :type checkpoint_file: str, optional
+        :param streaming: whether to parse the bundle incrementally, defaults to False
+        :type streaming: bool, optional
+        :param with_report: whether to return the import report along with the
+            imported objects, defaults to False
+        :type with_report: bool, optional
+        :param log_report: whether to log the import report as JSON, defaults to False
+        :type log_report: bool, optional
+        :param processes: number of processes importing the bundle, not
+            available with `streaming`, defaults to None (no parallelism)
+        :type processes: int, optional
         :return: list of imported stix2 objects
         :rtype: List
         """
         if not os.path.isfile(file_path):
             self.opencti.log("error", "The bundle file does not exists")
             return None
+        if streaming and processes is not None and processes > 1:
+            raise ValueError("Streaming is not supported with processes")
+        if resume or checkpoint_interval is not None:
+            if checkpoint_file is None:
+                checkpoint_file = file_path + ".checkpoint"
+            if checkpoint_interval is None:
+                checkpoint_interval = 1000
+        if streaming:
+            with OpenCTIStix2BundleReader(file_path) as bundle_reader:
+                return self.import_bundle_reader(
+                    bundle_reader,
+                    update,
+                    types,
+                    checkpoint_file=checkpoint_file,
+                    checkpoint_interval=checkpoint_interval,
+                    resume=resume,
+                    with_report=with_report,
+                    log_report=log_report,
+                )
         with open(os.path.join(file_path)) as file:
             data = json.load(file)
-        return self.import_bundle(data, update, types)
+        return self.import_bundle(
+            data,
+            update,
+            types,
+            checkpoint_file=checkpoint_file,
+            checkpoint_interval=checkpoint_interval,
+            resume=resume,
+            with_report=with_report,
+            log_report=log_report,
+            processes=processes,
+        )
 
     def import_bundle_from_json(
         self,
@@ -190,7 +483,10 @@ class OpenCTIStix2:
         update: bool = False,
         types: List = None,
         retry_number: int = None,
-    ) -> List:
+        with_report: bool = False,
+        log_report: bool = False,
+        processes: int = None,
+    ) -> Union[List, Tuple[List, Dict]]:
         """import a stix2 bundle from JSON data
 
         :param json_data: JSON data
@@ -199,6 +495,14 @@ class OpenCTIStix2:
         :type update: bool, optional
         :param types: list of stix2 types, defaults to None
         :type types: list, optional
+        :param with_report: whether to return the import report along with the
+            imported objects, defaults to False
+        :type with_report: bool, optional
+        :param log_report: whether to log the import report as JSON, defaults to False
+        :type log_report: bool, optional
+        :param processes: number of processes importing the bundle, defaults
+            to None (no parallelism)
+        :type processes: int, optional
         :return: list of imported stix2 objects
         :rtype: List
         """
@@ -208,6 +512,9 @@ class OpenCTIStix2:
             update,
             types,
             retry_number,
+            with_report=with_report,
+            log_report=log_report,
+            processes=processes,
         )
 
     def resolve_author(self, title: str) -> Optional[Identity]:
@@ -283,10 +590,10 @@ class OpenCTIStix2:
         elif "x_opencti_created_by_ref" in stix_object:
             created_by_id = stix_object["x_opencti_created_by_ref"]
         elif (
-            self.opencti.get_attribute_in_extension("created_by_ref", stix_object)
+            self.opencti.get_extension_attribute("created_by_ref", stix_object)
             is not None
         ):
-            created_by_id = self.opencti.get_attribute_in_extension(
+            created_by_id = self.opencti.get_extension_attribute(
                 "created_by_ref", stix_object
             )
         # Object Marking Refs
@@ -297,53 +604,52 @@ class OpenCTIStix2:
         )
         # Object Labels
         object_label_ids = []
-        if (
-            "labels" not in stix_object
-            and self.opencti.get_attribute_in_extension("labels", stix_object)
-            is not None
-        ):
-            stix_object["labels"] = self.opencti.get_attribute_in_extension(
-                "labels", stix_object
-            )
-        if "labels" in stix_object:
-            for label in stix_object["labels"]:
-                if "label_" + label in self.mapping_cache:
-                    label_data = self.mapping_cache["label_" + label]
-                else:
-                    label_data = self.opencti.label.create(value=label)
-                if label_data is not None and "id" in label_data:
-                    self.mapping_cache["label_" + label] = label_data
-                    object_label_ids.append(label_data["id"])
-        elif "x_opencti_labels" in stix_object:
-            for label in stix_object["x_opencti_labels"]:
-                if "label_" + label in self.mapping_cache:
-                    label_data = self.mapping_cache["label_" + label]
-                else:
-                    label_data = self.opencti.label.create(value=label)
-                if label_data is not None and "id" in label_data:
-                    self.mapping_cache["label_" + label] = label_data
-                    object_label_ids.append(label_data["id"])
-        elif "x_opencti_tags" in stix_object:
-            for tag in stix_object["x_opencti_tags"]:
-                label = tag["value"]
-                color = tag["color"] if "color" in tag else None
-                if "label_" + label in self.mapping_cache:
-                    label_data = self.mapping_cache["label_" + label]
-                else:
-                    label_data = self.opencti.label.create(value=label, color=color)
-                if label_data is not None and "id" in label_data:
-                    self.mapping_cache["label_" + label] = label_data
-                    object_label_ids.append(label_data["id"])
+        with self.import_report.phase("labels"):
+            if (
+                "labels" not in stix_object
+                and self.opencti.get_extension_attribute("labels", stix_object)
+                is not None
+            ):
+                stix_object["labels"] = self.opencti.get_extension_attribute(
+                    "labels", stix_object
+                )
+            if "labels" in stix_object:
+                for label in stix_object["labels"]:
+                    if "label_" + label in self.mapping_cache:
+                        label_data = self.mapping_cache["label_" + label]
+                    else:
+                        label_data = self.opencti.label.create(value=label)
+                    if label_data is not None and "id" in label_data:
+                        self.mapping_cache["label_" + label] = label_data
+                        object_label_ids.append(label_data["id"])
+            elif "x_opencti_labels" in stix_object:
+                for label in stix_object["x_opencti_labels"]:
+                    if "label_" + label in self.mapping_cache:
+                        label_data = self.mapping_cache["label_" + label]
+                    else:
+                        label_data = self.opencti.label.create(value=label)
+                    if label_data is not None and "id" in label_data:
+                        self.mapping_cache["label_" + label] = label_data
+                        object_label_ids.append(label_data["id"])
+            elif "x_opencti_tags" in stix_object:
+                for tag in stix_object["x_opencti_tags"]:
+                    label = tag["value"]
+                    color = tag["color"] if "color" in tag else None
+                    if "label_" + label in self.mapping_cache:
+                        label_data = self.mapping_cache["label_" + label]
+                    else:
+                        label_data = self.opencti.label.create(value=label, color=color)
+                    if label_data is not None and "id" in label_data:
+                        self.mapping_cache["label_" + label] = label_data
+                        object_label_ids.append(label_data["id"])
         # Kill Chain Phases
         kill_chain_phases_ids = []
         if (
             "kill_chain_phases" not in stix_object
-            and self.opencti.get_attribute_in_extension(
-                "kill_chain_phases", stix_object
-            )
+            and self.opencti.get_extension_attribute("kill_chain_phases", stix_object)
             is not None
         ):
-            stix_object["kill_chain_phases"] = self.opencti.get_attribute_in_extension(
+            stix_object["kill_chain_phases"] = self.opencti.get_extension_attribute(
                 "kill_chain_phases", stix_object
             )
         if "kill_chain_phases" in stix_object:
@@ -359,14 +665,14 @@ class OpenCTIStix2:
                 else:
                     if (
                         "x_opencti_order" not in kill_chain_phase
-                        and self.opencti.get_attribute_in_extension(
+                        and self.opencti.get_extension_attribute(
                             "order", kill_chain_phase
                         )
                         is not None
                     ):
                         kill_chain_phase[
                             "x_opencti_order"
-                        ] = self.opencti.get_attribute_in_extension(
+                        ] = self.opencti.get_extension_attribute(
                             "order", kill_chain_phase
                         )
                     kill_chain_phase = self.opencti.kill_chain_phase.create(
@@ -394,157 +700,128 @@ class OpenCTIStix2:
         # External References
         reports = {}
         external_references_ids = []
-        if (
-            "external_references" not in stix_object
-            and self.opencti.get_attribute_in_extension(
-                "external_references", stix_object
-            )
-            is not None
-        ):
-            stix_object[
-                "external_references"
-            ] = self.opencti.get_attribute_in_extension(
-                "external_references", stix_object
-            )
-        if "external_references" in stix_object:
-            for external_reference in stix_object["external_references"]:
-                url = external_reference["url"] if "url" in external_reference else None
-                source_name = (
-                    external_reference["source_name"]
-                    if "source_name" in external_reference
-                    else None
-                )
-                external_id = (
-                    external_reference["external_id"]
-                    if "external_id" in external_reference
-                    else None
+        with self.import_report.phase("external_references"):
+            if (
+                "external_references" not in stix_object
+                and self.opencti.get_extension_attribute(
+                    "external_references", stix_object
                 )
-                generated_ref_id = self.opencti.external_reference.generate_id(
-                    url, source_name, external_id
+                is not None
+            ):
+                stix_object[
+                    "external_references"
+                ] = self.opencti.get_extension_attribute(
+                    "external_references", stix_object
                 )
-                if generated_ref_id is None:
-                    continue
-                if generated_ref_id in self.mapping_cache:
-                    external_reference_id = self.mapping_cache[generated_ref_id]
-                else:
-                    external_reference_id = self.opencti.external_reference.create(
-                        source_name=source_name,
-                        url=url,
-                        external_id=external_id,
-                        description=external_reference["description"]
-                        if "description" in external_reference
-                        else None,
-                    )["id"]
-                if "x_opencti_files" in external_reference:
-                    for file in external_reference["x_opencti_files"]:
-                        self.opencti.external_reference.add_file(
-                            id=external_reference_id,
-                            file_name=file["name"],
-                            data=base64.b64decode(file["data"]),
-                            mime_type=file["mime_type"],
-                        )
-                if (
-                    self.opencti.get_attribute_in_extension("files", external_reference)
-                    is not None
-                ):
-                    for file in self.opencti.get_attribute_in_extension(
-                        "files", external_reference
+            if "external_references" in stix_object:
+                for external_reference in stix_object["external_references"]:
+                    url = (
+                        external_reference["url"]
+                        if "url" in external_reference
+                        else None
+                    )
+                    source_name = (
+                        external_reference["source_name"]
+                        if "source_name" in external_reference
+                        else None
+                    )
+                    external_id = (
+                        external_reference["external_id"]
+                        if "external_id" in external_reference
+                        else None
+                    )
+                    generated_ref_id = self.opencti.external_reference.generate_id(
+                        url, source_name, external_id
+                    )
+                    if generated_ref_id is None:
+                        continue
+                    if generated_ref_id in self.mapping_cache:
+                        external_reference_id = self.mapping_cache[generated_ref_id]
+                    else:
+                        external_reference_id = self.opencti.external_reference.create(
+                            source_name=source_name,
+                            url=url,
+                            external_id=external_id,
+                            description=external_reference["description"]
+                            if "description" in external_reference
+                            else None,
+                        )["id"]
+                    self.add_files(
+                        self.opencti.external_reference.add_file,
+                        external_reference_id,
+                        external_reference,
+                    )
+                    self.mapping_cache[generated_ref_id] = generated_ref_id
+                    external_references_ids.append(external_reference_id)
+                    if stix_object["type"] in [
+                        "threat-actor",
+                        "intrusion-set",
+                        "campaign",
+                        "incident",
+                        "malware",
+                        "relationship",
+                    ] and (
+                        types is not None and "external-reference-as-report" in types
                     ):
-                        self.opencti.external_reference.add_file(
-                            id=external_reference_id,
-                            file_name=file["name"],
-                            data=base64.b64decode(file["data"]),
-                            mime_type=file["mime_type"],
+                        # Add a corresponding report
+                        # Extract date
+                        published = self.date_extractor.extract_from_external_reference(
+                            external_reference
                         )
-                self.mapping_cache[generated_ref_id] = generated_ref_id
-                external_references_ids.append(external_reference_id)
-                if stix_object["type"] in [
-                    "threat-actor",
-                    "intrusion-set",
-                    "campaign",
-                    "incident",
-                    "malware",
-                    "relationship",
-                ] and (types is not None and "external-reference-as-report" in types):
-                    # Add a corresponding report
-                    # Extract date
-                    try:
-                        if "description" in external_reference:
-                            matches = datefinder.find_dates(
-                                external_reference["description"],
-                                base_date=datetime.datetime.fromtimestamp(0),
-                            )
+                        default_date = datetime.datetime.fromtimestamp(1)
+                        if published is None:
+                            published = default_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+                        if "mitre" in source_name and "name" in stix_object:
+                            title = "[MITRE ATT&CK] " + stix_object["name"]
+                            if "modified" in stix_object:
+                                published = stix_object["modified"]
+                        elif "amitt" in source_name and "name" in stix_object:
+                            title = "[AM!TT] " + stix_object["name"]
+                            if "modified" in stix_object:
+                                published = stix_object["modified"]
                         else:
-                            matches = datefinder.find_dates(
-                                source_name,
-                                base_date=datetime.datetime.fromtimestamp(0),
+                            title = source_name
+
+                        if "external_id" in external_reference:
+                            title = (
+                                title
+                                + " ("
+                                + str(external_reference["external_id"])
+                                + ")"
                             )
-                    except:
-                        matches = None
-                    published = None
-                    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-                    default_date = datetime.datetime.fromtimestamp(1)
-                    if matches is not None:
-                        try:
-                            for match in matches:
-                                if (
-                                    match.timestamp() < yesterday.timestamp()
-                                    and len(str(match.year)) == 4
-                                ):
-                                    published = match.strftime("%Y-%m-%dT%H:%M:%SZ")
-                                    break
-                        except:
-                            pass
-                    if published is None:
-                        published = default_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-                    if "mitre" in source_name and "name" in stix_object:
-                        title = "[MITRE ATT&CK] " + stix_object["name"]
-                        if "modified" in stix_object:
-                            published = stix_object["modified"]
-                    elif "amitt" in source_name and "name" in stix_object:
-                        title = "[AM!TT] " + stix_object["name"]
-                        if "modified" in stix_object:
-                            published = stix_object["modified"]
-                    else:
-                        title = source_name
-
-                    if "external_id" in external_reference:
-                        title = (
-                            title + " (" + str(external_reference["external_id"]) + ")"
-                        )
 
-                    if "marking_tlpclear" in self.mapping_cache:
-                        object_marking_ref_result = self.mapping_cache[
-                            "marking_tlpclear"
-                        ]
-                    else:
-                        object_marking_ref_result = (
-                            self.opencti.marking_definition.read(
-                                filters=[
-                                    {"key": "definition_type", "values": ["TLP"]},
-                                    {"key": "definition", "values": ["TLP:CLEAR"]},
-                                ]
+                        if "marking_tlpclear" in self.mapping_cache:
+                            object_marking_ref_result = self.mapping_cache[
+                                "marking_tlpclear"
+                            ]
+                        else:
+                            object_marking_ref_result = (
+                                self.opencti.marking_definition.read(
+                                    filters=[
+                                        {"key": "definition_type", "values": ["TLP"]},
+                                        {"key": "definition", "values": ["TLP:CLEAR"]},
+                                    ]
+                                )
                             )
+                            self.mapping_cache["marking_tlpclear"] = {
+                                "id": object_marking_ref_result["id"]
+                            }
+
+                        author = self.resolve_author(title)
+                        report = self.opencti.report.create(
+                            name=title,
+                            createdBy=author["id"] if author is not None else None,
+                            objectMarking=[object_marking_ref_result["id"]],
+                            externalReferences=[external_reference_id],
+                            description=external_reference["description"]
+                            if "description" in external_reference
+                            else "",
+                            report_types="threat-report",
+                            published=published,
+                            update=True,
                         )
-                        self.mapping_cache["marking_tlpclear"] = {
-                            "id": object_marking_ref_result["id"]
-                        }
-
-                    author = self.resolve_author(title)
-                    report = self.opencti.report.create(
-                        name=title,
-                        createdBy=author["id"] if author is not None else None,
-                        objectMarking=[object_marking_ref_result["id"]],
-                        externalReferences=[external_reference_id],
-                        description=external_reference["description"]
-                        if "description" in external_reference
-                        else "",
-                        report_types="threat-report",
-                        published=published,
-                        update=True,
-                    )
-                    reports[external_reference_id] = report
+                        reports[external_reference_id] = report
 
         return {
             "created_by": created_by_id,
@@ -580,7 +857,10 @@ class OpenCTIStix2:
         )
 
         # Extract
-        embedded_relationships = self.extract_embedded_relationships(stix_object, types)
+        with self.import_report.phase("extraction"):
+            embedded_relationships = self.extract_embedded_relationships(
+                stix_object, types
+            )
         created_by_id = embedded_relationships["created_by"]
         object_marking_ids = embedded_relationships["object_marking"]
         object_label_ids = embedded_relationships["object_label"]
@@ -601,36 +881,15 @@ class OpenCTIStix2:
         }
 
         # Import
-        importer = {
-            "marking-definition": self.opencti.marking_definition.import_from_stix2,
-            "attack-pattern": self.opencti.attack_pattern.import_from_stix2,
-            "campaign": self.opencti.campaign.import_from_stix2,
-            "event": self.opencti.event.import_from_stix2,
-            "note": self.opencti.note.import_from_stix2,
-            "observed-data": self.opencti.observed_data.import_from_stix2,
-            "opinion": self.opencti.opinion.import_from_stix2,
-            "report": self.opencti.report.import_from_stix2,
-            "course-of-action": self.opencti.course_of_action.import_from_stix2,
-            "identity": self.opencti.identity.import_from_stix2,
-            "indicator": self.opencti.indicator.import_from_stix2,
-            "infrastructure": self.opencti.infrastructure.import_from_stix2,
-            "intrusion-set": self.opencti.intrusion_set.import_from_stix2,
-            "location": self.opencti.location.import_from_stix2,
-            "malware": self.opencti.malware.import_from_stix2,
-            "threat-actor": self.opencti.threat_actor.import_from_stix2,
-            "tool": self.opencti.tool.import_from_stix2,
-            "channel": self.opencti.channel.import_from_stix2,
-            "narrative": self.opencti.narrative.import_from_stix2,
-            "vulnerability": self.opencti.vulnerability.import_from_stix2,
-            "incident": self.opencti.incident.import_from_stix2,
-        }
+        importer = self.get_dispatch_table("importers")
         do_import = importer.get(
             stix_object["type"],
             lambda **kwargs: self.unknown_type(stix_object),
         )
-        stix_object_results = do_import(
-            stixObject=stix_object, extras=extras, update=update
-        )
+        with self.import_report.phase("create"):
+            stix_object_results = do_import(
+                stixObject=stix_object, extras=extras, update=update
+            )
 
         if stix_object_results is None:
             return None
@@ -656,39 +915,26 @@ class OpenCTIStix2:
             # Add reports from external references
             for external_reference_id in external_references_ids:
                 if external_reference_id in reports:
-                    self.opencti.report.add_stix_object_or_stix_relationship(
-                        id=reports[external_reference_id]["id"],
-                        stixObjectOrStixRelationshipId=stix_object_result["id"],
+                    self.add_report_member(
+                        reports[external_reference_id]["id"], stix_object_result["id"]
                     )
             # Add files
-            if "x_opencti_files" in stix_object:
-                for file in stix_object["x_opencti_files"]:
-                    self.opencti.stix_domain_object.add_file(
-                        id=stix_object_result["id"],
-                        file_name=file["name"],
-                        data=base64.b64decode(file["data"]),
-                        mime_type=file["mime_type"],
-                    )
-            if (
-                self.opencti.get_attribute_in_extension("files", stix_object)
-                is not None
-            ):
-                for file in self.opencti.get_attribute_in_extension(
-                    "files", stix_object
-                ):
-                    self.opencti.stix_domain_object.add_file(
-                        id=stix_object_result["id"],
-                        file_name=file["name"],
-                        data=base64.b64decode(file["data"]),
-                        mime_type=file["mime_type"],
-                    )
+            with self.import_report.phase("files"):
+                self.add_files(
+                    self.opencti.stix_domain_object.add_file,
+                    stix_object_result["id"],
+                    stix_object,
+                )
         return stix_object_results
 
     def import_observable(
         self, stix_object: Dict, update: bool = False, types: List = None
     ) -> None:
         # Extract
-        embedded_relationships = self.extract_embedded_relationships(stix_object, types)
+        with self.import_report.phase("extraction"):
+            embedded_relationships = self.extract_embedded_relationships(
+                stix_object, types
+            )
         created_by_id = embedded_relationships["created_by"]
         object_marking_ids = embedded_relationships["object_marking"]
         object_label_ids = embedded_relationships["object_label"]
@@ -707,76 +953,62 @@ class OpenCTIStix2:
             "external_references_ids": external_references_ids,
             "reports": reports,
         }
-        if stix_object["type"] == "simple-observable":
-            stix_observable_result = self.opencti.stix_cyber_observable.create(
-                simple_observable_id=stix_object["id"],
-                simple_observable_key=stix_object["key"],
-                simple_observable_value=stix_object["value"]
-                if stix_object["key"] not in OBSERVABLES_VALUE_INT
-                else int(stix_object["value"]),
-                simple_observable_description=stix_object["description"]
-                if "description" in stix_object
-                else None,
-                x_opencti_score=stix_object["x_opencti_score"]
-                if "x_opencti_score" in stix_object
-                else None,
-                createdBy=extras["created_by_id"]
-                if "created_by_id" in extras
-                else None,
-                objectMarking=extras["object_marking_ids"]
-                if "object_marking_ids" in extras
-                else [],
-                objectLabel=extras["object_label_ids"]
-                if "object_label_ids" in extras
-                else [],
-                externalReferences=extras["external_references_ids"]
-                if "external_references_ids" in extras
-                else [],
-                createIndicator=stix_object["x_opencti_create_indicator"]
-                if "x_opencti_create_indicator" in stix_object
-                else None,
-                update=update,
-            )
-        else:
-            stix_observable_result = self.opencti.stix_cyber_observable.create(
-                observableData=stix_object,
-                createdBy=extras["created_by_id"]
-                if "created_by_id" in extras
-                else None,
-                objectMarking=extras["object_marking_ids"]
-                if "object_marking_ids" in extras
-                else [],
-                objectLabel=extras["object_label_ids"]
-                if "object_label_ids" in extras
-                else [],
-                externalReferences=extras["external_references_ids"]
-                if "external_references_ids" in extras
-                else [],
-                update=update,
-            )
+        with self.import_report.phase("create"):
+            if stix_object["type"] == "simple-observable":
+                stix_observable_result = self.opencti.stix_cyber_observable.create(
+                    simple_observable_id=stix_object["id"],
+                    simple_observable_key=stix_object["key"],
+                    simple_observable_value=stix_object["value"]
+                    if stix_object["key"] not in OBSERVABLES_VALUE_INT
+                    else int(stix_object["value"]),
+                    simple_observable_description=stix_object["description"]
+                    if "description" in stix_object
+                    else None,
+                    x_opencti_score=stix_object["x_opencti_score"]
+                    if "x_opencti_score" in stix_object
+                    else None,
+                    createdBy=extras["created_by_id"]
+                    if "created_by_id" in extras
+                    else None,
+                    objectMarking=extras["object_marking_ids"]
+                    if "object_marking_ids" in extras
+                    else [],
+                    objectLabel=extras["object_label_ids"]
+                    if "object_label_ids" in extras
+                    else [],
+                    externalReferences=extras["external_references_ids"]
+                    if "external_references_ids" in extras
+                    else [],
+                    createIndicator=stix_object["x_opencti_create_indicator"]
+                    if "x_opencti_create_indicator" in stix_object
+                    else None,
+                    update=update,
+                )
+            else:
+                stix_observable_result = self.opencti.stix_cyber_observable.create(
+                    observableData=stix_object,
+                    createdBy=extras["created_by_id"]
+                    if "created_by_id" in extras
+                    else None,
+                    objectMarking=extras["object_marking_ids"]
+                    if "object_marking_ids" in extras
+                    else [],
+                    objectLabel=extras["object_label_ids"]
+                    if "object_label_ids" in extras
+                    else [],
+                    externalReferences=extras["external_references_ids"]
+                    if "external_references_ids" in extras
+                    else [],
+                    update=update,
+                )
         if stix_observable_result is not None:
             # Add files
-            if "x_opencti_files" in stix_object:
-                for file in stix_object["x_opencti_files"]:
-                    self.opencti.stix_cyber_observable.add_file(
-                        id=stix_observable_result["id"],
-                        file_name=file["name"],
-                        data=base64.b64decode(file["data"]),
-                        mime_type=file["mime_type"],
-                    )
-            if (
-                self.opencti.get_attribute_in_extension("files", stix_object)
-                is not None
-            ):
-                for file in self.opencti.get_attribute_in_extension(
-                    "files", stix_object
-                ):
-                    self.opencti.stix_cyber_observable.add_file(
-                        id=stix_observable_result["id"],
-                        file_name=file["name"],
-                        data=base64.b64decode(file["data"]),
-                        mime_type=file["mime_type"],
-                    )
+            with self.import_report.phase("files"):
+                self.add_files(
+                    self.opencti.stix_cyber_observable.add_file,
+                    stix_observable_result["id"],
+                    stix_object,
+                )
             if "id" in stix_object:
                 self.mapping_cache[stix_object["id"]] = {
                     "id": stix_observable_result["id"],
@@ -787,6 +1019,7 @@ class OpenCTIStix2:
                 "type": stix_observable_result["entity_type"],
             }
             # Iterate over refs to create appropriate relationships
+            relationships = []
             for key in stix_object.keys():
                 if key not in [
                     "created_by_ref",
@@ -795,19 +1028,29 @@ class OpenCTIStix2:
                 ]:
                     if key.endswith("_ref"):
                         relationship_type = key.replace("_ref", "").replace("_", "-")
-                        self.opencti.stix_cyber_observable_relationship.create(
-                            fromId=stix_observable_result["id"],
-                            toId=stix_object[key],
-                            relationship_type=relationship_type,
+                        relationships.append(
+                            {
+                                "fromId": stix_observable_result["id"],
+                                "toId": stix_object[key],
+                                "relationship_type": relationship_type,
+                            }
                         )
                     elif key.endswith("_refs"):
                         relationship_type = key.replace("_refs", "").replace("_", "-")
                         for value in stix_object[key]:
-                            self.opencti.stix_cyber_observable_relationship.create(
-                                fromId=stix_observable_result["id"],
-                                toId=value,
-                                relationship_type=relationship_type,
+                            relationships.append(
+                                {
+                                    "fromId": stix_observable_result["id"],
+                                    "toId": value,
+                                    "relationship_type": relationship_type,
+                                }
                             )
+            if len(relationships) > 0:
+                # Failed creations are raised, as the single mutations were
+                with self.import_report.phase("create"):
+                    self.opencti.stix_cyber_observable_relationship.create_batch(
+                        inputs=relationships
+                    )
         else:
             return None
 
@@ -815,9 +1058,10 @@ class OpenCTIStix2:
         self, stix_relation: Dict, update: bool = False, types: List = None
     ) -> None:
         # Extract
-        embedded_relationships = self.extract_embedded_relationships(
-            stix_relation, types
-        )
+        with self.import_report.phase("extraction"):
+            embedded_relationships = self.extract_embedded_relationships(
+                stix_relation, types
+            )
         created_by_id = embedded_relationships["created_by"]
         object_marking_ids = embedded_relationships["object_marking"]
         object_label_ids = embedded_relationships["object_label"]
@@ -843,36 +1087,19 @@ class OpenCTIStix2:
         date = None
         if "external_references" in stix_relation:
             for external_reference in stix_relation["external_references"]:
-                try:
-                    if "description" in external_reference:
-                        matches = datefinder.find_dates(
-                            external_reference["description"],
-                            base_date=datetime.datetime.fromtimestamp(0),
-                        )
-                    else:
-                        matches = datefinder.find_dates(
-                            external_reference["source_name"],
-                            base_date=datetime.datetime.fromtimestamp(0),
-                        )
-                except:
-                    matches = None
-                date = None
-                yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-                if matches is not None:
-                    try:
-                        for match in matches:
-                            if (
-                                match.timestamp() < yesterday.timestamp()
-                                and len(str(match.year)) == 4
-                            ):
-                                date = match.strftime("%Y-%m-%dT%H:%M:%SZ")
-                                break
-                    except:
-                        date = None
-
-        stix_relation_result = self.opencti.stix_core_relationship.import_from_stix2(
-            stixRelation=stix_relation, extras=extras, update=update, defaultDate=date
-        )
+                date = self.date_extractor.extract_from_external_reference(
+                    external_reference
+                )
+
+        with self.import_report.phase("create"):
+            stix_relation_result = (
+                self.opencti.stix_core_relationship.import_from_stix2(
+                    stixRelation=stix_relation,
+                    extras=extras,
+                    update=update,
+                    defaultDate=date,
+                )
+            )
         if stix_relation_result is not None:
             self.mapping_cache[stix_relation["id"]] = {
                 "id": stix_relation_result["id"],
@@ -884,18 +1111,10 @@ class OpenCTIStix2:
         # Add external references
         for external_reference_id in external_references_ids:
             if external_reference_id in reports:
-                self.opencti.report.add_stix_object_or_stix_relationship(
-                    id=reports[external_reference_id]["id"],
-                    stixObjectOrStixRelationshipId=stix_relation_result["id"],
-                )
-                self.opencti.report.add_stix_object_or_stix_relationship(
-                    id=reports[external_reference_id]["id"],
-                    stixObjectOrStixRelationshipId=stix_relation["source_ref"],
-                )
-                self.opencti.report.add_stix_object_or_stix_relationship(
-                    id=reports[external_reference_id]["id"],
-                    stixObjectOrStixRelationshipId=stix_relation["target_ref"],
-                )
+                report_id = reports[external_reference_id]["id"]
+                self.add_report_member(report_id, stix_relation_result["id"])
+                self.add_report_member(report_id, stix_relation["source_ref"])
+                self.add_report_member(report_id, stix_relation["target_ref"])
 
     def import_sighting(
         self,
@@ -906,9 +1125,10 @@ class OpenCTIStix2:
         types: List = None,
     ) -> None:
         # Extract
-        embedded_relationships = self.extract_embedded_relationships(
-            stix_sighting, types
-        )
+        with self.import_report.phase("extraction"):
+            embedded_relationships = self.extract_embedded_relationships(
+                stix_sighting, types
+            )
         created_by_id = embedded_relationships["created_by"]
         object_marking_ids = embedded_relationships["object_marking"]
         object_label_ids = embedded_relationships["object_label"]
@@ -963,60 +1183,167 @@ class OpenCTIStix2:
                         "To ref of the sithing not found, doing nothing...",
                     )
                     return None
+        with self.import_report.phase("create"):
+            stix_sighting_result = self.opencti.stix_sighting_relationship.create(
+                fromId=final_from_id,
+                toId=final_to_id,
+                **self.sighting_input(stix_sighting, extras, update),
+            )
+        if stix_sighting_result is not None:
+            self.mapping_cache[stix_sighting["id"]] = {
+                "id": stix_sighting_result["id"],
+                "type": stix_sighting_result["entity_type"],
+            }
+        else:
+            return None
+
+    def sighting_input(self, stix_sighting: Dict, extras: Dict, update: bool) -> Dict:
+        """builds the creation parameters of a sighting, except fromId and toId"""
+
         date = datetime.datetime.today().strftime("%Y-%m-%dT%H:%M:%SZ")
         if (
             "x_opencti_negative" not in stix_sighting
-            and self.opencti.get_attribute_in_extension("negative", stix_sighting)
+            and self.opencti.get_extension_attribute("negative", stix_sighting)
             is not None
         ):
-            stix_sighting[
-                "x_opencti_negative"
-            ] = self.opencti.get_attribute_in_extension("negative", stix_sighting)
-        stix_sighting_result = self.opencti.stix_sighting_relationship.create(
-            fromId=final_from_id,
-            toId=final_to_id,
-            stix_id=stix_sighting["id"] if "id" in stix_sighting else None,
-            description=self.convert_markdown(stix_sighting["description"])
+            stix_sighting["x_opencti_negative"] = self.opencti.get_extension_attribute(
+                "negative", stix_sighting
+            )
+        return {
+            "stix_id": stix_sighting["id"] if "id" in stix_sighting else None,
+            "description": self.convert_markdown(stix_sighting["description"])
             if "description" in stix_sighting
             else None,
-            first_seen=stix_sighting["first_seen"]
+            "first_seen": stix_sighting["first_seen"]
             if "first_seen" in stix_sighting
             else date,
-            last_seen=stix_sighting["last_seen"]
+            "last_seen": stix_sighting["last_seen"]
             if "last_seen" in stix_sighting
             else date,
-            count=stix_sighting["count"] if "count" in stix_sighting else 1,
-            x_opencti_negative=stix_sighting["x_opencti_negative"]
+            "count": stix_sighting["count"] if "count" in stix_sighting else 1,
+            "x_opencti_negative": stix_sighting["x_opencti_negative"]
             if "x_opencti_negative" in stix_sighting
             else False,
-            created=stix_sighting["created"] if "created" in stix_sighting else None,
-            modified=stix_sighting["modified"] if "modified" in stix_sighting else None,
-            confidence=stix_sighting["confidence"]
+            "created": stix_sighting["created"] if "created" in stix_sighting else None,
+            "modified": stix_sighting["modified"]
+            if "modified" in stix_sighting
+            else None,
+            "confidence": stix_sighting["confidence"]
             if "confidence" in stix_sighting
             else 15,
-            createdBy=extras["created_by_id"] if "created_by_id" in extras else None,
-            objectMarking=extras["object_marking_ids"]
+            "createdBy": extras["created_by_id"] if "created_by_id" in extras else None,
+            "objectMarking": extras["object_marking_ids"]
             if "object_marking_ids" in extras
             else [],
-            objectLabel=extras["object_label_ids"]
+            "objectLabel": extras["object_label_ids"]
             if "object_label_ids" in extras
             else [],
-            externalReferences=extras["external_references_ids"]
+            "externalReferences": extras["external_references_ids"]
             if "external_references_ids" in extras
             else [],
-            update=update,
-            ignore_dates=stix_sighting["x_opencti_ignore_dates"]
+            "update": update,
+            "ignore_dates": stix_sighting["x_opencti_ignore_dates"]
             if "x_opencti_ignore_dates" in stix_sighting
             else None,
-        )
-        if stix_sighting_result is not None:
-            self.mapping_cache[stix_sighting["id"]] = {
-                "id": stix_sighting_result["id"],
-                "type": stix_sighting_result["entity_type"],
-            }
-        else:
+        }
+
+    def import_sighting_batch(
+        self,
+        stix_sighting: Dict,
+        from_ids: List[str],
+        to_ids: List[str],
+        update: bool = False,
+        types: List = None,
+    ) -> None:
+        """imports a sighting for every (from, to) pair in batched requests
+
+        The embedded relationships are extracted once, the refs missing from
+        the mapping cache are resolved together and the sightings are created
+        with aliased mutations instead of one request per pair.
+
+        :param stix_sighting: valid stix2 sighting
+        :type stix_sighting: dict
+        :param from_ids: sighting_of_ref and observed_data_refs of the sighting
+        :type from_ids: list
+        :param to_ids: where_sighted_refs of the sighting
+        :type to_ids: list
+        :param update: whether to updated data in the database, defaults to False
+        :type update: bool, optional
+        :param types: list of stix2 types, defaults to None
+        :type types: list, optional
+        """
+
+        if len(from_ids) == 0 or len(to_ids) == 0:
             return None
 
+        # Extract
+        with self.import_report.phase("extraction"):
+            embedded_relationships = self.extract_embedded_relationships(
+                stix_sighting, types
+            )
+        extras = {
+            "created_by_id": embedded_relationships["created_by"],
+            "object_marking_ids": embedded_relationships["object_marking"],
+            "object_label_ids": embedded_relationships["object_label"],
+            "external_references_ids": embedded_relationships["external_references"],
+        }
+
+        # Resolve the refs which are not in the mapping cache
+        missing_ids = []
+        for ref in from_ids + to_ids:
+            if ref not in self.mapping_cache and ref not in missing_ids:
+                missing_ids.append(ref)
+        resolved = {}
+        if len(missing_ids) > 0:
+            results = self.opencti.opencti_stix_object_or_stix_relationship.read_many(
+                ids=missing_ids, customAttributes="id entity_type"
+            )
+            for ref, result in results.items():
+                resolved[ref] = {"id": result["id"], "type": result["entity_type"]}
+                self.mapping_cache[ref] = resolved[ref]
+
+        def final_id(ref: str):
+            if ref in resolved:
+                return resolved[ref]["id"]
+            if ref in self.mapping_cache:
+                return self.mapping_cache[ref]["id"]
+            return None
+
+        # Create the sightings
+        sighting_input = self.sighting_input(stix_sighting, extras, update)
+        inputs = []
+        for from_id in from_ids:
+            final_from_id = final_id(from_id)
+            for to_id in to_ids:
+                if final_from_id is None:
+                    self.opencti.log(
+                        "error",
+                        "From ref of the sithing not found, doing nothing...",
+                    )
+                    continue
+                final_to_id = final_id(to_id)
+                if final_to_id is None:
+                    self.opencti.log(
+                        "error",
+                        "To ref of the sithing not found, doing nothing...",
+                    )
+                    continue
+                inputs.append(
+                    dict(sighting_input, fromId=final_from_id, toId=final_to_id)
+                )
+        if len(inputs) == 0:
+            return None
+        with self.import_report.phase("create"):
+            stix_sighting_results = (
+                self.opencti.stix_sighting_relationship.create_batch(inputs=inputs)
+            )
+        for stix_sighting_result in stix_sighting_results:
+            if stix_sighting_result is not None:
+                self.mapping_cache[stix_sighting["id"]] = {
+                    "id": stix_sighting_result["id"],
+                    "type": stix_sighting_result["entity_type"],
+                }
+
     # endregion
 
     # region export
@@ -1443,29 +1770,7 @@ class OpenCTIStix2:
                     )
 
             # Export
-            reader = {
-                "Attack-Pattern": self.opencti.attack_pattern.read,
-                "Campaign": self.opencti.campaign.read,
-                "Note": self.opencti.note.read,
-                "Observed-Data": self.opencti.observed_data.read,
-                "Opinion": self.opencti.opinion.read,
-                "Report": self.opencti.report.read,
-                "Course-Of-Action": self.opencti.course_of_action.read,
-                "Identity": self.opencti.identity.read,
-                "Indicator": self.opencti.indicator.read,
-                "Infrastructure": self.opencti.infrastructure.read,
-                "Intrusion-Set": self.opencti.intrusion_set.read,
-                "Location": self.opencti.location.read,
-                "Language": self.opencti.language.read,
-                "Malware": self.opencti.malware.read,
-                "Threat-Actor": self.opencti.threat_actor.read,
-                "Tool": self.opencti.tool.read,
-                "Vulnerability": self.opencti.vulnerability.read,
-                "Incident": self.opencti.incident.read,
-                "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.read,
-                "stix-core-relationship": self.opencti.stix_core_relationship.read,
-                "stix-sighting-relationship": self.opencti.stix_sighting_relationship.read,
-            }
+            reader = self.get_dispatch_table("object_readers")
             # Get extra objects
             for entity_object in objects_to_get:
                 # Map types
@@ -1588,31 +1893,7 @@ class OpenCTIStix2:
             entity_type = "Location"
 
         # Reader
-        reader = {
-            "Attack-Pattern": self.opencti.attack_pattern.read,
-            "Campaign": self.opencti.campaign.read,
-            "Event": self.opencti.campaign.read,
-            "Note": self.opencti.note.read,
-            "Observed-Data": self.opencti.observed_data.read,
-            "Opinion": self.opencti.opinion.read,
-            "Report": self.opencti.report.read,
-            "Course-Of-Action": self.opencti.course_of_action.read,
-            "Identity": self.opencti.identity.read,
-            "Indicator": self.opencti.indicator.read,
-            "Infrastructure": self.opencti.infrastructure.read,
-            "Intrusion-Set": self.opencti.intrusion_set.read,
-            "Location": self.opencti.location.read,
-            "Language": self.opencti.language.read,
-            "Malware": self.opencti.malware.read,
-            "Threat-Actor": self.opencti.threat_actor.read,
-            "Tool": self.opencti.tool.read,
-            "Channel": self.opencti.channel.read,
-            "Narrative": self.opencti.narrative.read,
-            "Vulnerability": self.opencti.vulnerability.read,
-            "Incident": self.opencti.incident.read,
-            "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.read,
-            "stix-core-relationship": self.opencti.stix_core_relationship.read,
-        }
+        reader = self.get_dispatch_table("entity_readers")
         if StixCyberObservableTypes.has_value(entity_type):
             entity_type = "Stix-Cyber-Observable"
         do_read = reader.get(
@@ -1681,33 +1962,7 @@ class OpenCTIStix2:
             entity_type = "Stix-Cyber-Observable"
 
         # List
-        lister = {
-            "Stix-Domain-Object": self.opencti.stix_domain_object.list,
-            "Attack-Pattern": self.opencti.attack_pattern.list,
-            "Campaign": self.opencti.campaign.list,
-            "Event": self.opencti.event.list,
-            "Note": self.opencti.note.list,
-            "Observed-Data": self.opencti.observed_data.list,
-            "Opinion": self.opencti.opinion.list,
-            "Report": self.opencti.report.list,
-            "Course-Of-Action": self.opencti.course_of_action.list,
-            "Identity": self.opencti.identity.list,
-            "Indicator": self.opencti.indicator.list,
-            "Infrastructure": self.opencti.infrastructure.list,
-            "Intrusion-Set": self.opencti.intrusion_set.list,
-            "Location": self.opencti.location.list,
-            "Language": self.opencti.language.list,
-            "Malware": self.opencti.malware.list,
-            "Threat-Actor": self.opencti.threat_actor.list,
-            "Tool": self.opencti.tool.list,
-            "Channel": self.opencti.channel.list,
-            "Narrative": self.opencti.narrative.list,
-            "Vulnerability": self.opencti.vulnerability.list,
-            "Incident": self.opencti.incident.list,
-            "Stix-Cyber-Observable": self.opencti.stix_cyber_observable.list,
-            "stix-sighting-relationship": self.opencti.stix_sighting_relationship.list,
-            "stix-core-relationship": self.opencti.stix_core_relationship.list,
-        }
+        lister = self.get_dispatch_table("listers")
         do_list = lister.get(
             entity_type, lambda **kwargs: self.unknown_type({"type": entity_type})
         )
@@ -1738,13 +1993,154 @@ class OpenCTIStix2:
                     bundle["objects"] = bundle["objects"] + entity_bundle_filtered
         return bundle
 
+    def import_item(
+        self,
+        item: Dict,
+        update: bool = False,
+        types: List = None,
+        event_version: str = None,
+    ) -> None:
+        """import a single stix2 object of a split bundle
+
+        :param item: valid stix2 object
+        :type item: dict
+        :param update: whether to updated data in the database, defaults to False
+        :type update: bool, optional
+        :param types: list of stix2 types, defaults to None
+        :type types: list, optional
+        :param event_version: event version of the bundle, defaults to None
+        :type event_version: str, optional
+        """
+
+        # Extension attributes are looked up many times, flatten them once
+        self.opencti.set_extension_object(item)
+        if event_version == "3" and "x_opencti_patch" in item:
+            self.stix2_update.process_update(item)
+        elif item["type"] == "relationship":
+            self.import_relationship(item, update, types)
+        elif item["type"] == "sighting":
+            # Resolve the to
+            to_ids = []
+            if "where_sighted_refs" in item:
+                for where_sighted_ref in item["where_sighted_refs"]:
+                    to_ids.append(where_sighted_ref)
+            # Import sighting_of_ref and observed_data_refs
+            from_ids = [item["sighting_of_ref"]]
+            if "observed_data_refs" in item:
+                from_ids.extend(item["observed_data_refs"])
+            self.import_sighting_batch(item, from_ids, to_ids, update)
+        elif item["type"] == "label":
+            stix_ids = self.opencti.get_extension_attribute("stix_ids", item)
+            self.opencti.label.create(
+                stix_id=item["id"],
+                value=item["value"],
+                color=item["color"],
+                x_opencti_stix_ids=stix_ids,
+                update=update,
+            )
+        elif item["type"] == "external-reference":
+            stix_ids = self.opencti.get_extension_attribute("stix_ids", item)
+            self.opencti.external_reference.create(
+                stix_id=item["id"],
+                source_name=item["source_name"] if "source_name" in item else None,
+                url=item["url"] if "url" in item else None,
+                external_id=item["external_id"] if "external_id" in item else None,
+                description=item["description"] if "description" in item else None,
+                x_opencti_stix_ids=stix_ids,
+                update=update,
+            )
+        elif item["type"] == "kill-chain-phase":
+            stix_ids = self.opencti.get_extension_attribute("stix_ids", item)
+            self.opencti.kill_chain_phase.create(
+                stix_id=item["id"],
+                kill_chain_name=item["kill_chain_name"],
+                phase_name=item["phase_name"],
+                x_opencti_order=item["order"] if "order" in item else 0,
+                x_opencti_stix_ids=stix_ids,
+                update=update,
+            )
+        elif StixCyberObservableTypes.has_value(item["type"]):
+            if types is None or len(types) == 0:
+                self.import_observable(item, update, types)
+            elif item["type"] in types or "observable" in types:
+                self.import_observable(item, update, types)
+        else:
+            # Check the scope
+            if item["type"] == "marking-definition" or types is None or len(types) == 0:
+                self.import_object(item, update, types)
+            # Handle identity & location if part of the scope
+            elif item["type"] in types:
+                self.import_object(item, update, types)
+            else:
+                # Specific OpenCTI scopes
+                if item["type"] == "identity":
+                    if "identity_class" in item:
+                        if ("class" in types or "sector" in types) and item[
+                            "identity_class"
+                        ] == "class":
+                            self.import_object(item, update, types)
+                        elif item["identity_class"] in types:
+                            self.import_object(item, update, types)
+                elif item["type"] == "location":
+                    if "x_opencti_location_type" in item:
+                        if item["x_opencti_location_type"].lower() in types:
+                            self.import_object(item, update, types)
+                    elif (
+                        self.opencti.get_extension_attribute("location_type", item)
+                        is not None
+                    ):
+                        if (
+                            self.opencti.get_extension_attribute(
+                                "location_type", item
+                            ).lower()
+                            in types
+                        ):
+                            self.import_object(item, update, types)
+
     def import_bundle(
         self,
         stix_bundle: Dict,
         update: bool = False,
         types: List = None,
         retry_number: int = None,
-    ) -> List:
+        checkpoint_file: str = None,
+        checkpoint_interval: int = 1000,
+        resume: bool = False,
+        with_report: bool = False,
+        log_report: bool = False,
+        processes: int = None,
+    ) -> Union[List, Tuple[List, Dict]]:
+        """import a stix2 bundle
+
+        :param stix_bundle: valid stix2 bundle
+        :type stix_bundle: dict
+        :param update: whether to updated data in the database, defaults to False
+        :type update: bool, optional
+        :param types: list of stix2 types, defaults to None
+        :type types: list, optional
+        :param retry_number: retry number sent to the API, defaults to None
+        :type retry_number: int, optional
+        :param checkpoint_file: path of the checkpoint file, checkpointing is
+            disabled if not set, defaults to None
+        :type checkpoint_file: str, optional
+        :param checkpoint_interval: number of split bundles imported between two
+            checkpoints, defaults to 1000
+        :type checkpoint_interval: int, optional
+        :param resume: whether to restart from the last checkpoint, defaults to False
+        :type resume: bool, optional
+        :param with_report: whether to return the import report along with the
+            imported objects, defaults to False
+        :type with_report: bool, optional
+        :param log_report: whether to log the import report as JSON, defaults to False
+        :type log_report: bool, optional
+        :param processes: number of processes importing the independent parts
+            of the bundle in parallel, defaults to None (no parallelism)
+        :type processes: int, optional
+        :return: list of imported stix2 objects, and the import report if
+            `with_report` is set
+        :rtype: List or Tuple
+        """
+
         # Check if the bundle is correctly formatted
         if "type" not in stix_bundle or stix_bundle["type"] != "bundle":
             raise ValueError("JSON data type is not a STIX2 bundle")
@@ -1757,122 +2153,329 @@ class OpenCTIStix2:
         )
         if retry_number is not None:
             self.opencti.set_retry_number(retry_number)
+        if processes is not None and processes > 1:
+            if checkpoint_file is not None:
+                raise ValueError("Checkpoints are not supported with processes")
+            return self.import_bundle_processes(
+                stix_bundle, update, types, processes, with_report, log_report
+            )
+        bundle_id = stix_bundle["id"] if "id" in stix_bundle else None
         stix2_splitter = OpenCTIStix2Splitter()
-        try:
-            bundles = stix2_splitter.split_bundle(stix_bundle, False, event_version)
-        except RecursionError:
-            bundles = [stix_bundle]
-        # Import every elements in a specific order
+        bundles = stix2_splitter.split_bundle(stix_bundle, False, event_version)
+        if len(stix2_splitter.cycles) > 0:
+            self.opencti.log(
+                "warning",
+                "Bundle contains "
+                + str(len(stix2_splitter.cycles))
+                + " objects in a reference cycle, importing each cycle at once",
+            )
+        if stix2_splitter.duplicates > 0:
+            self.opencti.log(
+                "info",
+                "Dropped "
+                + str(stix2_splitter.duplicates)
+                + " superseded versions of repeated objects",
+            )
+        self.prefetch_sighting_refs(bundles)
+        return self.import_split_bundles(
+            bundle_id,
+            bundles,
+            update,
+            types,
+            event_version,
+            checkpoint_file,
+            checkpoint_interval,
+            resume,
+            with_report=with_report,
+            log_report=log_report,
+        )
+
+    def import_bundle_processes(
+        self,
+        stix_bundle: Dict,
+        update: bool = False,
+        types: List = None,
+        processes: int = 2,
+        with_report: bool = False,
+        log_report: bool = False,
+    ) -> Union[List, Tuple[List, Dict]]:
+        """import a stix2 bundle with a pool of processes
+
+        Markings and identities are imported first, then the connected
+        components of the other objects are imported in parallel, each process
+        holding its own OpenCTI client.
+
+        :param stix_bundle: valid stix2 bundle
+        :type stix_bundle: dict
+        :param update: whether to updated data in the database, defaults to False
+        :type update: bool, optional
+        :param types: list of stix2 types, defaults to None
+        :type types: list, optional
+        :param processes: number of processes, defaults to 2
+        :type processes: int, optional
+        :param with_report: whether to return the import report along with the
+            imported objects, defaults to False
+        :type with_report: bool, optional
+        :param log_report: whether to log the import report as JSON, defaults to False
+        :type log_report: bool, optional
+        :return: list of imported stix2 objects, and the import report if
+            `with_report` is set
+        :rtype: List or Tuple
+        """
+
+        start_time = time.perf_counter()
+        partitioner = OpenCTIStix2Partitioner()
+        shared_objects, other_objects = partitioner.split_shared(stix_bundle["objects"])
+        attributes = {
+            key: value for key, value in stix_bundle.items() if key != "objects"
+        }
         imported_elements = []
+        reports = []
+        if len(shared_objects) > 0:
+            elements, report = self.import_bundle(
+                dict(attributes, objects=shared_objects),
+                update,
+                types,
+                with_report=True,
+            )
+            imported_elements.extend(elements)
+            reports.append(report)
+
+        batches = partitioner.batches(
+            partitioner.connected_components(other_objects), processes
+        )
+        self.opencti.log(
+            "info",
+            "Importing "
+            + str(len(other_objects))
+            + " objects in "
+            + str(len(batches))
+            + " batches with "
+            + str(processes)
+            + " processes",
+        )
+        client_config = {
+            "url": self.opencti.api_url[: -len("/graphql")],
+            "token": self.opencti.api_token,
+            "log_level": self.opencti.log_level,
+            "json_logging": self.opencti.json_logging,
+            "ssl_verify": self.opencti.ssl_verify,
+            "proxies": self.opencti.proxies,
+            "headers": {
+                key: value
+                for key, value in self.opencti.get_request_headers().items()
+                if key != "Authorization"
+            },
+        }
+        mapping_cache = dict(self.mapping_cache)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(
+                    import_bundle_in_process,
+                    client_config,
+                    dict(attributes, objects=batch),
+                    update,
+                    types,
+                    mapping_cache,
+                )
+                for batch in batches
+            ]
+            for future in futures:
+                elements, report = future.result()
+                imported_elements.extend(elements)
+                reports.append(report)
+
+        import_report = OpenCTIStix2ImportReport.merge(
+            reports, time.perf_counter() - start_time
+        )
+        if log_report:
+            self.opencti.log("info", json.dumps(import_report))
+        if with_report:
+            return imported_elements, import_report
+        return imported_elements
+
+    def prefetch_sighting_refs(self, bundles: List[Dict]) -> None:
+        """resolves in bulk the refs of the sightings which are not in the bundle
 
-        # Marking definitions
+        :param bundles: split bundles, in import order
+        :type bundles: list
+        """
+
+        defined_ids = set()
+        refs = {}
         for bundle in bundles:
             for item in bundle["objects"]:
-                if "x_opencti_event_version" in bundle:
-                    if bundle["x_opencti_event_version"] == "3":
-                        if "x_opencti_patch" in item:
-                            self.stix2_update.process_update(item)
-                            continue
-                if item["type"] == "relationship":
-                    self.import_relationship(item, update, types)
-                elif item["type"] == "sighting":
-                    # Resolve the to
-                    to_ids = []
-                    if "where_sighted_refs" in item:
-                        for where_sighted_ref in item["where_sighted_refs"]:
-                            to_ids.append(where_sighted_ref)
-                    # Import sighting_of_ref
-                    from_id = item["sighting_of_ref"]
-                    if len(to_ids) > 0:
-                        for to_id in to_ids:
-                            self.import_sighting(item, from_id, to_id, update)
-                    # Import observed_data_refs
-                    if "observed_data_refs" in item:
-                        for observed_data_ref in item["observed_data_refs"]:
-                            if len(to_ids) > 0:
-                                for to_id in to_ids:
-                                    self.import_sighting(
-                                        item, observed_data_ref, to_id, update
-                                    )
-                elif item["type"] == "label":
-                    stix_ids = self.opencti.get_attribute_in_extension("stix_ids", item)
-                    self.opencti.label.create(
-                        stix_id=item["id"],
-                        value=item["value"],
-                        color=item["color"],
-                        x_opencti_stix_ids=stix_ids,
-                        update=update,
-                    )
-                elif item["type"] == "external-reference":
-                    stix_ids = self.opencti.get_attribute_in_extension("stix_ids", item)
-                    self.opencti.external_reference.create(
-                        stix_id=item["id"],
-                        source_name=item["source_name"]
-                        if "source_name" in item
-                        else None,
-                        url=item["url"] if "url" in item else None,
-                        external_id=item["external_id"]
-                        if "external_id" in item
-                        else None,
-                        description=item["description"]
-                        if "description" in item
-                        else None,
-                        x_opencti_stix_ids=stix_ids,
-                        update=update,
-                    )
-                elif item["type"] == "kill-chain-phase":
-                    stix_ids = self.opencti.get_attribute_in_extension("stix_ids", item)
-                    self.opencti.kill_chain_phase.create(
-                        stix_id=item["id"],
-                        kill_chain_name=item["kill_chain_name"],
-                        phase_name=item["phase_name"],
-                        x_opencti_order=item["order"] if "order" in item else 0,
-                        x_opencti_stix_ids=stix_ids,
-                        update=update,
+                defined_ids.add(item["id"])
+                if item["type"] == "sighting":
+                    if item.get("sighting_of_ref") is not None:
+                        refs[item["sighting_of_ref"]] = True
+                    for key in ["observed_data_refs", "where_sighted_refs"]:
+                        for ref in item.get(key) or []:
+                            refs[ref] = True
+        missing_ids = [
+            ref
+            for ref in refs
+            if ref not in defined_ids and ref not in self.mapping_cache
+        ]
+        if len(missing_ids) == 0:
+            return
+        results = self.opencti.opencti_stix_object_or_stix_relationship.read_many(
+            ids=missing_ids, customAttributes="id entity_type"
+        )
+        for ref, result in results.items():
+            self.mapping_cache[ref] = {
+                "id": result["id"],
+                "type": result["entity_type"],
+            }
+
+    def import_bundle_reader(
+        self,
+        bundle_reader: OpenCTIStix2BundleReader,
+        update: bool = False,
+        types: List = None,
+        checkpoint_file: str = None,
+        checkpoint_interval: int = 1000,
+        resume: bool = False,
+        with_report: bool = False,
+        log_report: bool = False,
+    ) -> Union[List, Tuple[List, Dict]]:
+        """import a stix2 bundle parsed incrementally by a bundle reader
+
+        The objects are loaded back from the spill file of the reader one split
+        bundle at a time, so the whole bundle is never held in memory.
+
+        :param bundle_reader: reader of the bundle file
+        :type bundle_reader: OpenCTIStix2BundleReader
+        :param update: whether to updated data in the database, defaults to False
+        :type update: bool, optional
+        :param types: list of stix2 types, defaults to None
+        :type types: list, optional
+        :param checkpoint_file: path of the checkpoint file, checkpointing is
+            disabled if not set, defaults to None
+        :type checkpoint_file: str, optional
+        :param checkpoint_interval: number of split bundles imported between two
+            checkpoints, defaults to 1000
+        :type checkpoint_interval: int, optional
+        :param resume: whether to restart from the last checkpoint, defaults to False
+        :type resume: bool, optional
+        :return: list of imported stix2 objects
+        :rtype: List
+        """
+
+        bundles = bundle_reader.split_bundle()
+        if bundle_reader.duplicates > 0:
+            self.opencti.log(
+                "info",
+                "Dropped "
+                + str(bundle_reader.duplicates)
+                + " superseded versions of repeated objects",
+            )
+        # Skeletons keep the refs of the objects
+        self.prefetch_sighting_refs(bundles)
+        return self.import_split_bundles(
+            bundle_reader.attributes.get("id"),
+            bundle_reader.iter_bundles(bundles),
+            update,
+            types,
+            bundle_reader.attributes.get("x_opencti_event_version"),
+            checkpoint_file,
+            checkpoint_interval,
+            resume,
+            nb_bundles=len(bundles),
+            with_report=with_report,
+            log_report=log_report,
+        )
+
+    def import_split_bundles(
+        self,
+        bundle_id: Optional[str],
+        bundles: Iterable[Dict],
+        update: bool = False,
+        types: List = None,
+        event_version: str = None,
+        checkpoint_file: str = None,
+        checkpoint_interval: int = 1000,
+        resume: bool = False,
+        nb_bundles: int = None,
+        with_report: bool = False,
+        log_report: bool = False,
+    ) -> Union[List, Tuple[List, Dict]]:
+        """import split bundles in order, with optional checkpointing
+
+        :param bundle_id: id of the original bundle
+        :type bundle_id: str
+        :param bundles: split bundles in import order
+        :type bundles: Iterable
+        :param nb_bundles: number of split bundles, required if `bundles` is
+            not a list, defaults to None
+        :type nb_bundles: int, optional
+        :param with_report: whether to return the import report along with the
+            imported objects, defaults to False
+        :type with_report: bool, optional
+        :param log_report: whether to log the import report as JSON, defaults to False
+        :type log_report: bool, optional
+        :return: list of imported stix2 objects
+        :rtype: List
+        """
+
+        if nb_bundles is None:
+            nb_bundles = len(bundles)
+        self.import_report = OpenCTIStix2ImportReport(self.opencti, self.mapping_cache)
+
+        # Restart from the last checkpoint
+        checkpoint = None
+        start_position = 0
+        if checkpoint_file is not None:
+            checkpoint = OpenCTIStix2Checkpoint(checkpoint_file, checkpoint_interval)
+            if resume:
+                saved_checkpoint = checkpoint.load(bundle_id, nb_bundles)
+                if saved_checkpoint is not None:
+                    start_position = saved_checkpoint["position"]
+                    self.mapping_cache.update(saved_checkpoint["mapping_cache"])
+                    self.opencti.log(
+                        "info",
+                        "Resuming the import from checkpoint ("
+                        + str(start_position)
+                        + "/"
+                        + str(nb_bundles)
+                        + ")",
                     )
-                elif StixCyberObservableTypes.has_value(item["type"]):
-                    if types is None or len(types) == 0:
-                        self.import_observable(item, update, types)
-                    elif item["type"] in types or "observable" in types:
-                        self.import_observable(item, update, types)
-                else:
-                    # Check the scope
-                    if (
-                        item["type"] == "marking-definition"
-                        or types is None
-                        or len(types) == 0
-                    ):
-                        self.import_object(item, update, types)
-                    # Handle identity & location if part of the scope
-                    elif item["type"] in types:
-                        self.import_object(item, update, types)
-                    else:
-                        # Specific OpenCTI scopes
-                        if item["type"] == "identity":
-                            if "identity_class" in item:
-                                if ("class" in types or "sector" in types) and item[
-                                    "identity_class"
-                                ] == "class":
-                                    self.import_object(item, update, types)
-                                elif item["identity_class"] in types:
-                                    self.import_object(item, update, types)
-                        elif item["type"] == "location":
-                            if "x_opencti_location_type" in item:
-                                if item["x_opencti_location_type"].lower() in types:
-                                    self.import_object(item, update, types)
-                            elif (
-                                self.opencti.get_attribute_in_extension(
-                                    "location_type", item
-                                )
-                                is not None
-                            ):
-                                if (
-                                    self.opencti.get_attribute_in_extension(
-                                        "location_type", item
-                                    ).lower()
-                                    in types
-                                ):
-                                    self.import_object(item, update, types)
-                imported_elements.append({"id": item["id"], "type": item["type"]})
 
+        # Import every elements in a specific order
+        imported_elements = []
+        self.file_uploader.start()
+        self.report_members = {}
+        try:
+            for position, bundle in enumerate(bundles):
+                for item in bundle["objects"]:
+                    if position >= start_position:
+                        with self.import_report.object(item):
+                            self.import_item(item, update, types, event_version)
+                    imported_elements.append({"id": item["id"], "type": item["type"]})
+                if (
+                    checkpoint is not None
+                    and position >= start_position
+                    and (position + 1) % checkpoint.interval == 0
+                ):
+                    # Files and report members of the checkpointed objects
+                    # must be sent
+                    self.file_uploader.flush()
+                    self.flush_report_members()
+                    checkpoint.save(
+                        bundle_id, nb_bundles, position + 1, self.mapping_cache
+                    )
+            self.flush_report_members()
+            self.file_uploader.wait()
+        finally:
+            self.report_members = None
+            self.file_uploader.shutdown()
+            self.opencti.set_extension_object(None)
+        if checkpoint is not None:
+            checkpoint.clear()
+
+        self.import_report.stop()
+        if log_report:
+            self.opencti.log("info", json.dumps(self.import_report.to_dict()))
+        if with_report:
+            return imported_elements, self.import_report.to_dict()
         return imported_elements
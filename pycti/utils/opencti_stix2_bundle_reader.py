@@ -0,0 +1,271 @@
+# coding: utf-8
+
+import json
+import os
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+from pycti.utils.opencti_stix2_splitter import OpenCTIStix2Splitter
+
+CHUNK_SIZE = 1024 * 1024
+WHITESPACES = " \t\n\r"
+
+
+class OpenCTIStix2BundleReader:
+    """Incremental reader of a stix2 bundle file
+
+    The `objects` of the bundle are parsed one at a time and spilled to a
+    temporary file, only a compact index (offset and length in the spill file)
+    and the references of every object are kept in memory to resolve the
+    import order.
+
+    :param file_path: path of the bundle file
+    :type file_path: str
+    :param chunk_size: number of characters read from the file at once
+    :type chunk_size: int, optional
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.attributes = {}
+        self.index = {}
+        self.skeletons = {}
+        # Number of superseded versions of repeated objects dropped
+        self.duplicates = 0
+        self.spill_file = None
+        self.decoder = json.JSONDecoder()
+        self.file = None
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+    # region parsing
+    def _read(self, size: int) -> None:
+        if self.position > 0:
+            self.buffer = self.buffer[self.position :]
+            self.position = 0
+        data = self.file.read(size)
+        if len(data) == 0:
+            self.eof = True
+        self.buffer += data
+
+    def _peek(self) -> str:
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACES
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                raise ValueError("Unexpected end of the bundle file")
+            self._read(self.chunk_size)
+
+    def _expect(self, characters: str) -> str:
+        character = self._peek()
+        if character not in characters:
+            raise ValueError(
+                "Invalid bundle file, expected one of '"
+                + characters
+                + "' but found '"
+                + character
+                + "'"
+            )
+        self.position += 1
+        return character
+
+    def _decode(self) -> Tuple[object, str]:
+        """decodes the next JSON value and returns it with its raw text"""
+
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A value ending with the buffer may be truncated (numbers)
+                if end < len(self.buffer) or self.eof:
+                    raw = self.buffer[self.position : end]
+                    self.position = end
+                    return value, raw
+            except ValueError:
+                if self.eof:
+                    raise
+            # Read at least as much as the current value to stay linear
+            self._read(max(self.chunk_size, len(self.buffer) - self.position))
+
+    def iter_objects(self) -> Iterator[Tuple[Dict, str]]:
+        """parses the bundle file and yields its objects one at a time
+
+        The other attributes of the bundle (`type`, `id`, ...) are stored in
+        `attributes` as they are parsed.
+
+        :return: iterator of (object, raw JSON of the object)
+        :rtype: Iterator
+        """
+
+        with open(self.file_path) as file:
+            self.file = file
+            self.buffer = ""
+            self.position = 0
+            self.eof = False
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key, _ = self._decode()
+                self._expect(":")
+                if key == "objects":
+                    self._expect("[")
+                    if self._peek() == "]":
+                        self.position += 1
+                    else:
+                        while True:
+                            yield self._decode()
+                            if self._expect(",]") == "]":
+                                break
+                else:
+                    self.attributes[key] = self._decode()[0]
+                if self._expect(",}") == "}":
+                    break
+            self.file = None
+
+    # endregion
+
+    # region index
+    @staticmethod
+    def skeleton(stix_object: Dict) -> Dict:
+        """keeps only the attributes of an object used to resolve dependencies
+
+        :param stix_object: valid stix2 object
+        :type stix_object: dict
+        :return: the id, type, modification date and references of the object
+        :rtype: dict
+        """
+
+        skeleton = {"id": stix_object["id"], "type": stix_object["type"]}
+        if "modified" in stix_object:
+            skeleton["modified"] = stix_object["modified"]
+        for key, value in stix_object.items():
+            if key.endswith("_ref") or key.endswith("_refs"):
+                skeleton[key] = value
+        return skeleton
+
+    def build_index(self) -> int:
+        """parses the bundle file, spills its objects and indexes them
+
+        Only the newest version of a repeated object is indexed, as
+        `OpenCTIStix2Splitter` does.
+
+        :return: number of objects in the bundle
+        :rtype: int
+        """
+
+        self.close()
+        self.index = {}
+        self.skeletons = {}
+        self.duplicates = 0
+        self.spill_file = tempfile.TemporaryFile()
+        nb_objects = 0
+        for stix_object, raw in self.iter_objects():
+            nb_objects += 1
+            current = self.skeletons.get(stix_object["id"])
+            if current is not None:
+                self.duplicates += 1
+                # The content of the indexed version breaks the ties
+                if OpenCTIStix2Splitter.version_key(
+                    stix_object
+                ) == OpenCTIStix2Splitter.version_key(current):
+                    current = self.read_object(stix_object["id"])
+                if not OpenCTIStix2Splitter.supersedes(stix_object, current):
+                    continue
+            data = raw.encode("utf-8")
+            offset = self.spill_file.seek(0, os.SEEK_END)
+            self.spill_file.write(data)
+            self.index[stix_object["id"]] = (offset, len(data))
+            self.skeletons[stix_object["id"]] = self.skeleton(stix_object)
+        if "type" not in self.attributes or self.attributes["type"] != "bundle":
+            raise ValueError("JSON data type is not a STIX2 bundle")
+        if nb_objects == 0:
+            raise ValueError("JSON data objects is empty")
+        return nb_objects
+
+    def read_object(self, id: str) -> Dict:
+        """reads an indexed object back from the spill file
+
+        :param id: id of the object
+        :type id: str
+        :return: the stix2 object
+        :rtype: dict
+        """
+
+        offset, length = self.index[id]
+        self.spill_file.seek(offset)
+        return json.loads(self.spill_file.read(length))
+
+    def load_object(self, skeleton: Dict) -> Dict:
+        """reads the complete object of a split skeleton back
+
+        The object is prepared as `OpenCTIStix2Splitter` prepares the objects
+        it splits in memory: its self references are removed and it gets the
+        `nb_deps` of its skeleton.
+
+        :param skeleton: skeleton returned by `split_bundle`
+        :type skeleton: dict
+        :return: the stix2 object
+        :rtype: dict
+        """
+
+        stix_object = self.read_object(skeleton["id"])
+        OpenCTIStix2Splitter.clean_refs(stix_object)
+        if "nb_deps" in skeleton:
+            stix_object["nb_deps"] = skeleton["nb_deps"]
+        return stix_object
+
+    # endregion
+
+    def split_bundle(self) -> List[Dict]:
+        """orders the indexed objects like `OpenCTIStix2Splitter.split_bundle`
+
+        The returned bundles only hold the skeletons of the objects, use
+        `iter_bundles` to load the complete objects.
+
+        :return: list of bundles of skeletons, in import order
+        :rtype: list
+        """
+
+        if self.spill_file is None:
+            self.build_index()
+        bundle = {"type": "bundle", "objects": list(self.skeletons.values())}
+        if "id" in self.attributes:
+            bundle["id"] = self.attributes["id"]
+        stix2_splitter = OpenCTIStix2Splitter()
+        return stix2_splitter.split_bundle(
+            bundle, False, self.attributes.get("x_opencti_event_version")
+        )
+
+    def iter_bundles(self, bundles: List[Dict]) -> Iterator[Dict]:
+        """loads the complete objects of bundles of skeletons
+
+        :param bundles: bundles returned by `split_bundle`
+        :type bundles: list
+        :return: iterator of bundles with the complete objects
+        :rtype: Iterator
+        """
+
+        for bundle in bundles:
+            yield dict(
+                bundle,
+                objects=[self.load_object(item) for item in bundle["objects"]],
+            )
@@ -0,0 +1,87 @@
+# coding: utf-8
+
+import json
+import os
+from typing import Dict, Optional
+
+
+class OpenCTIStix2Checkpoint:
+    """Checkpoint of a bundle import, persisted in a local JSON file
+
+    The checkpoint records the position reached in the split bundle sequence
+    and the resolved id mapping, so an interrupted import can be restarted
+    from this position instead of re-upserting every object.
+
+    :param file_path: path of the checkpoint file
+    :type file_path: str
+    :param interval: number of split bundles imported between two saves
+    :type interval: int, optional
+    """
+
+    def __init__(self, file_path: str, interval: int = 1000):
+        if interval is None or interval < 1:
+            raise ValueError("The checkpoint interval must be a positive integer")
+        self.file_path = file_path
+        self.interval = interval
+
+    def load(self, bundle_id: Optional[str], nb_bundles: int) -> Optional[Dict]:
+        """loads the checkpoint saved for a bundle
+
+        :param bundle_id: id of the imported bundle
+        :type bundle_id: str
+        :param nb_bundles: number of split bundles of the imported bundle
+        :type nb_bundles: int
+        :return: the checkpoint (`position` and `mapping_cache`) or None if
+            there is no checkpoint matching the bundle
+        :rtype: dict
+        """
+
+        if not os.path.isfile(self.file_path):
+            return None
+        try:
+            with open(self.file_path) as file:
+                checkpoint = json.load(file)
+        except ValueError:
+            return None
+        if (
+            checkpoint.get("bundle_id") != bundle_id
+            or checkpoint.get("nb_bundles") != nb_bundles
+        ):
+            return None
+        return checkpoint
+
+    def save(
+        self,
+        bundle_id: Optional[str],
+        nb_bundles: int,
+        position: int,
+        mapping_cache: Dict,
+    ) -> None:
+        """saves the checkpoint, replacing the previous one atomically
+
+        :param bundle_id: id of the imported bundle
+        :type bundle_id: str
+        :param nb_bundles: number of split bundles of the imported bundle
+        :type nb_bundles: int
+        :param position: number of split bundles already imported
+        :type position: int
+        :param mapping_cache: resolved id mapping of the import
+        :type mapping_cache: dict
+        """
+
+        checkpoint = {
+            "bundle_id": bundle_id,
+            "nb_bundles": nb_bundles,
+            "position": position,
+            "mapping_cache": mapping_cache,
+        }
+        temporary_file_path = self.file_path + ".tmp"
+        with open(temporary_file_path, "w") as file:
+            json.dump(checkpoint, file, default=str)
+        os.replace(temporary_file_path, self.file_path)
+
+    def clear(self) -> None:
+        """removes the checkpoint file once the import is complete"""
+
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
@@ -0,0 +1,172 @@
+# coding: utf-8
+
+import datetime
+import functools
+import re
+from typing import Dict, Iterator, Optional
+
+import datefinder
+
+datefinder.ValueError = ValueError, OverflowError
+
+CACHE_SIZE = 16384
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+MONTH_PATTERN = (
+    r"(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|"
+    r"july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|"
+    r"dec(?:ember)?)\.?"
+)
+DAY_PATTERN = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+YEAR_PATTERN = r"(?P<year>\d{4})"
+
+# Common formats of reference descriptions, tried before datefinder
+DATE_PATTERNS = [
+    # ISO 8601: 2020-03-05, 2020-03-05T10:00:00Z
+    re.compile(
+        r"\b(?P<year>\d{4})-(?P<month_number>\d{2})-(?P<day>\d{2})"
+        r"(?:[T ](?P<hour>\d{2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?",
+    ),
+    # MITRE citations: (2020, March 5), (2020, March)
+    re.compile(
+        r"\b"
+        + YEAR_PATTERN
+        + r",\s+"
+        + MONTH_PATTERN
+        + r"(?:\s+"
+        + DAY_PATTERN
+        + r")?\b",
+        re.IGNORECASE,
+    ),
+    # March 5, 2020
+    re.compile(
+        r"\b" + MONTH_PATTERN + r"\s+" + DAY_PATTERN + r",?\s+" + YEAR_PATTERN + r"\b",
+        re.IGNORECASE,
+    ),
+    # 5 March 2020
+    re.compile(
+        r"\b" + DAY_PATTERN + r"\s+" + MONTH_PATTERN + r",?\s+" + YEAR_PATTERN + r"\b",
+        re.IGNORECASE,
+    ),
+]
+
+
+class OpenCTIStix2DateExtractor:
+    """Extracts the publication date of external references
+
+    Common date formats are matched with precompiled regular expressions,
+    datefinder is only used when none of them matches. Results are memoized
+    by (source_name, description) so identical references are parsed once.
+
+    :param cache_size: maximum number of memoized references
+    :type cache_size: int, optional
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.extract_cached = functools.lru_cache(maxsize=cache_size)(
+            self._extract_cached
+        )
+
+    @staticmethod
+    def _build_date(match: re.Match) -> Optional[datetime.datetime]:
+        groups = match.groupdict()
+        try:
+            if groups.get("month_number") is not None:
+                month = int(groups["month_number"])
+            else:
+                month = MONTHS[groups["month"][:3].lower()]
+            return datetime.datetime(
+                int(groups["year"]),
+                month,
+                int(groups["day"]) if groups.get("day") is not None else 1,
+                int(groups["hour"]) if groups.get("hour") is not None else 0,
+                int(groups["minute"]) if groups.get("minute") is not None else 0,
+                int(groups["second"]) if groups.get("second") is not None else 0,
+            )
+        except (KeyError, ValueError):
+            return None
+
+    def find_dates(self, text: str) -> Iterator[datetime.datetime]:
+        """yields the dates of the supported formats in order of appearance
+
+        :param text: text to search
+        :type text: str
+        :return: iterator of dates
+        :rtype: Iterator
+        """
+
+        matches = []
+        for pattern in DATE_PATTERNS:
+            matches.extend(pattern.finditer(text))
+        matches.sort(key=lambda match: match.start())
+        for match in matches:
+            date = self._build_date(match)
+            if date is not None:
+                yield date
+
+    @staticmethod
+    def _first_valid(matches) -> Optional[str]:
+        yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+        for match in matches:
+            if match.timestamp() < yesterday.timestamp() and len(str(match.year)) == 4:
+                return match.strftime(DATE_FORMAT)
+        return None
+
+    def extract(self, text: str) -> Optional[str]:
+        """returns the first date of the text older than yesterday
+
+        :param text: text to search
+        :type text: str
+        :return: the date formatted as `YYYY-MM-DDTHH:MM:SSZ` or None
+        :rtype: str
+        """
+
+        date = self._first_valid(self.find_dates(text))
+        if date is not None:
+            return date
+        try:
+            return self._first_valid(
+                datefinder.find_dates(
+                    text, base_date=datetime.datetime.fromtimestamp(0)
+                )
+            )
+        except:
+            return None
+
+    def _extract_cached(
+        self, source_name: Optional[str], description: Optional[str]
+    ) -> Optional[str]:
+        return self.extract(description if description is not None else source_name)
+
+    def extract_from_external_reference(
+        self, external_reference: Dict
+    ) -> Optional[str]:
+        """returns the date of an external reference, from its description or
+        its source name
+
+        :param external_reference: stix2 external reference
+        :type external_reference: dict
+        :return: the date formatted as `YYYY-MM-DDTHH:MM:SSZ` or None
+        :rtype: str
+        """
+
+        try:
+            return self.extract_cached(
+                external_reference.get("source_name"),
+                external_reference.get("description"),
+            )
+        except:
+            return None
@@ -0,0 +1,152 @@
+# coding: utf-8
+
+import base64
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Number of base64 characters decoded at once, must be a multiple of 4
+DECODE_CHUNK_SIZE = 4 * 64 * 1024
+# Size above which a decoded file is spilled from memory to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+UPLOAD_WORKERS = 4
+
+
+class OpenCTIStix2FileUploader:
+    """Decodes and uploads the files embedded in stix2 objects
+
+    Files are decoded incrementally into spooled temporary files. Between
+    `start` and `wait`, uploads are submitted to a bounded pool of threads,
+    otherwise they are done synchronously.
+
+    :param opencti: OpenCTI instance
+    :param max_workers: number of concurrent uploads
+    :type max_workers: int, optional
+    """
+
+    def __init__(self, opencti, max_workers: int = UPLOAD_WORKERS):
+        self.opencti = opencti
+        self.max_workers = max_workers
+        self.executor = None
+        self.pending = None
+        self.futures: List[Future] = []
+
+    @staticmethod
+    def decode(data: str, chunk_size: int = DECODE_CHUNK_SIZE):
+        """decodes base64 data without holding the whole decoded content
+
+        :param data: base64 encoded data
+        :type data: str
+        :param chunk_size: number of characters decoded at once
+        :type chunk_size: int, optional
+        :return: the decoded data, positioned at its beginning
+        :rtype: tempfile.SpooledTemporaryFile
+        """
+
+        decoded_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        remainder = ""
+        for start in range(0, len(data), chunk_size):
+            chunk = remainder + "".join(data[start : start + chunk_size].split())
+            end = len(chunk) - len(chunk) % 4
+            decoded_file.write(base64.b64decode(chunk[:end]))
+            remainder = chunk[end:]
+        if len(remainder) > 0:
+            decoded_file.write(
+                base64.b64decode(remainder + "=" * (-len(remainder) % 4))
+            )
+        decoded_file.seek(0)
+        return decoded_file
+
+    def start(self) -> None:
+        """starts uploading files concurrently"""
+
+        if self.executor is None and self.max_workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            # Bound the decoded files waiting for an upload thread
+            self.pending = threading.BoundedSemaphore(self.max_workers * 2)
+
+    def _upload(self, add_file: Callable, file: dict, **kwargs) -> None:
+        data = self.decode(file["data"])
+        try:
+            add_file(
+                file_name=file["name"],
+                data=data,
+                mime_type=file["mime_type"],
+                **kwargs,
+            )
+        finally:
+            data.close()
+
+    def _upload_async(
+        self, headers: Dict, add_file: Callable, file: dict, **kwargs
+    ) -> None:
+        # Send the headers of the thread which submitted the upload
+        for key, value in headers.items():
+            self.opencti.set_thread_header(key, value)
+        try:
+            self._upload(add_file, file, **kwargs)
+        finally:
+            for key in headers:
+                self.opencti.set_thread_header(key, None)
+            self.pending.release()
+
+    def upload(self, add_file: Callable, file: dict, **kwargs) -> Optional[Future]:
+        """uploads an embedded file
+
+        :param add_file: `add_file` method of the entity owning the file
+        :type add_file: Callable
+        :param file: embedded file with `name`, `data` and `mime_type`
+        :type file: dict
+        :param `**kwargs`: other arguments of `add_file` (`id`)
+        :return: the future of the upload if uploads are concurrent
+        :rtype: Future
+        """
+
+        if self.executor is None:
+            self._upload(add_file, file, **kwargs)
+            return None
+        headers = self.opencti.get_request_headers()
+        self.pending.acquire()
+        try:
+            future = self.executor.submit(
+                self._upload_async, headers, add_file, file, **kwargs
+            )
+        except:
+            self.pending.release()
+            raise
+        self.futures.append(future)
+        return future
+
+    def flush(self) -> None:
+        """waits for the submitted uploads and raises the first failed one"""
+
+        futures = self.futures
+        self.futures = []
+        error = None
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.opencti.log("error", "File upload failed: " + str(e))
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+    def wait(self) -> None:
+        """waits for the submitted uploads and stops the pool"""
+
+        try:
+            self.flush()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """stops the pool, without checking the submitted uploads"""
+
+        self.futures = []
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.pending = None
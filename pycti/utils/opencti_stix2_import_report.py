@@ -0,0 +1,187 @@
+# coding: utf-8
+
+import heapq
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+SLOWEST_OBJECTS_SIZE = 10
+
+
+class OpenCTIStix2MappingCache(dict):
+    """Mapping cache of the stix2 import counting its hits and misses
+
+    Lookups of the import pipeline are done with `in` before reading the
+    value, so only membership tests are counted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key) -> bool:
+        found = super().__contains__(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def reset_statistics(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+class OpenCTIStix2ImportReport:
+    """Statistics of a stix2 bundle import
+
+    Phases are timed independently and can be nested: `extraction` includes
+    the time spent in `labels` and `external_references` resolution.
+
+    :param opencti: OpenCTI instance, used to count the GraphQL calls
+    :param mapping_cache: mapping cache used by the import
+    :type mapping_cache: OpenCTIStix2MappingCache, optional
+    """
+
+    def __init__(
+        self, opencti=None, mapping_cache: Optional[OpenCTIStix2MappingCache] = None
+    ):
+        self.opencti = opencti
+        self.mapping_cache = mapping_cache
+        self.objects = {}
+        self.phases = {}
+        self.slowest_objects = []
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self.start_query_count = self._query_count()
+        self.query_count = 0
+        if mapping_cache is not None:
+            mapping_cache.reset_statistics()
+
+    def _query_count(self) -> int:
+        return getattr(self.opencti, "query_count", 0)
+
+    @contextmanager
+    def phase(self, name: str):
+        """times a phase of the import
+
+        :param name: name of the phase
+        :type name: str
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+
+    @contextmanager
+    def object(self, stix_object: Dict):
+        """counts and times the import of a stix2 object
+
+        :param stix_object: valid stix2 object
+        :type stix_object: dict
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            stix_type = stix_object["type"]
+            self.objects[stix_type] = self.objects.get(stix_type, 0) + 1
+            entry = (duration, stix_object["id"], stix_type)
+            if len(self.slowest_objects) < SLOWEST_OBJECTS_SIZE:
+                heapq.heappush(self.slowest_objects, entry)
+            elif entry > self.slowest_objects[0]:
+                heapq.heapreplace(self.slowest_objects, entry)
+
+    def stop(self) -> None:
+        """ends the import, freezing the duration and the GraphQL call count"""
+
+        self.end_time = time.perf_counter()
+        self.query_count = self._query_count() - self.start_query_count
+
+    def to_dict(self) -> Dict:
+        """returns the report as a JSON serializable dict
+
+        :return: the import report
+        :rtype: dict
+        """
+
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        query_count = (
+            self.query_count
+            if self.end_time is not None
+            else self._query_count() - self.start_query_count
+        )
+        hits = self.mapping_cache.hits if self.mapping_cache is not None else 0
+        misses = self.mapping_cache.misses if self.mapping_cache is not None else 0
+        return {
+            "duration": round(end_time - self.start_time, 6),
+            "objects": dict(self.objects),
+            "phases": {name: round(value, 6) for name, value in self.phases.items()},
+            "graphql_calls": query_count,
+            "mapping_cache": {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4)
+                if hits + misses > 0
+                else None,
+            },
+            "slowest_objects": [
+                {"id": id, "type": stix_type, "duration": round(duration, 6)}
+                for duration, id, stix_type in sorted(
+                    self.slowest_objects, reverse=True
+                )
+            ],
+        }
+
+    @staticmethod
+    def merge(reports: List[Dict], duration: float) -> Dict:
+        """merges the reports of imports run in parallel
+
+        :param reports: reports returned by `to_dict`
+        :type reports: list
+        :param duration: wall clock duration of the whole import
+        :type duration: float
+        :return: the merged import report
+        :rtype: dict
+        """
+
+        objects = {}
+        phases = {}
+        graphql_calls = 0
+        hits = 0
+        misses = 0
+        slowest_objects = []
+        for report in reports:
+            for stix_type, count in report["objects"].items():
+                objects[stix_type] = objects.get(stix_type, 0) + count
+            for name, value in report["phases"].items():
+                phases[name] = phases.get(name, 0.0) + value
+            graphql_calls += report["graphql_calls"]
+            hits += report["mapping_cache"]["hits"]
+            misses += report["mapping_cache"]["misses"]
+            slowest_objects.extend(report["slowest_objects"])
+        return {
+            "duration": round(duration, 6),
+            "objects": objects,
+            "phases": {name: round(value, 6) for name, value in phases.items()},
+            "graphql_calls": graphql_calls,
+            "mapping_cache": {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4)
+                if hits + misses > 0
+                else None,
+            },
+            "slowest_objects": heapq.nlargest(
+                SLOWEST_OBJECTS_SIZE,
+                slowest_objects,
+                key=lambda entry: entry["duration"],
+            ),
+        }
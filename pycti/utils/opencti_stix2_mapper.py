@@ -0,0 +1,272 @@
+# coding: utf-8
+
+from typing import Callable, Dict
+
+# Marks a stix2 attribute without default, a missing attribute raises KeyError
+REQUIRED = object()
+
+# Common attributes of the stix2 domain objects
+# (argument of create, source, default, transform)
+# The source is a stix2 attribute, a tuple of stix2 attributes where the first
+# present one is used, or ("extras", key) for the resolved embedded relationships
+STIX_DOMAIN_OBJECT_FIELDS = [
+    ("stix_id", "id", REQUIRED, None),
+    ("createdBy", ("extras", "created_by_id"), None, None),
+    ("objectMarking", ("extras", "object_marking_ids"), None, None),
+    ("objectLabel", ("extras", "object_label_ids"), [], None),
+    ("externalReferences", ("extras", "external_references_ids"), [], None),
+    ("revoked", "revoked", None, None),
+    ("confidence", "confidence", None, None),
+    ("lang", "lang", None, None),
+    ("created", "created", None, None),
+    ("modified", "modified", None, None),
+]
+ALIASES_SOURCE = ("x_opencti_aliases", "x_mitre_aliases", "x_amitt_aliases", "aliases")
+
+# Attributes of the OpenCTI extension copied to the stix2 object before the
+# mapping: (stix2 attribute, extension attribute, copy when missing)
+STIX_DOMAIN_OBJECT_EXTENSIONS = [("x_opencti_stix_ids", "stix_ids", True)]
+
+STIX2_IMPORT_MAPPINGS = {
+    "malware": {
+        "extensions": STIX_DOMAIN_OBJECT_EXTENSIONS,
+        "fields": STIX_DOMAIN_OBJECT_FIELDS
+        + [
+            ("name", "name", REQUIRED, None),
+            ("description", "description", "", "markdown"),
+            ("aliases", ALIASES_SOURCE, None, None),
+            ("malware_types", "malware_types", None, None),
+            ("is_family", "is_family", False, None),
+            ("first_seen", "first_seen", None, None),
+            ("last_seen", "last_seen", None, None),
+            (
+                "architecture_execution_envs",
+                "architecture_execution_envs",
+                None,
+                None,
+            ),
+            ("implementation_languages", "implementation_languages", None, None),
+            ("capabilities", "capabilities", None, None),
+            ("killChainPhases", ("extras", "kill_chain_phases_ids"), None, None),
+            ("x_opencti_stix_ids", "x_opencti_stix_ids", None, None),
+        ],
+    },
+    "tool": {
+        "extensions": STIX_DOMAIN_OBJECT_EXTENSIONS,
+        "fields": STIX_DOMAIN_OBJECT_FIELDS
+        + [
+            ("name", "name", REQUIRED, None),
+            ("description", "description", "", "markdown"),
+            ("aliases", ALIASES_SOURCE, None, None),
+            ("tool_types", "tool_types", None, None),
+            ("tool_version", "tool_version", None, None),
+            ("killChainPhases", ("extras", "kill_chain_phases_ids"), None, None),
+            ("x_opencti_stix_ids", "x_opencti_stix_ids", None, None),
+        ],
+    },
+    "indicator": {
+        "extensions": [
+            ("x_opencti_score", "score", True),
+            ("x_opencti_detection", "detection", True),
+            ("x_opencti_main_observable_type", "main_observable_type", False),
+            ("x_opencti_create_observables", "create_observables", True),
+        ]
+        + STIX_DOMAIN_OBJECT_EXTENSIONS,
+        "fields": STIX_DOMAIN_OBJECT_FIELDS
+        + [
+            ("pattern_type", "pattern_type", None, None),
+            ("pattern_version", "pattern_version", None, None),
+            ("pattern", "pattern", "", None),
+            ("name", ("name", "pattern"), REQUIRED, None),
+            ("description", "description", "", "markdown"),
+            ("indicator_types", "indicator_types", None, None),
+            ("valid_from", "valid_from", None, None),
+            ("valid_until", "valid_until", None, None),
+            ("x_opencti_score", "x_opencti_score", 50, None),
+            ("x_opencti_detection", "x_opencti_detection", False, None),
+            ("x_mitre_platforms", "x_mitre_platforms", None, None),
+            (
+                "x_opencti_main_observable_type",
+                "x_opencti_main_observable_type",
+                "Unknown",
+                None,
+            ),
+            ("killChainPhases", ("extras", "kill_chain_phases_ids"), None, None),
+            ("x_opencti_stix_ids", "x_opencti_stix_ids", None, None),
+            (
+                "x_opencti_create_observables",
+                "x_opencti_create_observables",
+                False,
+                None,
+            ),
+        ],
+    },
+    "report": {
+        "extensions": STIX_DOMAIN_OBJECT_EXTENSIONS,
+        "fields": STIX_DOMAIN_OBJECT_FIELDS
+        + [
+            ("objects", ("extras", "object_ids"), [], None),
+            ("name", "name", REQUIRED, None),
+            ("description", "description", "", "markdown"),
+            ("report_types", "report_types", None, None),
+            ("published", "published", None, None),
+            ("x_opencti_stix_ids", "x_opencti_stix_ids", None, None),
+        ],
+    },
+}
+
+
+def convert_markdown(text: str) -> str:
+    return text.replace("<code>", "`").replace("</code>", "`")
+
+
+TRANSFORMS = {"markdown": convert_markdown}
+
+
+class OpenCTIStix2Mapper:
+    """Maps stix2 objects to the arguments of an entity `create` method
+
+    The mapping table is compiled once into the source of a single function
+    calling `create` with one conditional expression per argument, like
+    hand-written code: mapping an object neither interprets the table, nor
+    calls a getter per field, nor builds the arguments before unpacking them.
+
+    :param mapping: mapping with `extensions` and `fields`, see
+        `STIX2_IMPORT_MAPPINGS`
+    :type mapping: dict
+    :param get_attribute_in_extension: function of (key, stix_object)
+        returning an attribute of the OpenCTI extension
+    :type get_attribute_in_extension: Callable
+    """
+
+    def __init__(self, mapping: Dict, get_attribute_in_extension: Callable):
+        self.namespace = {"get_attribute_in_extension": get_attribute_in_extension}
+        self.source = self.compile_source(mapping)
+        exec(self.source, self.namespace)  # pylint: disable=exec-used
+        # call_create(create, stix_object, extras, update) calls `create` with
+        # the arguments mapped from the stix2 object and returns its result
+        self.call_create = self.namespace["map_stix_object"]
+
+    def constant(self, name: str, value) -> str:
+        """returns the expression of a constant of the mapping
+
+        :param name: name of the constant in the namespace of the function
+        :type name: str
+        :param value: value of the constant
+        :return: a literal for immutable scalars, a copy for lists and dicts,
+            the name of the constant otherwise
+        :rtype: str
+        """
+
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return repr(value)
+        self.namespace[name] = value
+        if isinstance(value, list):
+            return "list(" + name + ")"
+        if isinstance(value, dict):
+            return "dict(" + name + ")"
+        return name
+
+    def compile_field(self, index: int, source, default, transform) -> str:
+        """returns the expression of the value of a field
+
+        :param index: position of the field, names its constants
+        :type index: int
+        :param source: stix2 attribute, tuple of stix2 attributes or
+            ("extras", key)
+        :param default: value when the source is missing, or REQUIRED
+        :param transform: name of a transform applied to present values
+        :type transform: str, optional
+        :return: Python expression of (stix_object, extras)
+        :rtype: str
+        """
+
+        if isinstance(source, tuple) and source[0] == "extras":
+            key = repr(source[1])
+            return (
+                "extras["
+                + key
+                + "] if "
+                + key
+                + " in extras else "
+                + self.constant("default_" + str(index), default)
+            )
+        attributes = list(source) if isinstance(source, tuple) else [source]
+        function = None
+        if transform is not None:
+            function = "transform_" + str(index)
+            self.namespace[function] = TRANSFORMS[transform]
+        if default is REQUIRED:
+            # The last attribute is read unconditionally, raising KeyError
+            expression = "stix_object[" + repr(attributes.pop()) + "]"
+            if function is not None:
+                expression = function + "(" + expression + ")"
+        else:
+            expression = self.constant("default_" + str(index), default)
+        for attribute in reversed(attributes):
+            value = "stix_object[" + repr(attribute) + "]"
+            if function is not None:
+                value = function + "(" + value + ")"
+            expression = (
+                value
+                + " if "
+                + repr(attribute)
+                + " in stix_object else ("
+                + expression
+                + ")"
+            )
+        return expression
+
+    def compile_source(self, mapping: Dict) -> str:
+        """returns the source of the function mapping a stix2 object
+
+        :param mapping: mapping with `extensions` and `fields`
+        :type mapping: dict
+        :return: source of `map_stix_object(create, stix_object, extras, update)`
+        :rtype: str
+        """
+
+        lines = ["def map_stix_object(create, stix_object, extras, update):"]
+        for attribute, extension_attribute, copy_missing in mapping.get(
+            "extensions", []
+        ):
+            lines.append("    if " + repr(attribute) + " not in stix_object:")
+            lines.append(
+                "        value = get_attribute_in_extension("
+                + repr(extension_attribute)
+                + ", stix_object)"
+            )
+            indent = "        "
+            if not copy_missing:
+                lines.append("        if value is not None:")
+                indent = "            "
+            lines.append(indent + "stix_object[" + repr(attribute) + "] = value")
+        lines.append("    return create(")
+        for index, (argument, source, default, transform) in enumerate(
+            mapping["fields"]
+        ):
+            lines.append(
+                "        "
+                + argument
+                + "="
+                + self.compile_field(index, source, default, transform)
+                + ","
+            )
+        lines.append("        update=update,")
+        lines.append("    )")
+        return "\n".join(lines) + "\n"
+
+    def __call__(self, stix_object: Dict, extras: Dict, update: bool) -> Dict:
+        """maps a stix2 object to the arguments of `create`
+
+        :param stix_object: valid stix2 object
+        :type stix_object: dict
+        :param extras: resolved embedded relationships
+        :type extras: dict
+        :param update: whether to updated data in the database
+        :type update: bool
+        :return: the keyword arguments of `create`
+        :rtype: dict
+        """
+
+        return self.call_create(dict, stix_object, extras, update)
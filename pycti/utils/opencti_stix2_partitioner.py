@@ -0,0 +1,147 @@
+# coding: utf-8
+
+from typing import Dict, List, Tuple
+
+# Objects referenced by most of a bundle, imported first by the parent process
+SHARED_TYPES = ["marking-definition", "identity"]
+# Number of batches submitted per process, to balance uneven components
+BATCHES_PER_PROCESS = 4
+
+
+class OpenCTIStix2Partitioner:
+    """Partitions the objects of a stix2 bundle into independent components
+
+    Two objects belong to the same component if one references the other,
+    directly or through other objects of the bundle. Objects of the shared
+    types do not connect components, they are imported before them.
+    """
+
+    @staticmethod
+    def refs(stix_object: Dict) -> List[str]:
+        """returns the ids referenced by the *_ref and *_refs attributes
+
+        :param stix_object: valid stix2 object
+        :type stix_object: dict
+        :return: referenced ids
+        :rtype: list
+        """
+
+        refs = []
+        for key, value in stix_object.items():
+            if key.endswith("_refs") and isinstance(value, list):
+                refs.extend(value)
+            elif key.endswith("_ref") and isinstance(value, str):
+                refs.append(value)
+        return refs
+
+    @staticmethod
+    def split_shared(objects: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """separates the objects of the shared types from the others
+
+        :param objects: stix2 objects
+        :type objects: list
+        :return: the shared objects and the other objects
+        :rtype: tuple
+        """
+
+        shared_objects = []
+        other_objects = []
+        for stix_object in objects:
+            if stix_object["type"] in SHARED_TYPES:
+                shared_objects.append(stix_object)
+            else:
+                other_objects.append(stix_object)
+        return shared_objects, other_objects
+
+    def connected_components(self, objects: List[Dict]) -> List[List[Dict]]:
+        """groups objects referencing each other with a union-find
+
+        :param objects: stix2 objects, without the shared ones
+        :type objects: list
+        :return: components, in order of their first object in `objects`
+        :rtype: list
+        """
+
+        parents = {stix_object["id"]: stix_object["id"] for stix_object in objects}
+
+        def find(id: str) -> str:
+            root = id
+            while parents[root] != root:
+                root = parents[root]
+            # Path compression
+            while parents[id] != root:
+                parents[id], id = root, parents[id]
+            return root
+
+        for stix_object in objects:
+            for ref in self.refs(stix_object):
+                if ref in parents:
+                    root = find(stix_object["id"])
+                    ref_root = find(ref)
+                    if root != ref_root:
+                        parents[ref_root] = root
+
+        components = {}
+        for stix_object in objects:
+            components.setdefault(find(stix_object["id"]), []).append(stix_object)
+        return list(components.values())
+
+    @staticmethod
+    def batches(components: List[List[Dict]], processes: int) -> List[List[Dict]]:
+        """packs components into batches of similar sizes
+
+        :param components: components returned by `connected_components`
+        :type components: list
+        :param processes: number of processes
+        :type processes: int
+        :return: batches of objects, a component is never split
+        :rtype: list
+        """
+
+        nb_objects = sum(len(component) for component in components)
+        nb_batches = max(1, min(len(components), processes * BATCHES_PER_PROCESS))
+        batch_size = max(1, -(-nb_objects // nb_batches))
+        batches = []
+        batch = []
+        # Largest components first so that they do not end last
+        for component in sorted(components, key=len, reverse=True):
+            if len(batch) > 0 and len(batch) + len(component) > batch_size:
+                batches.append(batch)
+                batch = []
+            batch.extend(component)
+        if len(batch) > 0:
+            batches.append(batch)
+        return batches
+
+
+def import_bundle_in_process(
+    client_config: Dict,
+    stix_bundle: Dict,
+    update: bool,
+    types: List,
+    mapping_cache: Dict,
+) -> Tuple[List, Dict]:
+    """imports a bundle with a new OpenCTI client, in a worker process
+
+    :param client_config: arguments of `OpenCTIApiClient` and its `headers`
+    :type client_config: dict
+    :param stix_bundle: valid stix2 bundle
+    :type stix_bundle: dict
+    :param update: whether to updated data in the database
+    :type update: bool
+    :param types: list of stix2 types
+    :type types: list
+    :param mapping_cache: mapping of the objects imported by the parent
+    :type mapping_cache: dict
+    :return: list of imported stix2 objects and the import report
+    :rtype: tuple
+    """
+
+    from pycti.api.opencti_api_client import OpenCTIApiClient
+
+    client_config = dict(client_config)
+    headers = client_config.pop("headers", {})
+    opencti = OpenCTIApiClient(**client_config)
+    opencti.request_headers.update(headers)
+    opencti.stix2.mapping_cache.update(mapping_cache)
+    return opencti.stix2.import_bundle(stix_bundle, update, types, with_report=True)
@@ -1,56 +1,331 @@
+import hashlib
 import json
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Number of bundles serialized ahead of the consumer, per process
+SERIALIZATION_WINDOW = 2
 
 
 class OpenCTIStix2Splitter:
     def __init__(self):
         self.cache_index = {}
         self.elements = []
+        # Dependency depth of every object, 0 for objects without dependency
+        self.depths = {}
+        # Ids of the objects in a reference cycle
+        self.cycles = []
+        self.nb_bundles = 0
+        # Number of superseded versions of repeated objects dropped
+        self.duplicates = 0
+
+    @staticmethod
+    def version_key(item: Dict) -> tuple:
+        """returns a sortable key of the `modified` date of an item
+
+        Fractions of seconds are padded so that `2020-01-01T00:00:00Z` and
+        `2020-01-01T00:00:00.000Z` are equal.
+        """
+
+        modified = item.get("modified")
+        if not isinstance(modified, str):
+            return "", ""
+        modified = modified.rstrip("Z")
+        seconds, _, fraction = modified.partition(".")
+        return seconds, fraction.ljust(9, "0")
+
+    @staticmethod
+    def content_hash(item: Dict) -> str:
+        return hashlib.sha256(
+            json.dumps(item, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def supersedes(cls, item: Dict, current: Dict) -> bool:
+        """tells whether an item is a newer version than the current one
+
+        Versions with the same `modified` date are ordered by content hash so
+        that the kept version does not depend on the order of the bundle.
+
+        :param item: stix2 object
+        :type item: dict
+        :param current: other version of the stix2 object
+        :type current: dict
+        :return: True if `item` must replace `current`
+        :rtype: bool
+        """
+
+        current_key = cls.version_key(current)
+        item_key = cls.version_key(item)
+        return item_key > current_key or (
+            item_key == current_key
+            and cls.content_hash(item) > cls.content_hash(current)
+        )
+
+    def add_item(self, raw_data: Dict[str, Dict], item: Dict) -> None:
+        """adds an item to the items by id, keeping the newest version
+
+        :param raw_data: items of the bundle by id
+        :type raw_data: dict
+        :param item: stix2 object
+        :type item: dict
+        """
+
+        current = raw_data.get(item["id"])
+        if current is None:
+            raw_data[item["id"]] = item
+            return
+        self.duplicates += 1
+        if self.supersedes(item, current):
+            raw_data[item["id"]] = item
+
+    @staticmethod
+    def clean_refs(item: Dict) -> List[str]:
+        """removes the self references of an item and returns its references
+
+        :param item: stix2 object
+        :type item: dict
+        :return: referenced ids, with duplicates
+        :rtype: list
+        """
 
-    def enlist_element(self, item_id, raw_data):
-        nb_deps = 1
-        if item_id not in raw_data:
-            return 0
-        existing_item = self.cache_index.get(item_id)
-        if existing_item is not None:
-            return existing_item["nb_deps"]
-        # Recursive enlist for every refs
-        item = raw_data[item_id]
+        item_id = item["id"]
+        refs = []
         for key, value in item.items():
             if key.endswith("_refs"):
-                to_keep = []
-                for element_ref in item[key]:
-                    if element_ref != item_id:
-                        nb_deps += self.enlist_element(element_ref, raw_data)
-                        to_keep.append(element_ref)
+                if isinstance(value, list):
+                    to_keep = [
+                        element_ref for element_ref in value if element_ref != item_id
+                    ]
                     item[key] = to_keep
+                    refs.extend(to_keep)
             elif key.endswith("_ref"):
-                if item[key] == item_id:
+                if value == item_id:
                     item[key] = None
+                # Need to handle the special case of recursive ref for created by ref
+                elif key == "created_by_ref" and item_id.startswith(
+                    "marking-definition--"
+                ):
+                    continue
+                elif value is not None:
+                    refs.append(value)
+        return refs
+
+    def resolve_dependencies(self, raw_data: Dict[str, Dict]) -> None:
+        """orders the items so that every item comes after its references
+
+        Kahn's algorithm, in O(items + references). Every item gets its
+        `nb_deps`, the size of its dependency tree, and its depth. Items in a
+        cycle cannot be ordered, they are listed in `cycles` and each cycle is
+        imported as a whole, after its other references and before the items
+        depending on it.
+
+        :param raw_data: items of the bundle by id
+        :type raw_data: dict
+        """
+
+        dependencies = {}
+        dependents = {item_id: [] for item_id in raw_data}
+        in_degrees = {}
+        for item_id, item in raw_data.items():
+            refs = [ref for ref in self.clean_refs(item) if ref in raw_data]
+            dependencies[item_id] = refs
+            distinct_refs = set(refs)
+            in_degrees[item_id] = len(distinct_refs)
+            for ref in distinct_refs:
+                dependents[ref].append(item_id)
+
+        queue = deque(item_id for item_id in raw_data if in_degrees[item_id] == 0)
+        while len(queue) > 0:
+            item_id = queue.popleft()
+            item = raw_data[item_id]
+            refs = dependencies[item_id]
+            item["nb_deps"] = 1 + sum(raw_data[ref]["nb_deps"] for ref in refs)
+            self.depths[item_id] = 1 + max(
+                (self.depths[ref] for ref in refs), default=-1
+            )
+            self.elements.append(item)
+            self.cache_index[item_id] = item
+            for dependent in dependents[item_id]:
+                in_degrees[dependent] -= 1
+                if in_degrees[dependent] == 0:
+                    queue.append(dependent)
+
+        # Remaining items are in a cycle or depend on one. Their strongly
+        # connected components form an acyclic graph, ordered references first
+        remaining = [item_id for item_id in raw_data if in_degrees[item_id] > 0]
+        if len(remaining) == 0:
+            return
+        positions = {item_id: position for position, item_id in enumerate(remaining)}
+        components = self.strongly_connected_components(
+            remaining,
+            {
+                item_id: [ref for ref in dependencies[item_id] if ref in positions]
+                for item_id in remaining
+            },
+        )
+        for component in components:
+            members = sorted(component, key=positions.get)
+            member_ids = set(members)
+            refs = [
+                ref
+                for item_id in members
+                for ref in dependencies[item_id]
+                if ref not in member_ids
+            ]
+            if len(members) > 1:
+                self.cycles.extend(members)
+            nb_deps = len(members) + sum(raw_data[ref]["nb_deps"] for ref in refs)
+            depth = 1 + max((self.depths[ref] for ref in refs), default=-1)
+            for item_id in members:
+                item = raw_data[item_id]
+                item["nb_deps"] = nb_deps
+                self.depths[item_id] = depth
+                self.elements.append(item)
+                self.cache_index[item_id] = item
+
+    @staticmethod
+    def strongly_connected_components(
+        nodes: List[str], edges: Dict[str, List[str]]
+    ) -> List[List[str]]:
+        """finds the strongly connected components of a graph
+
+        Iterative Tarjan's algorithm, in O(nodes + edges). A component is
+        listed after every component its nodes have an edge to.
+
+        :param nodes: nodes of the graph
+        :type nodes: list
+        :param edges: nodes reached from every node
+        :type edges: dict
+        :return: the components, as lists of nodes
+        :rtype: list
+        """
+
+        indexes = {}
+        low_links = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in nodes:
+            if root in indexes:
+                continue
+            indexes[root] = low_links[root] = len(indexes)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(edges[root]))]
+            while len(work) > 0:
+                node, children = work[-1]
+                for child in children:
+                    if child not in indexes:
+                        indexes[child] = low_links[child] = len(indexes)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(edges[child])))
+                        break
+                    if child in on_stack:
+                        low_links[node] = min(low_links[node], indexes[child])
                 else:
-                    # Need to handle the special case of recursive ref for created by ref
-                    is_created_by_ref = key == "created_by_ref"
-                    if is_created_by_ref:
-                        is_marking = item["id"].startswith("marking-definition--")
-                        if is_marking is False:
-                            nb_deps += self.enlist_element(value, raw_data)
-                    else:
-                        nb_deps += self.enlist_element(value, raw_data)
-        # Get the final dep counting and add in cache
-        item["nb_deps"] = nb_deps
-        self.elements.append(item)
-        self.cache_index[item_id] = item  # Put in cache
-        return nb_deps
-
-    def split_bundle(self, bundle, use_json=True, event_version=None) -> list:
-        """splits a valid stix2 bundle into a list of bundles
+                    work.pop()
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low_links[parent] = min(low_links[parent], low_links[node])
+                    if low_links[node] == indexes[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def group_elements(
+        self,
+        max_objects: int,
+        max_size: Optional[int] = None,
+        serialized: Optional[Dict[str, str]] = None,
+    ) -> List[List[Dict]]:
+        """packs the resolved elements into groups of independent objects
+
+        Objects of the same dependency depth only reference each other within
+        a cycle, whose members are kept in order. A group only holds objects
+        of a single depth and the groups are ordered by depth, so every object
+        comes after the groups of its references.
+
+        :param max_objects: maximum number of objects per group
+        :type max_objects: int
+        :param max_size: maximum size in bytes of the serialized objects of a
+            group, a larger object gets its own group
+        :type max_size: int, optional
+        :param serialized: filled with the JSON of the objects by id when
+            `max_size` is set, to build the bundles without serializing the
+            objects again
+        :type serialized: dict, optional
+        :return: groups of elements, in import order
+        :rtype: list
+        """
+
+        levels = {}
+        for item in self.elements:
+            levels.setdefault(self.depths[item["id"]], []).append(item)
+        groups = []
+        for depth in sorted(levels):
+            group = []
+            group_size = 0
+            for item in levels[depth]:
+                item_size = 0
+                if max_size is not None:
+                    item_json = json.dumps(item)
+                    item_size = len(item_json)
+                    if serialized is not None:
+                        serialized[item["id"]] = item_json
+                if len(group) > 0 and (
+                    len(group) >= max_objects
+                    or (max_size is not None and group_size + item_size > max_size)
+                ):
+                    groups.append(group)
+                    group = []
+                    group_size = 0
+                group.append(item)
+                group_size += item_size
+            if len(group) > 0:
+                groups.append(group)
+        return groups
+
+    def iter_split_bundle(
+        self,
+        bundle,
+        use_json=True,
+        event_version=None,
+        max_objects: int = 1,
+        max_size: Optional[int] = None,
+        processes: Optional[int] = None,
+    ) -> Iterator:
+        """splits a valid stix2 bundle, serializing the bundles lazily
+
+        The dependencies are resolved before returning, so that invalid data
+        raises immediately and `nb_bundles` is known before the iteration.
+        Bundles are only built and serialized when iterated.
+
         :param bundle: valid stix2 bundle
         :type bundle:
         :param use_json: is JSON?
         :type use_json:
+        :param max_objects: maximum number of objects per bundle, objects are
+            grouped by dependency depth above 1, defaults to 1
+        :type max_objects: int, optional
+        :param max_size: maximum size in bytes of the objects of a bundle
+        :type max_size: int, optional
+        :param processes: number of processes serializing the bundles ahead
+            of the iteration, defaults to serializing in the current process,
+            unused with `max_size` as the objects are serialized to be measured
+        :type processes: int, optional
         :raises Exception: if data is not valid JSON
-        :return: returns a list of bundles
-        :rtype: list
+        :return: iterator of bundles, in import order
+        :rtype: Iterator
         """
         if use_json:
             try:
@@ -69,28 +344,125 @@ class OpenCTIStix2Splitter:
 
         # Build flat list of elements
         for item in bundle_data["objects"]:
-            raw_data[item["id"]] = item
-        for item in bundle_data["objects"]:
-            self.enlist_element(item["id"], raw_data)
-
-        # Build the bundles
-        bundles = []
-
-        def by_dep_size(elem):
-            return elem["nb_deps"]
-
-        self.elements.sort(key=by_dep_size)
-        for entity in self.elements:
-            bundles.append(
-                self.stix2_create_bundle(
-                    bundle_data["id"],
-                    entity["nb_deps"],
-                    [entity],
-                    use_json,
-                    event_version,
-                )
+            self.add_item(raw_data, item)
+        self.resolve_dependencies(raw_data)
+
+        # Objects serialized to be measured are not serialized again
+        serialized = {} if use_json and max_size is not None else None
+        if max_objects > 1 or max_size is not None:
+            groups = deque(self.group_elements(max_objects, max_size, serialized))
+        else:
+
+            def by_dep_size(elem):
+                return elem["nb_deps"]
+
+            self.elements.sort(key=by_dep_size)
+            groups = deque([entity] for entity in self.elements)
+        self.nb_bundles = len(groups)
+        if serialized is not None:
+            return self._iter_serialized_bundles(
+                bundle_data["id"], groups, serialized, event_version
+            )
+        if use_json and processes is not None and processes > 1:
+            return self.serialize_bundles(
+                self._iter_bundles(bundle_data["id"], groups, False, event_version),
+                json.dumps,
+                processes,
+            )
+        return self._iter_bundles(bundle_data["id"], groups, use_json, event_version)
+
+    @staticmethod
+    def serialize_bundles(
+        bundles: Iterable[Dict],
+        serializer: Callable,
+        processes: int,
+        window: Optional[int] = None,
+    ) -> Iterator:
+        """serializes bundles with a pool of processes, keeping their order
+
+        At most `window` bundles are submitted ahead of the consumer, which
+        bounds the memory held by pending results.
+
+        :param bundles: bundles as dicts
+        :type bundles: Iterable
+        :param serializer: picklable function applied to every bundle
+        :type serializer: Callable
+        :param processes: number of processes
+        :type processes: int
+        :param window: maximum number of pending bundles, defaults to
+            `SERIALIZATION_WINDOW` per process
+        :type window: int, optional
+        :return: iterator of the serialized bundles
+        :rtype: Iterator
+        """
+
+        if window is None:
+            window = processes * SERIALIZATION_WINDOW
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending = deque()
+            for bundle in bundles:
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(serializer, bundle))
+            while len(pending) > 0:
+                yield pending.popleft().result()
+
+    def _iter_bundles(
+        self, bundle_id: str, groups: deque, use_json: bool, event_version
+    ) -> Iterator:
+        # Consume the groups so that sent bundles can be released
+        while len(groups) > 0:
+            group = groups.popleft()
+            yield self.stix2_create_bundle(
+                bundle_id,
+                max(item["nb_deps"] for item in group),
+                group,
+                use_json,
+                event_version,
+            )
+
+    def _iter_serialized_bundles(
+        self, bundle_id: str, groups: deque, serialized: Dict[str, str], event_version
+    ) -> Iterator:
+        while len(groups) > 0:
+            group = groups.popleft()
+            yield self.stix2_join_bundle(
+                bundle_id,
+                max(item["nb_deps"] for item in group),
+                [serialized.pop(item["id"]) for item in group],
+                event_version,
+            )
+
+    def split_bundle(
+        self,
+        bundle,
+        use_json=True,
+        event_version=None,
+        max_objects: int = 1,
+        max_size: Optional[int] = None,
+        processes: Optional[int] = None,
+    ) -> list:
+        """splits a valid stix2 bundle into a list of bundles
+        :param bundle: valid stix2 bundle
+        :type bundle:
+        :param use_json: is JSON?
+        :type use_json:
+        :param max_objects: maximum number of objects per bundle, objects are
+            grouped by dependency depth above 1, defaults to 1
+        :type max_objects: int, optional
+        :param max_size: maximum size in bytes of the objects of a bundle
+        :type max_size: int, optional
+        :param processes: number of processes serializing the bundles
+        :type processes: int, optional
+        :raises Exception: if data is not valid JSON
+        :return: returns a list of bundles
+        :rtype: list
+        """
+        return list(
+            self.iter_split_bundle(
+                bundle, use_json, event_version, max_objects, max_size, processes
             )
-        return bundles
+        )
 
     @staticmethod
     def stix2_create_bundle(bundle_id, bundle_seq, items, use_json, event_version=None):
@@ -114,3 +486,30 @@ class OpenCTIStix2Splitter:
         if event_version is not None:
             bundle["x_opencti_event_version"] = event_version
         return json.dumps(bundle) if use_json else bundle
+
+    @staticmethod
+    def stix2_join_bundle(
+        bundle_id, bundle_seq, serialized_items: List[str], event_version=None
+    ) -> str:
+        """create the JSON of a stix2 bundle with already serialized items
+
+        :param serialized_items: JSON of valid stix2 items
+        :type serialized_items: list
+        :return: JSON of the stix2 bundle
+        :rtype: str
+        """
+
+        bundle = {
+            "type": "bundle",
+            "id": bundle_id,
+            "spec_version": "2.1",
+            "x_opencti_seq": bundle_seq,
+        }
+        if event_version is not None:
+            bundle["x_opencti_event_version"] = event_version
+        return (
+            json.dumps(bundle)[:-1]
+            + ', "objects": ['
+            + ", ".join(serialized_items)
+            + "]}"
+        )
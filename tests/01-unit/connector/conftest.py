@@ -0,0 +1,70 @@
+import threading
+
+from pytest_cases import fixture
+
+from pycti import OpenCTIApiClient
+
+
+class FakeWork:
+    def __init__(self):
+        self.processed = []
+
+    def to_received(self, work_id, message):
+        pass
+
+    def to_processed(self, work_id, message, in_error=False):
+        self.processed.append((work_id, message))
+
+    def ping(self, work_id):
+        pass
+
+
+class FakeApi(OpenCTIApiClient):
+    """Keeps the request headers of the client, without connecting it"""
+
+    def __init__(self):
+        self.request_headers = {"Authorization": "Bearer token"}
+        self.thread_headers = threading.local()
+        self.work = FakeWork()
+
+
+class FakeQueueConnection:
+    def __init__(self):
+        self.acked = []
+
+    def add_callback_threadsafe(self, callback):
+        callback()
+
+
+class FakeQueueChannel:
+    def __init__(self):
+        self.connection = FakeQueueConnection()
+        self.is_open = True
+
+    def basic_ack(self, delivery_tag):
+        self.connection.acked.append(delivery_tag)
+
+
+@fixture
+def fake_api():
+    return FakeApi()
+
+
+@fixture
+def fake_queue_channel():
+    return FakeQueueChannel()
+
+
+@fixture
+def queue_config():
+    return {
+        "connection": {
+            "host": "localhost",
+            "vhost": "/",
+            "use_ssl": False,
+            "port": 5672,
+            "user": "guest",
+            "pass": "guest",
+        },
+        "listen": "listen_queue",
+    }
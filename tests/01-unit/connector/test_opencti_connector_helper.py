@@ -0,0 +1,558 @@
+import base64
+import json
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue
+
+import pika
+import pytest
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import NackError
+
+from pycti.connector.opencti_connector_helper import (
+    ListenQueue,
+    ListenStream,
+    OpenCTIConnectorHelper,
+    PingAlive,
+    PublisherPool,
+    PushPublisher,
+    StreamOffsetTracker,
+    compress_message,
+    decompress_message,
+)
+
+
+class FakeChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_open = True
+
+    def basic_publish(self, **kwargs):
+        if self.connection.lost:
+            self.connection.is_open = False
+            raise pika.exceptions.StreamLostError("lost")
+        self.connection.published.append(kwargs["body"])
+
+
+class FakeConnection:
+    instances = []
+    channel_class = FakeChannel
+
+    def __init__(self, parameters):
+        self.is_open = True
+        self.lost = False
+        self.published = []
+        FakeConnection.instances.append(self)
+
+    def channel(self):
+        return self.channel_class(self)
+
+    def process_data_events(self, time_limit=None):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+def test_publisher_pool(monkeypatch):
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConnection)
+    FakeConnection.instances = []
+    publisher_pool = PublisherPool(pika.ConnectionParameters(), 2)
+
+    def publish(index):
+        with publisher_pool.publisher() as publisher:
+            publisher.basic_publish(body=str(index))
+
+    threads = [threading.Thread(target=publish, args=[index]) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(FakeConnection.instances) <= 2
+    published = [body for c in FakeConnection.instances for body in c.published]
+    assert sorted(published) == [str(index) for index in range(8)]
+
+    # A lost connection is replaced and the message published again
+    FakeConnection.instances[0].lost = True
+    for connection in FakeConnection.instances[1:]:
+        connection.lost = True
+    with publisher_pool.publisher() as publisher:
+        publisher.basic_publish(body="retried")
+    assert FakeConnection.instances[-1].published == ["retried"]
+
+    publisher_pool.close()
+    assert not any(connection.is_open for connection in FakeConnection.instances)
+
+
+class FakeUnregisterApi:
+    def __init__(self):
+        self.unregistered = []
+
+    def unregister(self, connector_id):
+        self.unregistered.append(connector_id)
+
+
+def test_stop_run_and_terminate(monkeypatch, fake_api):
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConnection)
+    FakeConnection.instances = []
+    helper = OpenCTIConnectorHelper.__new__(OpenCTIConnectorHelper)
+    helper.connector_id = "connector--1"
+    helper.listen_queue = None
+    helper.api = fake_api
+    helper.api.connector = FakeUnregisterApi()
+    helper.publisher_pool = PublisherPool(pika.ConnectionParameters(), 1)
+    with helper.publisher_pool.publisher() as publisher:
+        publisher.basic_publish(body="bundle")
+    # Run and terminate connectors are stopped without a ping thread
+    helper.stop()
+    assert not FakeConnection.instances[0].is_open
+    assert helper.api.connector.unregistered == ["connector--1"]
+
+
+def create_send_helper(publisher_pool=None):
+    helper = OpenCTIConnectorHelper.__new__(OpenCTIConnectorHelper)
+    helper.message_context = threading.local()
+    helper.default_work_id = None
+    helper.default_applicant_id = "applicant--1"
+    helper.connector_id = "connector--1"
+    helper.config = {"push_exchange": "push"}
+    helper.connect_validate_before_import = False
+    helper.connect_split_max_objects = 1
+    helper.connect_split_max_size = None
+    helper.connect_serialization_processes = None
+    helper.connect_message_compression = None
+    helper.publisher_pool = publisher_pool
+    return helper
+
+
+class FakePublisherPool:
+    def __init__(self):
+        self.published = []
+
+    @contextmanager
+    def publisher(self):
+        yield self
+
+    def basic_publish(self, **kwargs):
+        self.published.append(kwargs["body"])
+
+    def flush(self):
+        pass
+
+
+def test_send_stix2_bundle_with_serialization_processes():
+    helper = create_send_helper(FakePublisherPool())
+    objects = [
+        {"id": "malware--1", "type": "malware", "created_by_ref": "identity--1"},
+        {"id": "identity--1", "type": "identity"},
+    ]
+    bundle = json.dumps({"type": "bundle", "id": "bundle--1", "objects": objects})
+    bundles = helper.send_stix2_bundle(bundle, serialization_processes=2)
+    # The bundles are encoded by the processes, as without them
+    assert [json.loads(bundle)["objects"][0]["id"] for bundle in bundles] == [
+        "identity--1",
+        "malware--1",
+    ]
+    messages = [json.loads(body) for body in helper.publisher_pool.published]
+    assert [message["action_sequence"] for message in messages] == [1, 2]
+    assert [
+        json.loads(base64.b64decode(message["content"])) for message in messages
+    ] == [json.loads(bundle) for bundle in bundles]
+    assert messages[0]["applicant_id"] == "applicant--1"
+    assert bundles == helper.send_stix2_bundle(bundle)
+
+
+class FakeChannelImpl:
+    """Channel implementation under a real BlockingChannel, acking the
+    deliveries when the publisher waits, nacking the deliveries of the bodies
+    in `nacks` (once, or always for `always_nacks`)"""
+
+    channel_number = 1
+
+    def __init__(self):
+        self.is_open = True
+        self.callback = None
+        self.delivered = []
+        self.published = []
+        self.nacks = set()
+        self.always_nacks = set()
+        self.delivery_tag = 0
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def add_on_cancel_callback(self, callback):
+        pass
+
+    def add_on_close_callback(self, callback):
+        pass
+
+    def add_callback(self, callback, replies, one_shot=True):
+        pass
+
+    def confirm_delivery(self, ack_nack_callback, callback=None):
+        self.callback = ack_nack_callback
+        callback(None)
+
+    def basic_publish(self, **kwargs):
+        self.delivered.append(kwargs["body"])
+
+    def confirm(self):
+        for body in self.delivered:
+            self.delivery_tag += 1
+            if body in self.nacks or body in self.always_nacks:
+                self.nacks.discard(body)
+                method = pika.spec.Basic.Nack(delivery_tag=self.delivery_tag)
+            else:
+                method = pika.spec.Basic.Ack(delivery_tag=self.delivery_tag)
+                self.published.append(body)
+            self.callback(pika.frame.Method(1, method))
+        self.delivered = []
+
+
+class FakeConfirmConnection(FakeConnection):
+    def __init__(self, parameters):
+        super().__init__(parameters)
+        self.channel_impl = FakeChannelImpl()
+        self.waits = 0
+
+    def channel(self):
+        return BlockingChannel(self.channel_impl, self)
+
+    def _flush_output(self, *waiters):
+        # Called by BlockingChannel._flush_output, as the real connection
+        self.waits += 1
+        self.channel_impl.confirm()
+
+
+def test_push_publisher_confirms(monkeypatch):
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConfirmConnection)
+    monkeypatch.setattr(
+        "pycti.connector.opencti_connector_helper.PUBLISH_RETRY_DELAY", 0
+    )
+    FakeConnection.instances = []
+    publisher = PushPublisher(pika.ConnectionParameters(), confirm_window=4)
+    publisher.connect()
+    connection = FakeConnection.instances[0]
+    connection.channel_impl.nacks = {"2"}
+    for index in range(10):
+        publisher.basic_publish(body=str(index))
+        assert len(publisher.outstanding) < 4
+    publisher.flush()
+    assert publisher.outstanding == {}
+    # Confirms are awaited in batches, not after every delivery
+    assert connection.waits < 10
+    assert sorted(connection.channel_impl.published) == sorted(
+        str(index) for index in range(10)
+    )
+
+    connection.channel_impl.always_nacks = {"always"}
+    publisher.basic_publish(body="always")
+    with pytest.raises(NackError):
+        publisher.flush()
+
+
+def test_push_publisher_without_confirm_internals(monkeypatch):
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConnection)
+    monkeypatch.delattr(BlockingChannel, "_flush_output")
+    FakeConnection.instances = []
+    # Other pika versions fall back to publishing without confirms
+    publisher = PushPublisher(pika.ConnectionParameters(), confirm_window=4)
+    assert publisher.confirm_window == 0
+    publisher.basic_publish(body="bundle")
+    publisher.flush()
+    assert FakeConnection.instances[0].published == ["bundle"]
+
+
+def test_send_bundle_with_confirm_window(monkeypatch):
+    monkeypatch.setattr(pika, "BlockingConnection", FakeConfirmConnection)
+    monkeypatch.setattr(
+        "pycti.connector.opencti_connector_helper.PUBLISH_RETRY_DELAY", 0
+    )
+    FakeConnection.instances = []
+    helper = create_send_helper()
+    publisher = PushPublisher(pika.ConnectionParameters(), confirm_window=2)
+    publisher.connect()
+    channel_impl = FakeConnection.instances[0].channel_impl
+    bodies = []
+
+    def nack_first_bundle(**kwargs):
+        if len(bodies) == 0:
+            channel_impl.always_nacks.add(kwargs["body"])
+        bodies.append(kwargs["body"])
+        FakeChannelImpl.basic_publish(channel_impl, **kwargs)
+
+    channel_impl.basic_publish = nack_first_bundle
+    # The nack of the first bundle is raised when publishing a later one,
+    # which must not be published again by the helper
+    with pytest.raises(NackError):
+        for index in range(3):
+            helper._send_bundle(publisher, "bundle" + str(index), sequence=index)
+    assert len(set(bodies) - channel_impl.always_nacks) == len(channel_impl.published)
+    assert len(channel_impl.published) == len(set(channel_impl.published))
+
+
+def test_message_compression():
+    body = json.dumps({"content": "x" * 10000}).encode("utf-8")
+    compressed = compress_message(body, "zlib")
+    assert len(compressed) < len(body)
+    assert decompress_message(compressed, "zlib") == body
+    assert compress_message(body, None) == body
+    assert decompress_message(body, None) == body
+    assert decompress_message(body, "utf-8") == body
+    with pytest.raises(ValueError):
+        compress_message(body, "lzma")
+
+
+def test_message_compression_zstd():
+    pytest.importorskip("zstandard")
+    body = json.dumps({"content": "x" * 10000}).encode("utf-8")
+    assert decompress_message(compress_message(body, "zstd"), "zstd") == body
+
+
+class FakeHelper:
+    def __init__(self, api):
+        self.api = api
+        self.work_id = None
+        self.applicant_id = None
+
+
+def test_listen_queue_workers(fake_api, fake_queue_channel, queue_config):
+    barrier = threading.Barrier(3, timeout=5)
+    applicants = {}
+
+    def callback(event):
+        # Blocks until the 3 messages are processed concurrently
+        barrier.wait()
+        headers = helper.api.get_request_headers()
+        applicants[event["index"]] = headers["opencti-applicant-id"]
+        return "done"
+
+    helper = FakeHelper(fake_api)
+    listen_queue = ListenQueue(helper, queue_config, callback, 3)
+    channel = fake_queue_channel
+    for index in range(3):
+        body = {
+            "internal": {
+                "work_id": "work--" + str(index),
+                "applicant_id": "applicant--" + str(index),
+            },
+            "event": {"index": index},
+        }
+        listen_queue._process_message(
+            channel,
+            pika.spec.Basic.Deliver(delivery_tag=index),
+            pika.BasicProperties(),
+            json.dumps(body),
+        )
+    listen_queue.stop()
+    assert sorted(channel.connection.acked) == [0, 1, 2]
+    assert sorted(helper.api.work.processed) == [
+        ("work--" + str(index), "done") for index in range(3)
+    ]
+    # Every thread sends the applicant of its own message
+    assert applicants == {index: "applicant--" + str(index) for index in range(3)}
+
+
+def create_state_helper():
+    helper = OpenCTIConnectorHelper.__new__(OpenCTIConnectorHelper)
+    helper.state_lock = threading.RLock()
+    helper.state_version = 0
+    helper.connector_state = None
+    return helper
+
+
+def test_connector_state():
+    helper = create_state_helper()
+    assert helper.get_state() is None
+    helper.set_state({"start_from": "0-0", "recover_until": "no"})
+    state = helper.get_state()
+    state["start_from"] = "changed"
+    assert helper.get_state()["start_from"] == "0-0"
+    # Nested values are not shared with the caller either
+    cursors = {"feed": {"offset": 1}}
+    helper.update_state({"cursors": cursors})
+    cursors["feed"]["offset"] = 2
+    helper.get_state()["cursors"]["feed"]["offset"] = 3
+    assert helper.get_state()["cursors"] == {"feed": {"offset": 1}}
+    assert helper.get_state_version() == 2
+    helper.set_state({"start_from": "0-0", "recover_until": "no"})
+
+    def update(index):
+        for _ in range(100):
+            helper.update_state({"thread_" + str(index): index})
+
+    threads = [threading.Thread(target=update, args=[index]) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert helper.get_state_version() == 403
+    assert helper.get_state()["thread_3"] == 3
+
+
+class FakeConnectorApi:
+    def __init__(self):
+        self.states = []
+
+    def ping(self, connector_id, connector_state):
+        self.states.append(connector_state)
+        return {"connector_state": json.dumps(connector_state)}
+
+
+def test_ping_alive_flush_interval(fake_api):
+    helper = create_state_helper()
+    api = fake_api
+    api.connector = FakeConnectorApi()
+    ping_alive = PingAlive(
+        "connector",
+        api,
+        helper.get_state,
+        helper.set_state,
+        helper.get_state_version,
+        0.05,
+    )
+    ping_alive.start()
+    time.sleep(0.2)
+    # Unchanged state is not pushed again before the ping interval
+    assert api.connector.states == [None]
+    helper.update_state({"start_from": "1-0"})
+    time.sleep(0.2)
+    ping_alive.stop()
+    ping_alive.join()
+    assert api.connector.states == [None, {"start_from": "1-0"}]
+
+
+class FakeMessage:
+    def __init__(self, id, event="create"):
+        self.id = id
+        self.event = event
+
+
+def create_listen_stream(helper, callback, batch_size=None, max_latency=None):
+    return ListenStream(
+        helper,
+        callback,
+        "http://localhost:4000/stream",
+        "token",
+        True,
+        None,
+        None,
+        False,
+        False,
+        None,
+        False,
+        batch_size,
+        max_latency,
+    )
+
+
+def test_listen_stream_batches():
+    helper = create_state_helper()
+    states = []
+    batches = []
+
+    def callback(batch):
+        batches.append([msg.id for msg in batch])
+        states.append(helper.get_state())
+
+    messages = [FakeMessage(index) for index in range(1, 7)]
+    messages[2].event = "heartbeat"
+    listen_stream = create_listen_stream(helper, callback, 2)
+    listen_stream.process_messages(messages, Queue(maxsize=1))
+    assert batches == [[1, 2], [4, 5], [6]]
+    # The state only advances after the batch is processed
+    assert states == [None, {"start_from": "3-0"}, {"start_from": "5-0"}]
+    assert helper.get_state() == {"start_from": "6-0"}
+
+
+def test_listen_stream_batches_latency():
+    helper = create_state_helper()
+    batches = []
+
+    def messages():
+        yield FakeMessage(1)
+        time.sleep(0.1)
+        yield FakeMessage(2, "heartbeat")
+        yield FakeMessage(3)
+
+    listen_stream = create_listen_stream(
+        helper, lambda batch: batches.append([msg.id for msg in batch]), 10, 0.05
+    )
+    listen_stream.process_messages(messages(), Queue(maxsize=1))
+    assert batches == [[1], [3]]
+    assert helper.get_state() == {"start_from": "3-0"}
+
+
+def test_stream_offset_tracker():
+    tracker = StreamOffsetTracker()
+    sequences = [tracker.start(str(index) + "-0") for index in range(1, 5)]
+    assert tracker.complete(sequences[1]) is None
+    assert tracker.complete(sequences[0]) == "2-0"
+    assert tracker.complete(sequences[3]) is None
+    assert tracker.complete(sequences[2]) == "4-0"
+    assert tracker.committed == "4-0"
+
+
+def test_listen_stream_workers():
+    helper = create_state_helper()
+    processed = {}
+    lock = threading.Lock()
+
+    def callback(msg):
+        entity_id = json.loads(msg.data)["data"]["id"]
+        # Messages of other entities are processed meanwhile
+        time.sleep(0.01 * (msg.id % 3))
+        with lock:
+            processed.setdefault(entity_id, []).append(msg.id)
+
+    messages = []
+    for index in range(1, 61):
+        msg = FakeMessage(index)
+        msg.data = json.dumps({"data": {"id": "indicator--" + str(index % 5)}})
+        messages.append(msg)
+    messages.append(FakeMessage(61, "heartbeat"))
+    listen_stream = create_listen_stream(helper, callback)
+    listen_stream.workers = 4
+    listen_stream.process_messages(messages, Queue(maxsize=1))
+    for entity_id, ids in processed.items():
+        assert ids == sorted(ids)
+    assert sum(len(ids) for ids in processed.values()) == 60
+    assert helper.get_state() == {"start_from": "61-0"}
+
+
+def test_listen_stream_workers_callback_error():
+    helper = create_state_helper()
+    read = []
+
+    def callback(msg):
+        raise ValueError("callback failed on " + str(msg.id))
+
+    def messages():
+        # More messages of a single entity than its worker queue holds
+        for index in range(1, 1000):
+            read.append(index)
+            msg = FakeMessage(index)
+            msg.data = json.dumps({"data": {"id": "indicator--1"}})
+            yield msg
+
+    listen_stream = create_listen_stream(helper, callback)
+    listen_stream.workers = 2
+    errors = []
+
+    def process():
+        try:
+            listen_stream.process_messages(messages(), Queue(maxsize=1))
+        except ValueError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=process, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert [str(error) for error in errors] == ["callback failed on 1"]
+    # The stream stops being read and the state does not advance
+    assert len(read) < 999
+    assert helper.get_state() is None
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+
+from pycti.connector.opencti_connector_helper_async import (
+    AsyncListenQueue,
+    OpenCTIAsyncConnectorHelper,
+)
+
+
+class FakeHelper:
+    def __init__(self, api):
+        self.message_context = threading.local()
+        self.api = api
+
+    @property
+    def work_id(self):
+        return getattr(self.message_context, "work_id", None)
+
+    @property
+    def applicant_id(self):
+        return getattr(self.message_context, "applicant_id", None)
+
+    def stop(self):
+        pass
+
+
+def create_async_helper(api, blocking_workers):
+    async_helper = OpenCTIAsyncConnectorHelper.__new__(OpenCTIAsyncConnectorHelper)
+    async_helper.helper = FakeHelper(api)
+    async_helper.api = async_helper.helper.api
+    async_helper.executor = ThreadPoolExecutor(max_workers=blocking_workers)
+    async_helper.loop = asyncio.new_event_loop()
+    async_helper.loop_thread = threading.Thread(
+        target=async_helper._run_loop, daemon=True
+    )
+    async_helper.loop_thread.start()
+    return async_helper
+
+
+def test_async_listen_queue(fake_api, fake_queue_channel, queue_config):
+    async_helper = create_async_helper(fake_api, 1)
+    api = async_helper.api
+
+    async def callback(event):
+        await asyncio.sleep(0.2)
+        assert async_helper.work_id == "work--" + str(event["index"])
+        # Blocking calls see the work and the applicant of the message
+        return await async_helper.run_blocking(
+            lambda: async_helper.helper.work_id
+            + "/"
+            + api.get_request_headers()["opencti-applicant-id"]
+        )
+
+    # A single thread runs the blocking calls, none waits for the tasks
+    listen_queue = AsyncListenQueue(async_helper, queue_config, callback, 20)
+    # Messages are not processed by a pool of threads
+    assert listen_queue.executor is None
+    channel = fake_queue_channel
+    start = time.time()
+    for index in range(20):
+        body = {
+            "internal": {
+                "work_id": "work--" + str(index),
+                "applicant_id": "applicant--" + str(index),
+            },
+            "event": {"index": index},
+        }
+        listen_queue._process_message(
+            channel,
+            pika.spec.Basic.Deliver(delivery_tag=index),
+            pika.BasicProperties(),
+            json.dumps(body),
+        )
+    while len(channel.connection.acked) < 20 and time.time() - start < 5:
+        time.sleep(0.01)
+    # The callbacks awaited concurrently in the event loop
+    assert time.time() - start < 2
+    assert sorted(channel.connection.acked) == list(range(20))
+    assert sorted(api.work.processed) == sorted(
+        ("work--" + str(index), "work--" + str(index) + "/applicant--" + str(index))
+        for index in range(20)
+    )
+
+    # The thread does not keep the work and the applicant of the last task
+    async def outside_message():
+        return await async_helper.run_blocking(
+            lambda: (
+                async_helper.helper.work_id,
+                api.get_request_headers().get("opencti-applicant-id"),
+            )
+        )
+
+    assert asyncio.run_coroutine_threadsafe(
+        outside_message(), async_helper.loop
+    ).result() == (None, None)
+    listen_queue.stop()
+    async_helper.stop()
+    assert not async_helper.loop_thread.is_alive()
@@ -0,0 +1,32 @@
+import threading
+
+from pytest_cases import fixture
+
+from pycti import OpenCTIApiClient
+
+
+class FakeOpenCTI:
+    """Offline stand-in for OpenCTIApiClient, tests set the entities they use"""
+
+    api_url = "http://opencti/graphql"
+    api_token = "token"
+    log_level = "error"
+    json_logging = False
+    ssl_verify = False
+    proxies = None
+    get_extension_attribute = staticmethod(OpenCTIApiClient.get_attribute_in_extension)
+    set_thread_header = OpenCTIApiClient.set_thread_header
+    get_request_headers = OpenCTIApiClient.get_request_headers
+
+    def __init__(self):
+        self.request_headers = {"Authorization": "Bearer " + self.api_token}
+        self.thread_headers = threading.local()
+        self.logs = []
+
+    def log(self, level, message):
+        self.logs.append((level, message))
+
+
+@fixture
+def fake_opencti():
+    return FakeOpenCTI()
@@ -0,0 +1,96 @@
+import pytest
+
+from pycti import OpenCTIApiClient
+from pycti.entities.opencti_stix_sighting_relationship import StixSightingRelationship
+
+
+def create_api_client(responses):
+    # query_batch only needs query, which is replaced by canned responses
+    api_client = OpenCTIApiClient.__new__(OpenCTIApiClient)
+    api_client.requests = []
+
+    def query(query, variables={}, raise_on_error=True):
+        api_client.requests.append((query, variables))
+        return responses.pop(0)
+
+    api_client.query = query
+    return api_client
+
+
+def test_query_batch_maps_aliases_to_values():
+    api_client = create_api_client(
+        [
+            {"data": {"a0": {"id": "1"}, "a1": {"id": "2"}}},
+            {"data": {"a0": None}},
+        ]
+    )
+    results = api_client.query_batch(
+        "query", "stixObject(id: $value)", "String!", ["x", "y", "z"], "id", 2
+    )
+    assert results == [{"id": "1"}, {"id": "2"}, None]
+    query, variables = api_client.requests[0]
+    assert query == (
+        "query Batch($value0: String!, $value1: String!) {"
+        "a0: stixObject(id: $value0) {id}\na1: stixObject(id: $value1) {id}}"
+    )
+    assert variables == {"value0": "x", "value1": "y"}
+    assert api_client.requests[1][1] == {"value0": "z"}
+
+
+def test_query_batch_raises_alias_errors():
+    api_client = create_api_client(
+        [
+            {
+                "data": {"a0": {"id": "1"}, "a1": None},
+                "errors": [
+                    {
+                        "name": "LockError",
+                        "message": "Lock",
+                        "data": {"reason": "Execution timeout, too many lock"},
+                        "path": ["a1"],
+                    }
+                ],
+            },
+            {"data": {"a0": {"id": "3"}}},
+        ]
+    )
+    with pytest.raises(ValueError) as error:
+        api_client.query_batch(
+            "query", "stixObject(id: $value)", "String!", ["x", "y", "z"], "id", 2
+        )
+    assert error.value.args[0] == {
+        "name": "LockError",
+        "message": "Execution timeout, too many lock",
+    }
+    # The other chunks are still submitted before raising
+    assert len(api_client.requests) == 2
+    api_client = create_api_client(
+        [{"data": {"a0": None}, "errors": [{"message": "Missing", "path": ["a0"]}]}]
+    )
+    results = api_client.query_batch(
+        "query", "stixObject(id: $value)", "String!", ["x"], "id", raise_on_error=False
+    )
+    assert results == [None]
+
+
+def test_sighting_create_batch():
+    api_client = create_api_client(
+        [
+            {
+                "data": {
+                    "a0": {"id": "sighting-1", "entity_type": "stix-sighting"},
+                    "a1": {"id": "sighting-2", "entity_type": "stix-sighting"},
+                }
+            }
+        ]
+    )
+    results = StixSightingRelationship(api_client).create_batch(
+        inputs=[
+            {"fromId": "malware-1", "toId": "identity-1"},
+            {"fromId": "malware-1", "toId": "identity-2"},
+        ]
+    )
+    assert [result["id"] for result in results] == ["sighting-1", "sighting-2"]
+    variables = api_client.requests[0][1]
+    assert variables["value0"]["toId"] == "identity-1"
+    assert variables["value1"]["toId"] == "identity-2"
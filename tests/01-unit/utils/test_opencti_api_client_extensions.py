@@ -0,0 +1,35 @@
+from pycti import OpenCTIApiClient
+from pycti.api.opencti_api_client import ExtensionState
+
+STIX_OBJECT = {
+    "type": "attack-pattern",
+    "id": "attack-pattern--1",
+    "extensions": {
+        "extension-definition--ea279b3e-5c71-4632-ac08-831c66a786ba": {
+            "score": 80,
+            "stix_ids": None,
+        },
+        "extension-definition--f93e2c80-4231-4f9a-af8b-95c9bd566a82": {
+            "score": 10,
+            "detection": True,
+        },
+        "extension-definition--322b8f77-262a-4cb8-a915-1e441e00329b": {"id": "T1234"},
+    },
+}
+
+
+def test_extension_view_matches_extension_lookup():
+    # The flattened view does not need a connected client
+    api_client = OpenCTIApiClient.__new__(OpenCTIApiClient)
+    api_client.extension_state = ExtensionState()
+    api_client.set_extension_object(STIX_OBJECT)
+    for key in ["score", "stix_ids", "detection", "unknown"]:
+        assert api_client.get_extension_attribute(
+            key, STIX_OBJECT
+        ) == OpenCTIApiClient.get_attribute_in_extension(key, STIX_OBJECT)
+    assert api_client.get_mitre_extension_attribute("id", STIX_OBJECT) == "T1234"
+    # Other objects are still looked up in their own extensions
+    other_object = {"type": "tool", "id": "tool--1"}
+    assert api_client.get_extension_attribute("score", other_object) is None
+    api_client.set_extension_object(None)
+    assert api_client.get_extension_attribute("score", STIX_OBJECT) == 80
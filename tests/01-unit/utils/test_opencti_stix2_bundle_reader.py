@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from pycti.utils.opencti_stix2_bundle_reader import OpenCTIStix2BundleReader
+from pycti.utils.opencti_stix2_splitter import OpenCTIStix2Splitter
+
+
+def test_iter_objects():
+    # A tiny chunk size forces values to span several reads
+    bundle_reader = OpenCTIStix2BundleReader(
+        "./tests/data/DATA-TEST-STIX2_v2.json", chunk_size=64
+    )
+    objects = [stix_object for stix_object, _ in bundle_reader.iter_objects()]
+    with open("./tests/data/DATA-TEST-STIX2_v2.json") as file:
+        content = json.load(file)
+    assert objects == content["objects"]
+    assert bundle_reader.attributes["id"] == content["id"]
+    assert bundle_reader.attributes["type"] == "bundle"
+
+
+def test_split_bundle_from_spill_file():
+    with OpenCTIStix2BundleReader("./tests/data/cyclic-bundle.json") as bundle_reader:
+        bundles = bundle_reader.split_bundle()
+        assert len(bundles) == 3
+        loaded_bundles = list(bundle_reader.iter_bundles(bundles))
+    with open("./tests/data/cyclic-bundle.json") as file:
+        content = file.read()
+    # The objects are loaded as the in-memory splitter prepares them
+    assert loaded_bundles == OpenCTIStix2Splitter().split_bundle(
+        json.loads(content), use_json=False
+    )
+
+
+def test_split_bundle_self_references(tmp_path):
+    objects = [
+        {
+            "id": "identity--1",
+            "type": "identity",
+            "created_by_ref": "identity--1",
+        },
+        {
+            "id": "report--1",
+            "type": "report",
+            "created_by_ref": "identity--1",
+            "object_refs": ["report--1", "identity--1"],
+        },
+    ]
+    content = json.dumps({"id": "bundle--1", "type": "bundle", "objects": objects})
+    bundle_file = tmp_path / "bundle.json"
+    bundle_file.write_text(content)
+    with OpenCTIStix2BundleReader(str(bundle_file)) as bundle_reader:
+        loaded_bundles = list(bundle_reader.iter_bundles(bundle_reader.split_bundle()))
+    assert loaded_bundles == OpenCTIStix2Splitter().split_bundle(
+        json.loads(content), use_json=False
+    )
+    assert loaded_bundles[0]["objects"][0]["created_by_ref"] is None
+    assert loaded_bundles[1]["objects"][0]["object_refs"] == ["identity--1"]
+
+
+def test_invalid_bundle_file(tmp_path):
+    bundle_file = tmp_path / "bundle.json"
+    bundle_file.write_text('{"type": "bundle", "objects": [{"id": "a"')
+    with OpenCTIStix2BundleReader(str(bundle_file)) as bundle_reader:
+        with pytest.raises(ValueError):
+            bundle_reader.build_index()
+
+
+def test_duplicated_objects(tmp_path):
+    objects = [
+        {"id": "malware--1", "type": "malware", "modified": "2020-01-02T00:00:00Z"},
+        {"id": "identity--1", "type": "identity", "name": "a"},
+        {
+            "id": "malware--1",
+            "type": "malware",
+            "modified": "2020-01-01T00:00:00.000Z",
+            "created_by_ref": "identity--1",
+        },
+        {"id": "identity--1", "type": "identity", "name": "b"},
+    ]
+    bundle_file = tmp_path / "bundle.json"
+    bundle_file.write_text(json.dumps({"type": "bundle", "objects": objects}))
+    with OpenCTIStix2BundleReader(str(bundle_file)) as bundle_reader:
+        bundles = bundle_reader.split_bundle()
+        loaded_bundles = list(bundle_reader.iter_bundles(bundles))
+    loaded_objects = {
+        stix_object["id"]: stix_object
+        for bundle in loaded_bundles
+        for stix_object in bundle["objects"]
+    }
+    # The same versions are kept in memory, whatever the order of the bundle
+    stix_splitter = OpenCTIStix2Splitter()
+    expected_objects = {
+        stix_object["id"]: stix_object
+        for bundle in stix_splitter.split_bundle(
+            {"objects": [dict(stix_object) for stix_object in objects[::-1]]},
+            use_json=False,
+        )
+        for stix_object in bundle["objects"]
+    }
+    assert loaded_objects == expected_objects
+    assert loaded_objects["malware--1"] == dict(objects[0], nb_deps=1)
+    assert bundle_reader.duplicates == stix_splitter.duplicates == 2
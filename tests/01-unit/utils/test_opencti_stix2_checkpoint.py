@@ -0,0 +1,23 @@
+import pytest
+
+from pycti.utils.opencti_stix2_checkpoint import OpenCTIStix2Checkpoint
+
+
+def test_checkpoint_save_and_load(tmp_path):
+    checkpoint = OpenCTIStix2Checkpoint(str(tmp_path / "bundle.checkpoint"), 10)
+    assert checkpoint.load("bundle--1", 20) is None
+    mapping_cache = {"malware--1": {"id": "1234", "type": "Malware"}}
+    checkpoint.save("bundle--1", 20, 10, mapping_cache)
+    saved_checkpoint = checkpoint.load("bundle--1", 20)
+    assert saved_checkpoint["position"] == 10
+    assert saved_checkpoint["mapping_cache"] == mapping_cache
+    # A checkpoint of another bundle is ignored
+    assert checkpoint.load("bundle--2", 20) is None
+    assert checkpoint.load("bundle--1", 21) is None
+    checkpoint.clear()
+    assert checkpoint.load("bundle--1", 20) is None
+
+
+def test_checkpoint_invalid_interval(tmp_path):
+    with pytest.raises(ValueError):
+        OpenCTIStix2Checkpoint(str(tmp_path / "bundle.checkpoint"), 0)
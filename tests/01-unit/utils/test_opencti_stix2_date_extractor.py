@@ -0,0 +1,41 @@
+from pycti.utils.opencti_stix2_date_extractor import OpenCTIStix2DateExtractor
+
+
+def test_extract_common_formats():
+    date_extractor = OpenCTIStix2DateExtractor()
+    assert date_extractor.extract("Report published 2019-04-12") == (
+        "2019-04-12T00:00:00Z"
+    )
+    assert date_extractor.extract(
+        "Smith, J. (2018, March 5). Title. Retrieved May 1, 2020."
+    ) == ("2018-03-05T00:00:00Z")
+    assert date_extractor.extract("Kaspersky. (2016, February). Title.") == (
+        "2016-02-01T00:00:00Z"
+    )
+    assert date_extractor.extract("Published on 3rd June 2017") == (
+        "2017-06-03T00:00:00Z"
+    )
+    assert date_extractor.extract("Invalid 2019-02-30 then Jan 2, 2015") == (
+        "2015-01-02T00:00:00Z"
+    )
+    # Dates in the future are ignored
+    assert date_extractor.extract("Retrieved 9999-01-01") is None
+
+
+def test_extract_from_external_reference_is_memoized():
+    date_extractor = OpenCTIStix2DateExtractor()
+    external_reference = {
+        "source_name": "mitre",
+        "description": "Smith, J. (2018, March 5). Title.",
+    }
+    for _ in range(3):
+        assert (
+            date_extractor.extract_from_external_reference(external_reference)
+            == "2018-03-05T00:00:00Z"
+        )
+    assert date_extractor.extract_from_external_reference(
+        {"source_name": "Blog 2012-07-01"}
+    ) == ("2012-07-01T00:00:00Z")
+    cache_info = date_extractor.extract_cached.cache_info()
+    assert cache_info.hits == 2
+    assert cache_info.misses == 2
@@ -0,0 +1,73 @@
+import base64
+import os
+import threading
+
+import pytest
+
+from pycti.utils.opencti_stix2_file_uploader import OpenCTIStix2FileUploader
+
+
+def test_decode():
+    content = os.urandom(10001)
+    data = base64.b64encode(content).decode("utf-8")
+    # Line breaks and chunks which are not aligned on base64 blocks
+    wrapped_data = "\n".join(data[i : i + 76] for i in range(0, len(data), 76))
+    decoded_file = OpenCTIStix2FileUploader.decode(wrapped_data, chunk_size=1001)
+    assert decoded_file.read() == content
+    decoded_file = OpenCTIStix2FileUploader.decode(data.rstrip("="), chunk_size=64)
+    assert decoded_file.read() == content
+
+
+def test_concurrent_upload(fake_opencti):
+    uploads = {}
+    applicants = set()
+    lock = threading.Lock()
+
+    def add_file(**kwargs):
+        with lock:
+            uploads[kwargs["id"]] = kwargs["data"].read()
+            applicants.add(fake_opencti.get_request_headers()["opencti-applicant-id"])
+
+    # Another thread changed the shared applicant meanwhile
+    fake_opencti.request_headers["opencti-applicant-id"] = "applicant--other"
+    fake_opencti.set_thread_header("opencti-applicant-id", "applicant--1")
+    file_uploader = OpenCTIStix2FileUploader(fake_opencti, max_workers=2)
+    file_uploader.start()
+    for index in range(10):
+        file_uploader.upload(
+            add_file,
+            {
+                "name": "file.txt",
+                "data": base64.b64encode(str(index).encode()).decode(),
+                "mime_type": "text/plain",
+            },
+            id=str(index),
+        )
+    file_uploader.wait()
+    assert uploads == {str(index): str(index).encode() for index in range(10)}
+    # The upload threads send the applicant of the importing thread
+    assert applicants == {"applicant--1"}
+    assert file_uploader.executor is None
+
+
+def test_failed_uploads_are_raised(fake_opencti):
+    def add_file(**kwargs):
+        if kwargs["id"] != "0":
+            raise ValueError("upload " + kwargs["id"])
+
+    file_uploader = OpenCTIStix2FileUploader(fake_opencti, max_workers=2)
+    file_uploader.start()
+    for index in range(3):
+        file_uploader.upload(
+            add_file,
+            {"name": "file.txt", "data": "", "mime_type": "text/plain"},
+            id=str(index),
+        )
+    with pytest.raises(ValueError, match="upload 1"):
+        file_uploader.wait()
+    # Every failure is logged and the pool is stopped anyway
+    assert fake_opencti.logs == [
+        ("error", "File upload failed: upload 1"),
+        ("error", "File upload failed: upload 2"),
+    ]
+    assert file_uploader.executor is None
@@ -0,0 +1,54 @@
+from pycti.utils.opencti_stix2_import_report import (
+    OpenCTIStix2ImportReport,
+    OpenCTIStix2MappingCache,
+)
+
+
+def test_mapping_cache_statistics():
+    mapping_cache = OpenCTIStix2MappingCache()
+    mapping_cache["label_foo"] = {"id": "1234"}
+    assert "label_foo" in mapping_cache
+    assert "label_bar" not in mapping_cache
+    assert "label_foo" in mapping_cache
+    assert mapping_cache.hits == 2
+    assert mapping_cache.misses == 1
+
+
+def test_import_report():
+    mapping_cache = OpenCTIStix2MappingCache()
+    import_report = OpenCTIStix2ImportReport(mapping_cache=mapping_cache)
+    for index in range(15):
+        with import_report.object({"id": "malware--" + str(index), "type": "malware"}):
+            with import_report.phase("create"):
+                assert "malware--" + str(index) not in mapping_cache
+    with import_report.object({"id": "tool--1", "type": "tool"}):
+        pass
+    import_report.stop()
+    report = import_report.to_dict()
+    assert report["objects"] == {"malware": 15, "tool": 1}
+    assert "create" in report["phases"]
+    assert report["graphql_calls"] == 0
+    assert report["mapping_cache"] == {"hits": 0, "misses": 15, "hit_rate": 0.0}
+    assert len(report["slowest_objects"]) == 10
+    durations = [entry["duration"] for entry in report["slowest_objects"]]
+    assert durations == sorted(durations, reverse=True)
+
+
+def test_merge_import_reports():
+    first_report = OpenCTIStix2ImportReport()
+    with first_report.object({"id": "identity--1", "type": "identity"}):
+        pass
+    second_report = OpenCTIStix2ImportReport()
+    for index in range(12):
+        with second_report.object({"id": "malware--" + str(index), "type": "malware"}):
+            with second_report.phase("create"):
+                pass
+    report = OpenCTIStix2ImportReport.merge(
+        [first_report.to_dict(), second_report.to_dict()], 1.5
+    )
+    assert report["duration"] == 1.5
+    assert report["objects"] == {"identity": 1, "malware": 12}
+    assert list(report["phases"].keys()) == ["create"]
+    assert len(report["slowest_objects"]) == 10
+    durations = [entry["duration"] for entry in report["slowest_objects"]]
+    assert durations == sorted(durations, reverse=True)
@@ -0,0 +1,78 @@
+import pytest
+
+from pycti import OpenCTIApiClient
+from pycti.utils.opencti_stix2_mapper import STIX2_IMPORT_MAPPINGS, OpenCTIStix2Mapper
+
+EXTRAS = {
+    "created_by_id": "identity-id",
+    "object_marking_ids": ["marking-id"],
+    "kill_chain_phases_ids": ["kill-chain-phase-id"],
+}
+
+
+def mapper(stix_type):
+    return OpenCTIStix2Mapper(
+        STIX2_IMPORT_MAPPINGS[stix_type], OpenCTIApiClient.get_attribute_in_extension
+    )
+
+
+def test_map_malware():
+    stix_object = {
+        "type": "malware",
+        "id": "malware--faa5b705-cf44-4e50-8472-29e5fec43c3c",
+        "name": "Malware",
+        "description": "Uses <code>cmd.exe</code>",
+        "x_mitre_aliases": ["Alias"],
+        "aliases": ["Other"],
+    }
+    arguments = mapper("malware")(stix_object, EXTRAS, True)
+    assert arguments["stix_id"] == stix_object["id"]
+    assert arguments["createdBy"] == "identity-id"
+    assert arguments["objectMarking"] == ["marking-id"]
+    assert arguments["objectLabel"] == []
+    assert arguments["externalReferences"] == []
+    assert arguments["description"] == "Uses `cmd.exe`"
+    assert arguments["aliases"] == ["Alias"]
+    assert arguments["is_family"] is False
+    assert arguments["first_seen"] is None
+    assert arguments["killChainPhases"] == ["kill-chain-phase-id"]
+    assert arguments["x_opencti_stix_ids"] is None
+    assert arguments["update"] is True
+    # The extension lookup is stored in the object like the entities did
+    assert "x_opencti_stix_ids" in stix_object
+
+
+def test_map_indicator_extensions():
+    stix_object = {
+        "type": "indicator",
+        "id": "indicator--faa5b705-cf44-4e50-8472-29e5fec43c3c",
+        "pattern": "[ipv4-addr:value = '1.1.1.1']",
+        "extensions": {
+            "extension-definition--ea279b3e-5c71-4632-ac08-831c66a786ba": {
+                "score": 80,
+                "main_observable_type": "IPv4-Addr",
+            }
+        },
+    }
+    arguments = mapper("indicator")(stix_object, {}, False)
+    assert arguments["name"] == stix_object["pattern"]
+    assert arguments["description"] == ""
+    assert arguments["x_opencti_score"] == 80
+    assert arguments["x_opencti_main_observable_type"] == "IPv4-Addr"
+    # Missing extension attributes are stored as None, not defaulted
+    assert arguments["x_opencti_detection"] is None
+    assert arguments["objectMarking"] is None
+    assert arguments["killChainPhases"] is None
+
+
+def test_map_report_default_lists_are_not_shared():
+    report_mapper = mapper("report")
+    stix_object = {"type": "report", "id": "report--1", "name": "Report"}
+    arguments = report_mapper(stix_object, {}, False)
+    arguments["objects"].append("object-id")
+    assert report_mapper(stix_object, {}, False)["objects"] == []
+
+
+def test_map_missing_required_attribute():
+    with pytest.raises(KeyError):
+        mapper("tool")({"type": "tool", "id": "tool--1"}, {}, False)
@@ -0,0 +1,68 @@
+import pytest
+
+from pycti.utils.opencti_stix2 import OpenCTIStix2
+
+
+class StixCyberObservable:
+    def create(self, **kwargs):
+        return {"id": "internal-email", "entity_type": "Email-Message"}
+
+    def add_file(self, **kwargs):
+        pass
+
+
+class StixCyberObservableRelationship:
+    def __init__(self, error=None):
+        self.error = error
+        self.inputs = []
+
+    def create_batch(self, **kwargs):
+        self.inputs.extend(kwargs["inputs"])
+        if self.error is not None:
+            raise self.error
+        return [{"id": "relationship-" + input["toId"]} for input in kwargs["inputs"]]
+
+
+EMAIL = {
+    "type": "email-message",
+    "id": "email-message--1",
+    "from_ref": "email-addr--1",
+    "to_refs": ["email-addr--2", "email-addr--3"],
+    "object_marking_refs": [],
+}
+
+
+def test_observable_refs_are_created_in_batch(fake_opencti):
+    opencti = fake_opencti
+    opencti.stix_cyber_observable = StixCyberObservable()
+    opencti.stix_cyber_observable_relationship = StixCyberObservableRelationship()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.import_observable(dict(EMAIL))
+    assert opencti.stix_cyber_observable_relationship.inputs == [
+        {
+            "fromId": "internal-email",
+            "toId": "email-addr--1",
+            "relationship_type": "from",
+        },
+        {
+            "fromId": "internal-email",
+            "toId": "email-addr--2",
+            "relationship_type": "to",
+        },
+        {
+            "fromId": "internal-email",
+            "toId": "email-addr--3",
+            "relationship_type": "to",
+        },
+    ]
+
+
+def test_observable_refs_errors_are_raised(fake_opencti):
+    opencti = fake_opencti
+    opencti.stix_cyber_observable = StixCyberObservable()
+    opencti.stix_cyber_observable_relationship = StixCyberObservableRelationship(
+        ValueError({"name": "MissingReferenceError", "message": "ref"})
+    )
+    stix2 = OpenCTIStix2(opencti)
+    with pytest.raises(ValueError):
+        stix2.import_observable(dict(EMAIL))
@@ -0,0 +1,99 @@
+from concurrent.futures import Future
+
+import pytest
+
+from pycti.utils import opencti_stix2
+from pycti.utils.opencti_stix2_import_report import OpenCTIStix2ImportReport
+from pycti.utils.opencti_stix2_partitioner import OpenCTIStix2Partitioner
+
+
+def test_connected_components():
+    objects = [
+        {"type": "identity", "id": "identity--1"},
+        {"type": "marking-definition", "id": "marking-definition--1"},
+        {"type": "malware", "id": "malware--1", "created_by_ref": "identity--1"},
+        {"type": "malware", "id": "malware--2", "created_by_ref": "identity--1"},
+        {
+            "type": "tool",
+            "id": "tool--1",
+            "object_marking_refs": ["marking-definition--1"],
+        },
+        {
+            "type": "relationship",
+            "id": "relationship--1",
+            "source_ref": "malware--1",
+            "target_ref": "tool--1",
+        },
+        {
+            "type": "report",
+            "id": "report--1",
+            "object_refs": ["malware--2", "unknown--1"],
+        },
+    ]
+    partitioner = OpenCTIStix2Partitioner()
+    shared_objects, other_objects = partitioner.split_shared(objects)
+    assert [stix_object["id"] for stix_object in shared_objects] == [
+        "identity--1",
+        "marking-definition--1",
+    ]
+    components = partitioner.connected_components(other_objects)
+    # Shared identities and markings do not connect components
+    assert [[stix_object["id"] for stix_object in c] for c in components] == [
+        ["malware--1", "tool--1", "relationship--1"],
+        ["malware--2", "report--1"],
+    ]
+
+
+def test_batches():
+    components = [[{"id": str(i)}] * size for i, size in enumerate([1, 5, 2, 2, 1])]
+    batches = OpenCTIStix2Partitioner.batches(components, 1)
+    assert sum(len(batch) for batch in batches) == 11
+    # 4 batches of about 3 objects, a component is never split
+    assert [len(batch) for batch in batches] == [5, 2, 3, 1]
+
+
+class Executor:
+    # Runs nothing, records the arguments of the worker processes
+    calls = []
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, function, *args):
+        self.calls.append(args)
+        future = Future()
+        future.set_result(([], OpenCTIStix2ImportReport().to_dict()))
+        return future
+
+
+def test_import_bundle_processes_client_config(fake_opencti, monkeypatch):
+    monkeypatch.setattr(opencti_stix2, "ProcessPoolExecutor", Executor)
+    fake_opencti.json_logging = True
+    fake_opencti.request_headers["Custom"] = "1"
+    stix2 = opencti_stix2.OpenCTIStix2(fake_opencti)
+    stix2.import_bundle_processes(
+        {"type": "bundle", "objects": [{"type": "malware", "id": "malware--1"}]}
+    )
+    assert Executor.calls[0][0] == {
+        "url": "http://opencti",
+        "token": "token",
+        "log_level": "error",
+        "json_logging": True,
+        "ssl_verify": False,
+        "proxies": None,
+        "headers": {"Custom": "1"},
+    }
+
+
+def test_import_bundle_from_file_processes_with_streaming(fake_opencti, tmp_path):
+    file_path = tmp_path / "bundle.json"
+    file_path.write_text('{"type": "bundle", "objects": []}')
+    stix2 = opencti_stix2.OpenCTIStix2(fake_opencti)
+    with pytest.raises(ValueError):
+        stix2.import_bundle_from_file(str(file_path), streaming=True, processes=2)
@@ -0,0 +1,111 @@
+import pytest
+
+from pycti.utils.opencti_stix2 import OpenCTIStix2
+
+
+class StixObjectOrStixRelationship:
+    def __init__(self):
+        self.requested_ids = []
+
+    def read_many(self, **kwargs):
+        self.requested_ids.append(kwargs["ids"])
+        return {
+            id: {"id": "internal-" + id, "entity_type": "Malware"}
+            for id in kwargs["ids"]
+            if id != "malware--unknown"
+        }
+
+
+def test_prefetch_sighting_refs(fake_opencti):
+    opencti = fake_opencti
+    opencti.opencti_stix_object_or_stix_relationship = StixObjectOrStixRelationship()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.mapping_cache["identity--cached"] = {"id": "cached", "type": "Identity"}
+    bundles = [
+        {"objects": [{"type": "identity", "id": "identity--1"}]},
+        {
+            "objects": [
+                {
+                    "type": "sighting",
+                    "id": "sighting--1",
+                    "sighting_of_ref": "malware--1",
+                    "where_sighted_refs": ["identity--1", "identity--cached"],
+                    "observed_data_refs": ["observed-data--1", "malware--unknown"],
+                }
+            ]
+        },
+        {
+            "objects": [
+                {
+                    "type": "sighting",
+                    "id": "sighting--2",
+                    "sighting_of_ref": "malware--1",
+                    "where_sighted_refs": ["identity--1"],
+                }
+            ]
+        },
+    ]
+    stix2.prefetch_sighting_refs(bundles)
+    # A single bulk read of the refs neither in the bundle nor in the cache
+    assert opencti.opencti_stix_object_or_stix_relationship.requested_ids == [
+        ["malware--1", "observed-data--1", "malware--unknown"]
+    ]
+    assert stix2.mapping_cache["malware--1"] == {
+        "id": "internal-malware--1",
+        "type": "Malware",
+    }
+    assert "malware--unknown" not in stix2.mapping_cache
+
+
+class StixSightingRelationship:
+    def __init__(self, error=None):
+        self.error = error
+        self.inputs = []
+
+    def create_batch(self, **kwargs):
+        self.inputs.extend(kwargs["inputs"])
+        if self.error is not None:
+            raise self.error
+        return [
+            {"id": "sighting-" + input["toId"], "entity_type": "stix-sighting"}
+            for input in kwargs["inputs"]
+        ]
+
+
+def test_import_sighting_batch(fake_opencti):
+    opencti = fake_opencti
+    opencti.opencti_stix_object_or_stix_relationship = StixObjectOrStixRelationship()
+    opencti.stix_sighting_relationship = StixSightingRelationship()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.mapping_cache["identity--cached"] = {"id": "cached", "type": "Identity"}
+    sighting = {"type": "sighting", "id": "sighting--1", "count": 1}
+    stix2.import_sighting_batch(
+        sighting,
+        ["malware--1", "malware--unknown"],
+        ["identity--cached", "identity--1"],
+    )
+    # The refs are resolved once and every found pair gets a sighting
+    assert opencti.opencti_stix_object_or_stix_relationship.requested_ids == [
+        ["malware--1", "malware--unknown", "identity--1"]
+    ]
+    assert [
+        (input["fromId"], input["toId"])
+        for input in opencti.stix_sighting_relationship.inputs
+    ] == [
+        ("internal-malware--1", "cached"),
+        ("internal-malware--1", "internal-identity--1"),
+    ]
+    assert stix2.mapping_cache["sighting--1"]["id"] == "sighting-internal-identity--1"
+
+
+def test_import_sighting_batch_raises_errors(fake_opencti):
+    opencti = fake_opencti
+    opencti.opencti_stix_object_or_stix_relationship = StixObjectOrStixRelationship()
+    opencti.stix_sighting_relationship = StixSightingRelationship(
+        ValueError({"name": "LockError", "message": "Lock"})
+    )
+    stix2 = OpenCTIStix2(opencti)
+    sighting = {"type": "sighting", "id": "sighting--1", "count": 1}
+    with pytest.raises(ValueError):
+        stix2.import_sighting_batch(sighting, ["malware--1"], ["identity--1"])
+    assert "sighting--1" not in stix2.mapping_cache
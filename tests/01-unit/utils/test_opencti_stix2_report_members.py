@@ -0,0 +1,62 @@
+import threading
+
+from pycti.utils.opencti_stix2 import OpenCTIStix2
+
+
+class Report:
+    def __init__(self):
+        self.calls = []
+
+    def add_stix_object_or_stix_relationship(self, **kwargs):
+        self.calls.append((kwargs["id"], [kwargs["stixObjectOrStixRelationshipId"]]))
+
+    def add_stix_objects_or_stix_relationships(self, **kwargs):
+        self.calls.append((kwargs["id"], kwargs["stixObjectOrStixRelationshipIds"]))
+
+
+def test_report_members_are_added_in_bulk(fake_opencti):
+    opencti = fake_opencti
+    opencti.report = Report()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.report_members = {}
+    for member_id in ["malware-1", "relationship-1", "malware-1", "tool-1"]:
+        stix2.add_report_member("report-1", member_id)
+    stix2.add_report_member("report-2", "malware-1")
+    assert opencti.report.calls == []
+    stix2.flush_report_members()
+    assert opencti.report.calls == [
+        ("report-1", ["malware-1", "relationship-1", "tool-1"]),
+        ("report-2", ["malware-1"]),
+    ]
+    stix2.flush_report_members()
+    assert len(opencti.report.calls) == 2
+
+
+def test_report_members_outside_of_a_bundle_import(fake_opencti):
+    opencti = fake_opencti
+    opencti.report = Report()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.add_report_member("report-1", "malware-1")
+    assert opencti.report.calls == [("report-1", ["malware-1"])]
+
+
+def test_report_members_are_kept_per_thread(fake_opencti):
+    opencti = fake_opencti
+    opencti.report = Report()
+    stix2 = OpenCTIStix2(opencti)
+    stix2.report_members = {}
+    stix2.add_report_member("report-1", "malware-1")
+
+    def other_import():
+        # Another import of the connector starts and ends meanwhile
+        stix2.report_members = {}
+        stix2.add_report_member("report-2", "tool-1")
+        stix2.flush_report_members()
+        stix2.report_members = None
+
+    thread = threading.Thread(target=other_import)
+    thread.start()
+    thread.join()
+    assert opencti.report.calls == [("report-2", ["tool-1"])]
+    stix2.flush_report_members()
+    assert opencti.report.calls[1] == ("report-1", ["malware-1"])
@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from stix2 import Report
@@ -56,3 +57,209 @@ def test_create_bundle():
     ]:
         assert key in bundle
     assert len(bundle.keys()) == 6
+
+
+def test_split_deep_bundle():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [{"id": "note--0", "type": "note", "object_refs": []}]
+    for index in range(1, 5000):
+        objects.append(
+            {
+                "id": "note--" + str(index),
+                "type": "note",
+                "object_refs": ["note--" + str(index - 1)],
+            }
+        )
+    objects.reverse()
+    bundles = stix_splitter.split_bundle({"objects": objects}, use_json=False)
+    assert len(bundles) == 5000
+    assert [bundle["objects"][0]["id"] for bundle in bundles[:3]] == [
+        "note--0",
+        "note--1",
+        "note--2",
+    ]
+    assert stix_splitter.depths["note--4999"] == 4999
+    assert stix_splitter.cycles == []
+
+
+def test_split_bundle_depths_and_cycles():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [
+        {"id": "identity--1", "type": "identity", "created_by_ref": "identity--1"},
+        {"id": "malware--1", "type": "malware", "created_by_ref": "identity--1"},
+        {
+            "id": "report--1",
+            "type": "report",
+            "created_by_ref": "identity--1",
+            "object_refs": ["malware--1", "report--1", "note--1"],
+        },
+        {"id": "note--1", "type": "note", "object_refs": ["note--2"]},
+        {"id": "note--2", "type": "note", "object_refs": ["note--1"]},
+    ]
+    bundles = stix_splitter.split_bundle({"objects": objects}, use_json=False)
+    assert len(bundles) == 5
+    assert stix_splitter.depths["identity--1"] == 0
+    assert stix_splitter.depths["malware--1"] == 1
+    assert objects[0]["created_by_ref"] is None
+    assert objects[2]["object_refs"] == ["malware--1", "note--1"]
+    # The report only depends on the cycle, it is imported after it
+    assert stix_splitter.cycles == ["note--1", "note--2"]
+    assert [bundle["objects"][0]["id"] for bundle in bundles[2:]] == [
+        "note--1",
+        "note--2",
+        "report--1",
+    ]
+    assert stix_splitter.depths["note--1"] == 0
+    assert stix_splitter.depths["report--1"] == 2
+
+
+def test_split_bundle_grouped():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [
+        {"id": "identity--1", "type": "identity"},
+        {"id": "identity--2", "type": "identity"},
+        {"id": "identity--3", "type": "identity"},
+    ]
+    for index in range(4):
+        objects.append(
+            {
+                "id": "malware--" + str(index),
+                "type": "malware",
+                "created_by_ref": "identity--" + str(index % 3 + 1),
+            }
+        )
+    objects.append(
+        {
+            "id": "report--1",
+            "type": "report",
+            "object_refs": ["malware--" + str(index) for index in range(4)],
+        }
+    )
+    bundles = stix_splitter.split_bundle(
+        {"objects": objects}, use_json=False, max_objects=2
+    )
+    assert [[item["id"] for item in bundle["objects"]] for bundle in bundles] == [
+        ["identity--1", "identity--2"],
+        ["identity--3"],
+        ["malware--0", "malware--3"],
+        ["malware--1", "malware--2"],
+        ["report--1"],
+    ]
+    assert bundles[-1]["x_opencti_seq"] == 9
+
+    stix_splitter = OpenCTIStix2Splitter()
+    bundles = stix_splitter.split_bundle(
+        {"objects": objects},
+        use_json=False,
+        max_objects=10,
+        max_size=len(json.dumps(objects[3])) * 3,
+    )
+    assert [len(bundle["objects"]) for bundle in bundles] == [3, 3, 1, 1]
+
+
+def test_iter_split_bundle():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [
+        {"id": "malware--1", "type": "malware", "created_by_ref": "identity--1"},
+        {"id": "identity--1", "type": "identity"},
+    ]
+    bundles = stix_splitter.iter_split_bundle(json.dumps({"objects": objects}))
+    assert stix_splitter.nb_bundles == 2
+    assert [json.loads(bundle)["objects"][0]["id"] for bundle in bundles] == [
+        "identity--1",
+        "malware--1",
+    ]
+
+
+def test_split_bundle_duplicates():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [
+        {
+            "id": "malware--1",
+            "type": "malware",
+            "name": "new",
+            "modified": "2021-01-01T00:00:00.000Z",
+        },
+        {
+            "id": "malware--1",
+            "type": "malware",
+            "name": "old",
+            "modified": "2020-01-01T00:00:00Z",
+        },
+        {
+            "id": "malware--1",
+            "type": "malware",
+            "name": "new",
+            "modified": "2021-01-01T00:00:00Z",
+        },
+        {"id": "identity--1", "type": "identity"},
+    ]
+    bundles = stix_splitter.split_bundle({"objects": objects}, use_json=False)
+    assert len(bundles) == 2
+    assert stix_splitter.duplicates == 2
+    assert bundles[0]["objects"][0]["name"] == "new"
+    # The kept version does not depend on the order of the bundle
+    first = {"id": "malware--2", "type": "malware", "name": "first"}
+    second = {"id": "malware--2", "type": "malware", "name": "second"}
+    kept = [
+        OpenCTIStix2Splitter().split_bundle({"objects": versions}, use_json=False)[0]
+        for versions in [[first, second], [second, first]]
+    ]
+    assert kept[0]["objects"] == kept[1]["objects"]
+
+
+def test_split_bundle_with_processes():
+    objects = [
+        {"id": "identity--" + str(index), "type": "identity"} for index in range(20)
+    ]
+    bundles = OpenCTIStix2Splitter().split_bundle(
+        json.dumps({"objects": objects}), processes=2
+    )
+    assert [json.loads(bundle)["objects"][0]["id"] for bundle in bundles] == [
+        "identity--" + str(index) for index in range(20)
+    ]
+
+
+def test_serialize_bundles_window():
+    serialized = OpenCTIStix2Splitter.serialize_bundles(
+        iter([{"id": index} for index in range(5)]), json.dumps, 2, window=1
+    )
+    assert [json.loads(bundle)["id"] for bundle in serialized] == list(range(5))
+
+
+def test_split_bundle_chained_cycles():
+    stix_splitter = OpenCTIStix2Splitter()
+    objects = [
+        {"id": "note--3", "type": "note", "object_refs": ["note--4", "report--1"]},
+        {"id": "report--1", "type": "report", "object_refs": ["note--2"]},
+        {"id": "note--4", "type": "note", "object_refs": ["note--3"]},
+        {"id": "note--1", "type": "note", "object_refs": ["note--2"]},
+        {"id": "note--2", "type": "note", "object_refs": ["note--1"]},
+    ]
+    bundles = stix_splitter.split_bundle({"objects": objects}, use_json=False)
+    # Each cycle comes after what it depends on, the report in between
+    assert [bundle["objects"][0]["id"] for bundle in bundles] == [
+        "note--1",
+        "note--2",
+        "report--1",
+        "note--3",
+        "note--4",
+    ]
+    assert stix_splitter.cycles == ["note--1", "note--2", "note--3", "note--4"]
+
+
+def test_split_bundle_with_max_size_as_json():
+    objects = [{"id": "identity--1", "type": "identity"}]
+    objects += [
+        {"id": "malware--" + str(i), "type": "malware", "created_by_ref": "identity--1"}
+        for i in range(5)
+    ]
+    bundle = json.dumps({"id": "bundle--1", "objects": objects})
+    bundles = OpenCTIStix2Splitter().split_bundle(
+        bundle, max_objects=3, max_size=1000, event_version=4
+    )
+    expected_bundles = OpenCTIStix2Splitter().split_bundle(
+        json.loads(bundle), use_json=False, max_objects=3, event_version=4
+    )
+    # The objects serialized to be measured are joined in the same bundles
+    assert [json.loads(bundle) for bundle in bundles] == expected_bundles